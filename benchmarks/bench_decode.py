@@ -0,0 +1,51 @@
+"""
+JSON decoding of large REST payloads, as done by the HTTP clients
+"""
+
+import json
+from decimal import Decimal
+from bpx.models.columnar import FILL_COLUMNS, to_numpy
+from bpx.models.responses import Depth, Fill
+
+
+def bench_decode_depth(benchmark, depth_payload):
+    depth = benchmark(json.loads, depth_payload)
+    assert len(depth["bids"]) == 5000
+
+
+def bench_decode_fill_history(benchmark, fill_history_payload):
+    fills = benchmark(json.loads, fill_history_payload)
+    assert len(fills) == 1000
+
+
+def bench_decode_fill_history_models(benchmark, fill_history_payload):
+    fills = benchmark(Fill.decode, fill_history_payload)
+    assert len(fills) == 1000
+
+
+def bench_fill_notional_dicts(benchmark, fill_history_payload):
+    fills = json.loads(fill_history_payload)
+
+    def notional():
+        return sum(Decimal(f["price"]) * Decimal(f["quantity"]) for f in fills)
+
+    assert benchmark(notional) > 0
+
+
+def bench_fill_notional_models(benchmark, fill_history_payload):
+    fills = Fill.decode(fill_history_payload)
+
+    def notional():
+        return sum(fill.price * fill.quantity for fill in fills)
+
+    assert benchmark(notional) > 0
+
+
+def bench_decode_depth_model(benchmark, depth_payload):
+    depth = benchmark(Depth.decode, depth_payload)
+    assert depth.last_update_id >= 0
+
+
+def bench_decode_fill_history_numpy(benchmark, fill_history_payload):
+    fills = benchmark(to_numpy, fill_history_payload, FILL_COLUMNS)
+    assert len(fills) == 1000
@@ -0,0 +1,85 @@
+"""
+HTTP round trips against the local simulated exchange
+"""
+
+import asyncio
+import pytest
+from bpx.account import Account
+from bpx.async_.account import Account as AsyncAccount
+from bpx.async_.public import Public as AsyncPublic
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.public import Public
+
+CONCURRENT_REQUESTS = 32
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def bench_sync_ping(benchmark, exchange):
+    public = exchange.attach(Public())
+    assert benchmark(public.get_ping) == "pong"
+
+
+def bench_sync_depth(benchmark, exchange):
+    public = exchange.attach(Public())
+    assert "bids" in benchmark(public.get_depth, "SOL_USDC")
+
+
+def bench_sync_depth_raw(benchmark, exchange):
+    public = exchange.attach(Public(http_client=SyncHttpClient(raw=True)))
+    assert benchmark(public.get_depth, "SOL_USDC").status == 200
+
+
+def bench_sync_signed_balances(benchmark, exchange, keys):
+    account = exchange.attach(Account(*keys))
+    assert "USDC" in benchmark(account.get_balances)
+
+
+def bench_sync_execute_order(benchmark, exchange, keys):
+    account = exchange.attach(Account(*keys))
+    order = benchmark(
+        account.execute_order,
+        "SOL_USDC",
+        "Bid",
+        "Limit",
+        quantity="1",
+        price="1",
+        post_only=True,
+    )
+    assert order["status"] == "New"
+    account.cancel_all_orders("SOL_USDC")
+
+
+def bench_async_depth(benchmark, exchange, loop):
+    public = exchange.attach(AsyncPublic())
+    depth = benchmark(lambda: loop.run_until_complete(public.get_depth("SOL_USDC")))
+    assert "bids" in depth
+
+
+@pytest.mark.parametrize("transport", ["aiohttp", "httpx"])
+def bench_async_concurrent_signed(benchmark, exchange, keys, loop, transport):
+    if transport == "httpx":
+        pytest.importorskip("httpx")
+        from bpx.http_client.httpx_http_client import HttpxHttpClient
+
+        http_client = HttpxHttpClient()
+    else:
+        http_client = AsyncHttpClient()
+    account = exchange.attach(AsyncAccount(*keys, http_client=http_client))
+    benchmark.extra_info["requests"] = CONCURRENT_REQUESTS
+
+    async def burst():
+        return await asyncio.gather(
+            *(account.get_balances() for _ in range(CONCURRENT_REQUESTS))
+        )
+
+    responses = benchmark(lambda: loop.run_until_complete(burst()))
+    assert all("USDC" in response for response in responses)
+    if transport == "httpx":
+        loop.run_until_complete(http_client.aclose())
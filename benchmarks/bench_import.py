@@ -0,0 +1,29 @@
+"""
+Import time of the package in a fresh interpreter, guards the lazy imports of bpx/__init__.py
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "pass",
+        "import bpx",
+        "from bpx import Public",
+        "from bpx import Account",
+        "from bpx import WsPublic",
+    ],
+)
+def bench_import(benchmark, code):
+    # the interpreter start up ("pass") is the baseline of the other cases
+    benchmark.pedantic(_run, args=(code,), rounds=10, warmup_rounds=1)
@@ -0,0 +1,47 @@
+"""
+Level update cost of OrderBook and CompactOrderBook sides with 10000 levels
+"""
+
+import random
+from decimal import Decimal
+import pytest
+from bpx.order_book.compact_order_book import CompactBookSide
+from bpx.order_book.order_book import BookSide
+
+LEVELS = 10000
+TICK = Decimal("0.01")
+
+
+def updates(near_top: bool):
+    """20000 (price, quantity) ask updates, a quarter of them removing a level"""
+    rng = random.Random(1)
+    depth = 50 if near_top else LEVELS
+    return [
+        (
+            str(100 + rng.randrange(depth) * TICK),
+            "0" if rng.random() < 0.25 else str(rng.randrange(1, 100)),
+        )
+        for _ in range(20000)
+    ]
+
+
+def apply(side, batch):
+    for price, quantity in batch:
+        side.update(price, quantity)
+
+
+@pytest.mark.parametrize("near_top", [True, False], ids=["near_top", "uniform"])
+@pytest.mark.parametrize("storage", ["book_side", "compact"])
+def bench_ask_updates(benchmark, storage, near_top):
+    batch = updates(near_top)
+
+    def setup():
+        if storage == "compact":
+            side = CompactBookSide(False, TICK, Decimal("1"), capacity=2 * LEVELS)
+        else:
+            side = BookSide(descending=False)
+        apply(side, [(str(100 + i * TICK), "1") for i in range(LEVELS)])
+        return (side, batch), {}
+
+    benchmark.extra_info["updates"] = len(batch)
+    benchmark.pedantic(apply, setup=setup, rounds=5)
@@ -0,0 +1,74 @@
+"""
+Request construction: signing, headers and URL builders, no I/O
+"""
+
+import pytest
+from bpx.base.base_account import BaseAccount
+from bpx.base.base_public import BasePublic
+from bpx.base.order_template import OrderTemplate
+
+
+@pytest.fixture
+def account(keys):
+    return BaseAccount(*keys, window=5000, debug=False)
+
+
+@pytest.fixture
+def public():
+    return BasePublic()
+
+
+def bench_sign(benchmark, account):
+    params = {"symbol": "SOL_USDC", "side": "Bid", "orderType": "Limit"}
+    benchmark(account._sign, params, "orderExecute", 1714560000000, 5000)
+
+
+def bench_headers(benchmark, account):
+    params = {"symbol": "SOL_USDC", "limit": 100, "offset": 0}
+    benchmark(account._headers, params, "fillHistoryQueryAll", None)
+
+
+def bench_execute_order(benchmark, account):
+    benchmark(
+        account.execute_order,
+        symbol="SOL_USDC",
+        side="Bid",
+        order_type="Limit",
+        time_in_force="GTC",
+        quantity="1.25",
+        price="150.10",
+        client_id=123,
+        post_only=True,
+    )
+
+
+def bench_order_template(benchmark, account):
+    template = OrderTemplate(
+        account, "SOL_USDC", "Bid", "Limit", time_in_force="GTC", post_only=True
+    )
+    benchmark(template.build, "1.25", price="150.10", client_id=123)
+
+
+def bench_order_template_unsigned(benchmark, account):
+    # construction only, the difference with bench_order_template is signing
+    template = OrderTemplate(
+        account, "SOL_USDC", "Bid", "Limit", time_in_force="GTC", post_only=True
+    )
+    layout = template._layout(("quantity", "price", "clientId"))
+    benchmark(layout.format, "1.25", "150.10", 123)
+
+
+def bench_get_fill_history(benchmark, account):
+    benchmark(account.get_fill_history, symbol="SOL_USDC", limit=1000)
+
+
+def bench_depth_url(benchmark, public):
+    benchmark(public.get_depth_url, "SOL_USDC")
+
+
+def bench_klines_url(benchmark, public):
+    benchmark(public.get_klines_url, "SOL_USDC", "1m", 1714560000, 1714646400)
+
+
+def bench_historical_trades_url(benchmark, public):
+    benchmark(public.get_historical_trades_url, "SOL_USDC", 1000, 5000)
@@ -0,0 +1,62 @@
+"""
+Per-frame dispatch cost of WsPublic._listen: decoding, routing and callback
+"""
+
+import asyncio
+import pytest
+from bpx.ws_public import WsPublic
+
+
+class FrameConnection:
+    """Stand-in for a websockets connection yielding prepared frames"""
+
+    close_code = None
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    async def __aiter__(self):
+        for frame in self.frames:
+            yield frame
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def dispatch(loop, ws, frames):
+    ws.ws = FrameConnection(frames)
+    loop.run_until_complete(ws._listen())
+
+
+def bench_listen_callback(benchmark, loop, depth_frames):
+    received = []
+    ws = WsPublic(on_message=received.append)
+    benchmark.extra_info["frames"] = len(depth_frames)
+    benchmark.pedantic(dispatch, (loop, ws, depth_frames), rounds=5)
+    assert len(received) == 5 * len(depth_frames)
+
+
+def bench_listen_async_callback(benchmark, loop, depth_frames):
+    async def on_message(message):
+        pass
+
+    ws = WsPublic(on_message=on_message)
+    benchmark.extra_info["frames"] = len(depth_frames)
+    benchmark.pedantic(dispatch, (loop, ws, depth_frames), rounds=5)
+
+
+def bench_listen_stream_subscription(benchmark, loop, depth_frames):
+    ws = WsPublic()
+
+    def run():
+        subscription = ws.stream("depth.SOL_USDC", maxsize=0)
+        dispatch(loop, ws, depth_frames)
+        # the connection end closes the subscription, which queues an end marker
+        assert subscription.queue.qsize() == len(depth_frames) + 1
+
+    benchmark.extra_info["frames"] = len(depth_frames)
+    benchmark.pedantic(run, rounds=5)
@@ -0,0 +1,65 @@
+import base64
+import json
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from bpx.testing.exchange import SimulatedExchange
+from bpx.testing.market import SyntheticMarket
+
+SECRET_KEY = base64.b64encode(bytes(range(32))).decode()
+PUBLIC_KEY = base64.b64encode(
+    ed25519.Ed25519PrivateKey.from_private_bytes(bytes(range(32)))
+    .public_key()
+    .public_bytes(Encoding.Raw, PublicFormat.Raw)
+).decode()
+
+
+@pytest.fixture(scope="session")
+def keys():
+    return PUBLIC_KEY, SECRET_KEY
+
+
+@pytest.fixture(scope="session")
+def exchange():
+    with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        yield exchange
+
+
+@pytest.fixture(scope="session")
+def depth_payload() -> bytes:
+    """REST depth response with 5000 levels on each side"""
+    market = SyntheticMarket("SOL_USDC", levels=5000, seed=1)
+    return json.dumps(market.snapshot(0)).encode()
+
+
+@pytest.fixture(scope="session")
+def fill_history_payload() -> bytes:
+    """get_fill_history response with 1000 fills"""
+    fills = [
+        {
+            "clientId": str(i),
+            "fee": "0.0015",
+            "feeSymbol": "USDC",
+            "isMaker": bool(i % 2),
+            "orderId": str(112233445566 + i),
+            "price": f"{150 + i % 100 / 100:.2f}",
+            "quantity": "1.25",
+            "side": "Bid" if i % 2 else "Ask",
+            "symbol": "SOL_USDC",
+            "systemOrderType": None,
+            "timestamp": "2024-05-01T12:00:00.000",
+            "tradeId": 9000000 + i,
+        }
+        for i in range(1000)
+    ]
+    return json.dumps(fills).encode()
+
+
+@pytest.fixture(scope="session")
+def depth_frames():
+    """10000 raw depth stream frames"""
+    market = SyntheticMarket("SOL_USDC", seed=1)
+    return [
+        json.dumps({"stream": "depth.SOL_USDC", "data": market.next_depth(i)})
+        for i in range(10000)
+    ]
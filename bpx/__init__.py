@@ -1,15 +1,48 @@
 """
 BPX Python SDK - Backpack Exchange API Client
+
+The clients are imported on first access (PEP 562), so `import bpx` does not
+load requests, websockets or cryptography until a client needing them is used.
 """
 
-from bpx.public import Public
-from bpx.account import Account
-from bpx.ws_public import WsPublic
-from bpx.ws_account import WsAccount
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bpx.public import Public
+    from bpx.account import Account
+    from bpx.ws_public import WsPublic
+    from bpx.ws_account import WsAccount
+    from bpx.ws_threaded import ThreadedWsPublic, ThreadedWsAccount
+
+_LAZY_ATTRIBUTES = {
+    "Public": "bpx.public",
+    "Account": "bpx.account",
+    "WsPublic": "bpx.ws_public",
+    "WsAccount": "bpx.ws_account",
+    "ThreadedWsPublic": "bpx.ws_threaded",
+    "ThreadedWsAccount": "bpx.ws_threaded",
+}
 
 __all__ = [
-    'Public',
-    'Account',
-    'WsPublic',
-    'WsAccount',
+    "Public",
+    "Account",
+    "WsPublic",
+    "WsAccount",
+    "ThreadedWsPublic",
+    "ThreadedWsAccount",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    # cache it so that later accesses skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
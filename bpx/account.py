@@ -1,9 +1,19 @@
 from bpx.base.base_account import BaseAccount
+from bpx.base.order_template import OrderTemplate
 from bpx.http_client.sync_http_client import SyncHttpClient
-from typing import Optional, Union, Dict, Any, List
+from bpx.metrics.instrumentation import Instrumentation
+from bpx.models.columnar import (
+    FILL_COLUMNS,
+    FUNDING_PAYMENT_COLUMNS,
+    ORDER_COLUMNS,
+    columnar_page,
+)
+from bpx.models.objects import RequestConfiguration
+from bpx.pagination import iter_pages
+from bpx.sans_io import query_params
+from typing import Optional, Union, Dict, Any, List, Iterator
 from bpx.constants.enums import *
 
-
 http_client = SyncHttpClient()
 
 
@@ -16,8 +26,16 @@ class Account(BaseAccount):
         proxy: Optional[dict] = None,
         debug: bool = False,
         default_http_client: SyncHttpClient = http_client,
+        instrumentation: Optional[Instrumentation] = None,
     ):
         super().__init__(public_key, secret_key, window, debug)
+        if instrumentation is not None:
+            self.instrumentation = instrumentation
+            if default_http_client is http_client:
+                # the default client is shared by all instances, it is left untouched
+                default_http_client = SyncHttpClient(instrumentation=instrumentation)
+            else:
+                default_http_client.instrumentation = instrumentation
         self.http_client = default_http_client
         self.http_client.proxies = proxy
 
@@ -30,9 +48,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Account/operation/get_account
         """
         request_config = super().get_account(window=window)
-        return self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return self._send(request_config)
 
     def update_account(
         self,
@@ -54,11 +70,7 @@ class Account(BaseAccount):
             leverage_limit=leverage_limit,
             window=window,
         )
-        return self.http_client.patch(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return self._send(request_config)
 
     def get_max_borrow_quantity(
         self,
@@ -66,11 +78,7 @@ class Account(BaseAccount):
         window: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         request_config = super().get_max_borrow_quantity(symbol=symbol, window=window)
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_max_order_quantity(
         self,
@@ -93,11 +101,7 @@ class Account(BaseAccount):
             auto_lend_redeem=auto_lend_redeem,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_max_withdrawal_quantity(
         self,
@@ -112,11 +116,7 @@ class Account(BaseAccount):
             auto_lend_redeem=auto_lend_redeem,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_borrow_lend_positions(
         self, window: Optional[int] = None
@@ -127,9 +127,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Borrow-Lend/operation/get_borrow_lend_positions
         """
         request_config = super().get_borrow_lend_positions(window=window)
-        return self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return self._send(request_config)
 
     def execute_borrow_lend(
         self,
@@ -146,11 +144,7 @@ class Account(BaseAccount):
         request_config = super().execute_borrow_lend(
             quantity=quantity, side=side, symbol=symbol, window=window
         )
-        return self.http_client.post(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return self._send(request_config)
 
     def get_balances(
         self, window: Optional[int] = None
@@ -161,9 +155,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Capital/operation/get_balances
         """
         request_config = super().get_balances(window=window)
-        return self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return self._send(request_config)
 
     def get_collateral(
         self, subaccount_id: Optional[int] = None, window: Optional[int] = None
@@ -176,11 +168,7 @@ class Account(BaseAccount):
         request_config = super().get_collateral(
             subaccount_id=subaccount_id, window=window
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_deposits(
         self,
@@ -198,11 +186,7 @@ class Account(BaseAccount):
         request_config = super().get_deposits(
             limit=limit, offset=offset, window=window, from_=from_, to=to
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_deposit_address(
         self, blockchain: str, window: Optional[int] = None
@@ -215,11 +199,7 @@ class Account(BaseAccount):
         request_config = super().get_deposit_address(
             blockchain=blockchain, window=window
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_withdrawals(
         self,
@@ -237,11 +217,7 @@ class Account(BaseAccount):
         request_config = super().get_withdrawals(
             limit=limit, offset=offset, from_=from_, to=to, window=window
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def withdrawal(
         self,
@@ -271,11 +247,7 @@ class Account(BaseAccount):
             client_id=client_id,
             window=window,
         )
-        return self.http_client.post(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return self._send(request_config)
 
     def get_open_positions(
         self, window: Optional[int] = None
@@ -286,9 +258,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Futures/operation/get_positions
         """
         request_config = super().get_open_positions(window=window)
-        return self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return self._send(request_config)
 
     def get_borrow_history(
         self,
@@ -316,11 +286,7 @@ class Account(BaseAccount):
             offset=offset,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_interest_history(
         self,
@@ -348,11 +314,7 @@ class Account(BaseAccount):
             source=source,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_order_history(
         self,
@@ -362,10 +324,15 @@ class Account(BaseAccount):
         offset: int = 0,
         market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
         window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns orders history of a specified symbol
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/History/operation/get_order_history
         """
         request_config = super().get_order_history(
@@ -376,10 +343,34 @@ class Account(BaseAccount):
             market_type=market_type,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
+        page = self._send(request_config)
+        return columnar_page(page, ORDER_COLUMNS, columnar, decimals)
+
+    def iter_order_history(
+        self,
+        symbol: Optional[str] = None,
+        order_id: Optional[str] = None,
+        market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
+        page_size: int = 1000,
+        window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Yields the orders history page by page, see get_order_history
+        """
+        return iter_pages(
+            lambda limit, offset: self.get_order_history(
+                symbol=symbol,
+                order_id=order_id,
+                market_type=market_type,
+                limit=limit,
+                offset=offset,
+                window=window,
+                columnar=columnar,
+                decimals=decimals,
+            ),
+            page_size,
         )
 
     def get_fill_history(
@@ -392,10 +383,15 @@ class Account(BaseAccount):
         fill_type: Optional[Union[FillTypeEnum, FillTypeType]] = None,
         market_type: Optional[Union[MarketTypeType, MarketTypeEnum]] = None,
         window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns fills history of a specified symbol
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/History/operation/get_fills
         """
         request_config = super().get_fill_history(
@@ -408,10 +404,38 @@ class Account(BaseAccount):
             market_type=market_type,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
+        page = self._send(request_config)
+        return columnar_page(page, FILL_COLUMNS, columnar, decimals)
+
+    def iter_fill_history(
+        self,
+        symbol: Optional[str] = None,
+        from_: Optional[int] = None,
+        to: Optional[int] = None,
+        fill_type: Optional[Union[FillTypeEnum, FillTypeType]] = None,
+        market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
+        page_size: int = 1000,
+        window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Yields the fills history page by page, see get_fill_history
+        """
+        return iter_pages(
+            lambda limit, offset: self.get_fill_history(
+                symbol=symbol,
+                from_=from_,
+                to=to,
+                fill_type=fill_type,
+                market_type=market_type,
+                limit=limit,
+                offset=offset,
+                window=window,
+                columnar=columnar,
+                decimals=decimals,
+            ),
+            page_size,
         )
 
     def get_funding_payments(
@@ -421,10 +445,15 @@ class Account(BaseAccount):
         limit: Optional[int] = 100,
         offset: Optional[int] = 0,
         window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns the account funding payments
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/History/operation/get_funding_payments
         """
         request_config = super().get_funding_payments(
@@ -434,10 +463,32 @@ class Account(BaseAccount):
             offset=offset,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
+        page = self._send(request_config)
+        return columnar_page(page, FUNDING_PAYMENT_COLUMNS, columnar, decimals)
+
+    def iter_funding_payments(
+        self,
+        subaccount_id: Optional[int] = None,
+        symbol: Optional[str] = None,
+        page_size: int = 1000,
+        window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Yields the funding payments page by page, see get_funding_payments
+        """
+        return iter_pages(
+            lambda limit, offset: self.get_funding_payments(
+                subaccount_id=subaccount_id,
+                symbol=symbol,
+                limit=limit,
+                offset=offset,
+                window=window,
+                columnar=columnar,
+                decimals=decimals,
+            ),
+            page_size,
         )
 
     def get_profit_and_loss_history(
@@ -460,11 +511,7 @@ class Account(BaseAccount):
             offset=offset,
             window=window,
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_settlements_history(
         self,
@@ -483,11 +530,7 @@ class Account(BaseAccount):
         request_config = super().get_settlements_history(
             limit=limit, offset=offset, source=source, window=window
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def get_open_order(
         self,
@@ -504,11 +547,7 @@ class Account(BaseAccount):
         request_config = super().get_open_order(
             symbol=symbol, order_id=order_id, client_id=client_id, window=window
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def execute_order(
         self,
@@ -572,11 +611,30 @@ class Account(BaseAccount):
             trigger_quantity=trigger_quantity,
             window=window,
         )
-        return self.http_client.post(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
+        return self._send(request_config)
+
+    def execute_template(
+        self,
+        template: OrderTemplate,
+        quantity: Optional[str] = None,
+        price: Optional[str] = None,
+        client_id: Optional[int] = None,
+        quote_quantity: Optional[str] = None,
+        window: Optional[int] = None,
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        """
+        Posts an order of an OrderTemplate and returns order status
+
+        https://docs.backpack.exchange/#tag/Order/operation/execute_order
+        """
+        request_config = template.build(
+            quantity=quantity,
+            price=price,
+            client_id=client_id,
+            quote_quantity=quote_quantity,
+            window=window,
         )
+        return self._send(request_config)
 
     def cancel_order(
         self,
@@ -593,11 +651,7 @@ class Account(BaseAccount):
         request_config = super().cancel_order(
             symbol=symbol, order_id=order_id, client_id=client_id, window=window
         )
-        return self.http_client.delete(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return self._send(request_config)
 
     def get_open_orders(
         self,
@@ -613,11 +667,7 @@ class Account(BaseAccount):
         request_config = super().get_open_orders(
             market_type=market_type, symbol=symbol, window=window
         )
-        return self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return self._send(request_config)
 
     def cancel_all_orders(
         self, symbol: str, window: Optional[int] = None
@@ -628,11 +678,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Order/operation/cancel_open_orders
         """
         request_config = super().cancel_all_orders(symbol=symbol, window=window)
-        return self.http_client.delete(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return self._send(request_config)
 
     def submit_quote(
         self,
@@ -654,7 +700,20 @@ class Account(BaseAccount):
             client_id=client_id,
             window=window,
         )
-        return self.http_client.post(
+        return self._send(request_config)
+
+    def _send(
+        self, request_config: RequestConfiguration
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        # sends a request with the HTTP method set by its BaseAccount builder
+        if request_config.method == "GET":
+            return self.http_client.get(
+                url=request_config.url,
+                headers=request_config.headers,
+                params=query_params(request_config.params),
+            )
+        send = getattr(self.http_client, request_config.method.lower())
+        return send(
             url=request_config.url,
             headers=request_config.headers,
             data=request_config.data,
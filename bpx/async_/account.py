@@ -1,6 +1,17 @@
 from bpx.base.base_account import BaseAccount
+from bpx.base.order_template import OrderTemplate
 from bpx.http_client.async_http_client import AsyncHttpClient
-from typing import Optional, Union, Dict, Any, List
+from bpx.metrics.instrumentation import Instrumentation
+from bpx.models.columnar import (
+    FILL_COLUMNS,
+    FUNDING_PAYMENT_COLUMNS,
+    ORDER_COLUMNS,
+    columnar_page,
+)
+from bpx.models.objects import RequestConfiguration
+from bpx.pagination import aiter_pages
+from bpx.sans_io import query_params
+from typing import Optional, Union, Dict, Any, List, AsyncIterator
 
 from bpx.constants.enums import *
 
@@ -16,8 +27,16 @@ class Account(BaseAccount):
         proxy: Optional[str] = None,
         debug: bool = False,
         http_client: AsyncHttpClient = default_http_client,
+        instrumentation: Optional[Instrumentation] = None,
     ):
         super().__init__(public_key, secret_key, window, debug)
+        if instrumentation is not None:
+            self.instrumentation = instrumentation
+            if http_client is default_http_client:
+                # the default client is shared by all instances, it is left untouched
+                http_client = AsyncHttpClient(instrumentation=instrumentation)
+            else:
+                http_client.instrumentation = instrumentation
         self.http_client = http_client
         self.http_client.proxy = proxy
 
@@ -30,9 +49,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Account/operation/get_account
         """
         request_config = super().get_account(window=window)
-        return await self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return await self._send(request_config)
 
     async def update_account(
         self,
@@ -54,11 +71,7 @@ class Account(BaseAccount):
             leverage_limit=leverage_limit,
             window=window,
         )
-        return await self.http_client.patch(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return await self._send(request_config)
 
     async def get_max_borrow_quantity(
         self,
@@ -66,11 +79,7 @@ class Account(BaseAccount):
         window: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         request_config = super().get_max_borrow_quantity(symbol=symbol, window=window)
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_max_order_quantity(
         self,
@@ -93,11 +102,7 @@ class Account(BaseAccount):
             auto_lend_redeem=auto_lend_redeem,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_max_withdrawal_quantity(
         self,
@@ -112,11 +117,7 @@ class Account(BaseAccount):
             auto_lend_redeem=auto_lend_redeem,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_borrow_lend_positions(
         self, window: Optional[int] = None
@@ -127,9 +128,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Borrow-Lend/operation/get_borrow_lend_positions
         """
         request_config = super().get_borrow_lend_positions(window=window)
-        return await self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return await self._send(request_config)
 
     async def execute_borrow_lend(
         self,
@@ -146,11 +145,7 @@ class Account(BaseAccount):
         request_config = super().execute_borrow_lend(
             quantity=quantity, side=side, symbol=symbol, window=window
         )
-        return await self.http_client.post(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return await self._send(request_config)
 
     async def get_balances(
         self, window: Optional[int] = None
@@ -161,9 +156,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Capital/operation/get_balances
         """
         request_config = super().get_balances(window=window)
-        return await self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return await self._send(request_config)
 
     async def get_collateral(
         self, subaccount_id: Optional[int] = None, window: Optional[int] = None
@@ -176,11 +169,7 @@ class Account(BaseAccount):
         request_config = super().get_collateral(
             subaccount_id=subaccount_id, window=window
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_deposits(
         self,
@@ -198,11 +187,7 @@ class Account(BaseAccount):
         request_config = super().get_deposits(
             limit=limit, offset=offset, from_=from_, to=to, window=window
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_deposit_address(
         self, blockchain: str, window: Optional[int] = None
@@ -215,11 +200,7 @@ class Account(BaseAccount):
         request_config = super().get_deposit_address(
             blockchain=blockchain, window=window
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_withdrawals(
         self,
@@ -237,11 +218,7 @@ class Account(BaseAccount):
         request_config = super().get_withdrawals(
             limit=limit, offset=offset, from_=from_, to=to, window=window
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def withdrawal(
         self,
@@ -271,11 +248,7 @@ class Account(BaseAccount):
             client_id=client_id,
             window=window,
         )
-        return await self.http_client.post(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return await self._send(request_config)
 
     async def get_open_positions(
         self, window: Optional[int] = None
@@ -286,9 +259,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Futures/operation/get_positions
         """
         request_config = super().get_open_positions(window=window)
-        return await self.http_client.get(
-            url=request_config.url, headers=request_config.headers
-        )
+        return await self._send(request_config)
 
     async def get_borrow_history(
         self,
@@ -316,11 +287,7 @@ class Account(BaseAccount):
             offset=offset,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_interest_history(
         self,
@@ -348,11 +315,7 @@ class Account(BaseAccount):
             source=source,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_order_history(
         self,
@@ -362,10 +325,15 @@ class Account(BaseAccount):
         offset: int = 0,
         market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
         window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns orders history of a specified symbol
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/History/operation/get_order_history
         """
         request_config = super().get_order_history(
@@ -376,10 +344,34 @@ class Account(BaseAccount):
             market_type=market_type,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
+        page = await self._send(request_config)
+        return columnar_page(page, ORDER_COLUMNS, columnar, decimals)
+
+    def iter_order_history(
+        self,
+        symbol: Optional[str] = None,
+        order_id: Optional[str] = None,
+        market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
+        page_size: int = 1000,
+        window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Yields the orders history page by page, see get_order_history
+        """
+        return aiter_pages(
+            lambda limit, offset: self.get_order_history(
+                symbol=symbol,
+                order_id=order_id,
+                market_type=market_type,
+                limit=limit,
+                offset=offset,
+                window=window,
+                columnar=columnar,
+                decimals=decimals,
+            ),
+            page_size,
         )
 
     async def get_fill_history(
@@ -392,10 +384,15 @@ class Account(BaseAccount):
         fill_type: Optional[Union[FillTypeEnum, FillTypeType]] = None,
         market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
         window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns fills history of a specified symbol
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/History/operation/get_fills
         """
         request_config = super().get_fill_history(
@@ -408,10 +405,38 @@ class Account(BaseAccount):
             market_type=market_type,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
+        page = await self._send(request_config)
+        return columnar_page(page, FILL_COLUMNS, columnar, decimals)
+
+    def iter_fill_history(
+        self,
+        symbol: Optional[str] = None,
+        from_: Optional[int] = None,
+        to: Optional[int] = None,
+        fill_type: Optional[Union[FillTypeEnum, FillTypeType]] = None,
+        market_type: Optional[Union[MarketTypeEnum, MarketTypeType]] = None,
+        page_size: int = 1000,
+        window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Yields the fills history page by page, see get_fill_history
+        """
+        return aiter_pages(
+            lambda limit, offset: self.get_fill_history(
+                symbol=symbol,
+                from_=from_,
+                to=to,
+                fill_type=fill_type,
+                market_type=market_type,
+                limit=limit,
+                offset=offset,
+                window=window,
+                columnar=columnar,
+                decimals=decimals,
+            ),
+            page_size,
         )
 
     async def get_funding_payments(
@@ -421,10 +446,15 @@ class Account(BaseAccount):
         limit: Optional[int] = 100,
         offset: Optional[int] = 0,
         window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns the account funding payments
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/History/operation/get_funding_payments
         """
         request_config = super().get_funding_payments(
@@ -434,10 +464,32 @@ class Account(BaseAccount):
             offset=offset,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
+        page = await self._send(request_config)
+        return columnar_page(page, FUNDING_PAYMENT_COLUMNS, columnar, decimals)
+
+    def iter_funding_payments(
+        self,
+        subaccount_id: Optional[int] = None,
+        symbol: Optional[str] = None,
+        page_size: int = 1000,
+        window: Optional[int] = None,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Yields the funding payments page by page, see get_funding_payments
+        """
+        return aiter_pages(
+            lambda limit, offset: self.get_funding_payments(
+                subaccount_id=subaccount_id,
+                symbol=symbol,
+                limit=limit,
+                offset=offset,
+                window=window,
+                columnar=columnar,
+                decimals=decimals,
+            ),
+            page_size,
         )
 
     async def get_profit_and_loss_history(
@@ -460,11 +512,7 @@ class Account(BaseAccount):
             offset=offset,
             window=window,
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_settlements_history(
         self,
@@ -483,11 +531,7 @@ class Account(BaseAccount):
         request_config = super().get_settlements_history(
             limit=limit, offset=offset, source=source, window=window
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def get_open_order(
         self,
@@ -504,41 +548,37 @@ class Account(BaseAccount):
         request_config = super().get_open_order(
             symbol=symbol, order_id=order_id, client_id=client_id, window=window
         )
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def execute_order(
-            self,
-            symbol: str,
-            side: str,
-            order_type: Union[OrderTypeEnum, OrderTypeType],
-            time_in_force: Optional[Union[TimeInForceEnum, TimeInForceType]] = None,
-            quantity: Optional[str] = None,
-            price: Optional[str] = None,
-            trigger_price: Optional[str] = None,
-            self_trade_prevention: Optional[
-                Union[SelfTradePreventionEnum, SelfTradePreventionType]
-            ] = None,
-            quote_quantity: Optional[str] = None,
-            client_id: Optional[int] = None,
-            post_only: Optional[bool] = None,
-            reduce_only: Optional[bool] = None,
-            auto_borrow: Optional[bool] = None,
-            auto_borrow_repay: Optional[bool] = None,
-            auto_lend: Optional[bool] = None,
-            auto_lend_redeem: Optional[bool] = None,
-            stop_loss_limit_price: Optional[str] = None,
-            stop_loss_trigger_by: Optional[str] = None,
-            stop_loss_trigger_price: Optional[str] = None,
-            take_profit_limit_price: Optional[str] = None,
-            take_profit_trigger_by: Optional[str] = None,
-            take_profit_trigger_price: Optional[str] = None,
-            triggered_by: Optional[str] = None,
-            trigger_quantity: Optional[str] = None,
-            window: Optional[int] = None,
+        self,
+        symbol: str,
+        side: str,
+        order_type: Union[OrderTypeEnum, OrderTypeType],
+        time_in_force: Optional[Union[TimeInForceEnum, TimeInForceType]] = None,
+        quantity: Optional[str] = None,
+        price: Optional[str] = None,
+        trigger_price: Optional[str] = None,
+        self_trade_prevention: Optional[
+            Union[SelfTradePreventionEnum, SelfTradePreventionType]
+        ] = None,
+        quote_quantity: Optional[str] = None,
+        client_id: Optional[int] = None,
+        post_only: Optional[bool] = None,
+        reduce_only: Optional[bool] = None,
+        auto_borrow: Optional[bool] = None,
+        auto_borrow_repay: Optional[bool] = None,
+        auto_lend: Optional[bool] = None,
+        auto_lend_redeem: Optional[bool] = None,
+        stop_loss_limit_price: Optional[str] = None,
+        stop_loss_trigger_by: Optional[str] = None,
+        stop_loss_trigger_price: Optional[str] = None,
+        take_profit_limit_price: Optional[str] = None,
+        take_profit_trigger_by: Optional[str] = None,
+        take_profit_trigger_price: Optional[str] = None,
+        triggered_by: Optional[str] = None,
+        trigger_quantity: Optional[str] = None,
+        window: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Posts an order and returns order status
@@ -572,11 +612,30 @@ class Account(BaseAccount):
             trigger_quantity=trigger_quantity,
             window=window,
         )
-        return await self.http_client.post(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
+        return await self._send(request_config)
+
+    async def execute_template(
+        self,
+        template: OrderTemplate,
+        quantity: Optional[str] = None,
+        price: Optional[str] = None,
+        client_id: Optional[int] = None,
+        quote_quantity: Optional[str] = None,
+        window: Optional[int] = None,
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        """
+        Posts an order of an OrderTemplate and returns order status
+
+        https://docs.backpack.exchange/#tag/Order/operation/execute_order
+        """
+        request_config = template.build(
+            quantity=quantity,
+            price=price,
+            client_id=client_id,
+            quote_quantity=quote_quantity,
+            window=window,
         )
+        return await self._send(request_config)
 
     async def cancel_order(
         self,
@@ -593,14 +652,13 @@ class Account(BaseAccount):
         request_config = super().cancel_order(
             symbol=symbol, order_id=order_id, client_id=client_id, window=window
         )
-        return await self.http_client.delete(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return await self._send(request_config)
 
     async def get_open_orders(
-        self, market_type: Optional[str] = None, symbol: Optional[str] = None, window: Optional[int] = None
+        self,
+        market_type: Optional[str] = None,
+        symbol: Optional[str] = None,
+        window: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns open orders of a specified symbol
@@ -608,11 +666,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Order/operation/get_open_orders
         """
         request_config = super().get_open_orders(symbol=symbol, window=window)
-        return await self.http_client.get(
-            url=request_config.url,
-            headers=request_config.headers,
-            params=request_config.params,
-        )
+        return await self._send(request_config)
 
     async def cancel_all_orders(
         self, symbol: str, window: Optional[int] = None
@@ -623,11 +677,7 @@ class Account(BaseAccount):
         https://docs.backpack.exchange/#tag/Order/operation/cancel_open_orders
         """
         request_config = super().cancel_all_orders(symbol=symbol, window=window)
-        return await self.http_client.delete(
-            url=request_config.url,
-            headers=request_config.headers,
-            data=request_config.data,
-        )
+        return await self._send(request_config)
 
     async def submit_quote(
         self,
@@ -649,7 +699,20 @@ class Account(BaseAccount):
             client_id=client_id,
             window=window,
         )
-        return await self.http_client.post(
+        return await self._send(request_config)
+
+    async def _send(
+        self, request_config: RequestConfiguration
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        # sends a request with the HTTP method set by its BaseAccount builder
+        if request_config.method == "GET":
+            return await self.http_client.get(
+                url=request_config.url,
+                headers=request_config.headers,
+                params=query_params(request_config.params),
+            )
+        send = getattr(self.http_client, request_config.method.lower())
+        return await send(
             url=request_config.url,
             headers=request_config.headers,
             data=request_config.data,
@@ -1,8 +1,24 @@
 from bpx.base.base_public import BasePublic
 from bpx.http_client.async_http_client import AsyncHttpClient
-from typing import Optional, Union, Dict, Any, List
+from bpx.metrics.instrumentation import Instrumentation
+from bpx.models.columnar import TRADE_COLUMNS, columnar_page
+from bpx.fan_out import FanOutResult, RateLimiter, afan_out
+from bpx.pagination import aiter_pages
+from typing import (
+    Optional,
+    Union,
+    Dict,
+    Any,
+    List,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
 
 from bpx.constants.enums import (
+    ColumnarFormatEnum,
+    ColumnarFormatType,
     TimeIntervalEnum,
     TimeIntervalType,
     BorrowLendMarketHistoryIntervalEnum,
@@ -18,7 +34,13 @@ class Public(BasePublic):
         self,
         proxy: Optional[str] = None,
         http_client: AsyncHttpClient = default_http_client,
+        instrumentation: Optional[Instrumentation] = None,
     ):
+        if instrumentation is not None and http_client is default_http_client:
+            # the default client is shared by all instances, it is left untouched
+            http_client = AsyncHttpClient(instrumentation=instrumentation)
+        elif instrumentation is not None:
+            http_client.instrumentation = instrumentation
         self.http_client = http_client
         self.http_client.proxy = proxy
 
@@ -162,16 +184,42 @@ class Public(BasePublic):
         return await self.http_client.get(self.get_recent_trades_url(symbol, limit))
 
     async def get_history_trades(
-        self, symbol: str, limit=100, offset=0
+        self,
+        symbol: str,
+        limit=100,
+        offset=0,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
         """
         Returns historical trades for a specified market
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/Trades/operation/get_historical_trades
         """
-        return await self.http_client.get(
+        page = await self.http_client.get(
             self.get_historical_trades_url(symbol, limit, offset)
         )
+        return columnar_page(page, TRADE_COLUMNS, columnar, decimals)
+
+    def iter_history_trades(
+        self,
+        symbol: str,
+        page_size: int = 1000,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Yields the historical trades page by page, see get_history_trades
+        """
+        return aiter_pages(
+            lambda limit, offset: self.get_history_trades(
+                symbol, limit, offset, columnar, decimals
+            ),
+            page_size,
+        )
 
     async def get_all_mark_prices(
         self,
@@ -183,3 +231,26 @@ class Public(BasePublic):
         https://docs.backpack.exchange/#tag/Markets/operation/get_mark_prices
         """
         return await self.http_client.get(self.get_all_mark_prices_url(symbol))
+
+    async def fan_out(
+        self,
+        request: Union[str, Callable[[str], Awaitable[Any]]],
+        symbols: Iterable[str],
+        concurrency: int = 8,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> FanOutResult:
+        """
+        Runs a request per symbol concurrently and returns the responses and
+        errors by symbol
+
+        Args:
+            request: Name of a method taking a symbol ("get_ticker", "get_depth",
+                "get_open_interest", "get_all_mark_prices", ...) or a coroutine function
+            symbols: Symbols to request
+            concurrency: Maximal number of requests in flight
+            rate_limiter: Paces the requests, share one between calls to keep
+                a global rate
+        """
+        if isinstance(request, str):
+            request = getattr(self, request)
+        return await afan_out(request, symbols, concurrency, rate_limiter)
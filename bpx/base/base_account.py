@@ -1,6 +1,6 @@
-from cryptography.hazmat.primitives.asymmetric import ed25519
 import base64
 from typing import Optional, Union
+from bpx.metrics.instrumentation import SIGN, Instrumentation, now_ns
 from bpx.models.objects import RequestConfiguration
 from time import time
 from bpx.exceptions import *
@@ -14,9 +14,13 @@ class BaseAccount:
     """
 
     BPX_API_URL = "https://api.backpack.exchange/"
+    instrumentation: Optional[Instrumentation] = None
 
     def __init__(self, public_key: str, secret_key: str, window: int, debug: bool):
 
+        # imported here so that importing the module does not load cryptography
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+
         self.private_key = ed25519.Ed25519PrivateKey.from_private_bytes(
             base64.b64decode(secret_key)
         )
@@ -59,7 +63,9 @@ class BaseAccount:
             params["leverageLimit"] = leverage_limit
         headers = self._headers(params, "accountUpdate", window=window)
         url = self.BPX_API_URL + "api/v1/account"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="PATCH"
+        )
         return request_config
 
     def get_max_borrow_quantity(
@@ -158,7 +164,9 @@ class BaseAccount:
         }
         headers = self._headers(params, "borrowLendExecute", window=window)
         url = self.BPX_API_URL + "api/v1/borrowLend"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="POST"
+        )
         return request_config
 
     def get_balances(self, window: Optional[int] = None) -> RequestConfiguration:
@@ -293,7 +301,9 @@ class BaseAccount:
             params["clientId"] = client_id
         headers = self._headers(params, "withdraw", window=window)
         url = self.BPX_API_URL + "wapi/v1/capital/withdrawals"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="POST"
+        )
         return request_config
 
     def get_open_positions(self, window: Optional[int] = None) -> RequestConfiguration:
@@ -683,7 +693,9 @@ class BaseAccount:
             params["takeProfitTriggerPrice"] = take_profit_trigger_price
         headers = self._headers(params, "orderExecute", window=window)
         url = self.BPX_API_URL + "api/v1/order"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="POST"
+        )
         return request_config
 
     def cancel_order(
@@ -705,7 +717,9 @@ class BaseAccount:
             params["clientId"] = str(client_id)
         headers = self._headers(params, "orderCancel", window=window)
         url = self.BPX_API_URL + "api/v1/order"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="DELETE"
+        )
         return request_config
 
     def get_open_orders(
@@ -740,7 +754,9 @@ class BaseAccount:
         params = {"symbol": symbol}
         headers = self._headers(params, "orderCancelAll", window=window)
         url = self.BPX_API_URL + "api/v1/orders"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="DELETE"
+        )
         return request_config
 
     def submit_quote(
@@ -765,7 +781,9 @@ class BaseAccount:
             params["clientId"] = client_id
         headers = self._headers(params, "quoteSubmit", window=window)
         url = self.BPX_API_URL + "api/v1/rfq/quote"
-        request_config = RequestConfiguration(url=url, headers=headers, data=params)
+        request_config = RequestConfiguration(
+            url=url, headers=headers, data=params, method="POST"
+        )
         return request_config
 
     def _headers(self, params: dict, instruction: str, window: Optional[int]) -> dict:
@@ -774,7 +792,20 @@ class BaseAccount:
         """
         window = self.window if window is None else window
         timestamp = int(time() * 1e3)
-        encoded_signature = self._sign(params, instruction, timestamp, window)
+        if self.instrumentation is None:
+            encoded_signature = self._sign(params, instruction, timestamp, window)
+        else:
+            started = now_ns()
+            encoded_signature = self._sign(params, instruction, timestamp, window)
+            self.instrumentation.record(SIGN, now_ns() - started, instruction)
+        return self._signed_headers(encoded_signature, timestamp, window)
+
+    def _signed_headers(
+        self, encoded_signature: str, timestamp: int, window: int
+    ) -> dict:
+        """
+        Returns headers carrying the given signature
+        """
         headers = {
             "X-API-Key": self.public_key,
             "X-Signature": encoded_signature,
@@ -799,6 +830,13 @@ class BaseAccount:
         sorted_params = "&".join(sorted_params_list)
         if sorted_params:
             sign_str += "&" + sorted_params
+        return self._sign_message(sign_str, timestamp, window)
+
+    def _sign_message(self, sign_str: str, timestamp: int, window: int):
+        """
+        Returns encoded signature of the instruction and parameters part of a
+        signing string, completed with timestamp and window
+        """
         sign_str += f"&timestamp={timestamp}&window={window}"
         if self.debug:
             print(sign_str)
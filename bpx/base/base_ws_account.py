@@ -1,7 +1,7 @@
-from cryptography.hazmat.primitives.asymmetric import ed25519
 import base64
 from typing import Dict, Any, List, Optional
 from time import time
+from bpx.base.ws_subscriptions import chunk_streams
 
 
 class BaseWsAccount:
@@ -11,6 +11,7 @@ class BaseWsAccount:
     """
 
     WS_URL = "wss://ws.backpack.exchange/"
+    MAX_STREAMS_PER_MESSAGE = 100
 
     def __init__(self, public_key: str, secret_key: str, window: int = 5000, debug: bool = False):
         """
@@ -22,6 +23,9 @@ class BaseWsAccount:
             window: Time window for signature validity in milliseconds
             debug: Enable debug mode
         """
+        # imported here so that importing the module does not load cryptography
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+
         self.private_key = ed25519.Ed25519PrivateKey.from_private_bytes(
             base64.b64decode(secret_key)
         )
@@ -152,6 +156,59 @@ class BaseWsAccount:
             "apiKey": self.public_key
         }
 
+    def subscribe_streams(
+        self, streams: List[str], max_streams: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Subscribe to many private streams with as few signed messages as possible
+
+        Args:
+            streams: List of stream names (e.g. ["account.orderUpdate", "account.positionUpdate"])
+            max_streams: Maximal number of streams in one message,
+                defaults to MAX_STREAMS_PER_MESSAGE
+
+        Returns:
+            List of subscription message dicts with authentication
+        """
+        max_streams = max_streams or self.MAX_STREAMS_PER_MESSAGE
+        return [
+            self._signed_message("SUBSCRIBE", chunk)
+            for chunk in chunk_streams(streams, max_streams)
+        ]
+
+    def unsubscribe_streams(
+        self, streams: List[str], max_streams: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Unsubscribe from many private streams with as few signed messages as possible
+
+        Args:
+            streams: List of stream names to unsubscribe from
+            max_streams: Maximal number of streams in one message,
+                defaults to MAX_STREAMS_PER_MESSAGE
+
+        Returns:
+            List of unsubscribe message dicts with authentication
+        """
+        max_streams = max_streams or self.MAX_STREAMS_PER_MESSAGE
+        return [
+            self._signed_message("UNSUBSCRIBE", chunk)
+            for chunk in chunk_streams(streams, max_streams)
+        ]
+
+    def _signed_message(self, method: str, streams: List[str]) -> Dict[str, Any]:
+        timestamp = int(time() * 1e3)
+        signature = self._sign_ws_auth(timestamp)
+
+        return {
+            "method": method,
+            "params": streams,
+            "signature": signature,
+            "timestamp": timestamp,
+            "window": self.window,
+            "apiKey": self.public_key
+        }
+
     def _sign_ws_auth(self, timestamp: int) -> str:
         """
         Sign WebSocket authentication message
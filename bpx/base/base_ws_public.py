@@ -1,4 +1,5 @@
 from typing import List, Optional, Dict, Any
+from bpx.base.ws_subscriptions import chunk_streams, subscription_runs
 
 
 class BaseWsPublic:
@@ -8,6 +9,7 @@ class BaseWsPublic:
     """
 
     WS_URL = "wss://ws.backpack.exchange/"
+    MAX_STREAMS_PER_MESSAGE = 100
 
     def get_ws_url(self) -> str:
         """
@@ -33,6 +35,9 @@ class BaseWsPublic:
     def subscribe_tickers(self) -> Dict[str, Any]:
         """
         Subscribe to ticker updates for all symbols
+
+        Wrap the on_message callback in bpx.streams.conflation.Conflator
+        to only handle the latest ticker per symbol.
         
         Returns:
             Subscription message dict
@@ -106,6 +111,9 @@ class BaseWsPublic:
     def subscribe_mark_prices(self) -> Dict[str, Any]:
         """
         Subscribe to mark price updates for all symbols
+
+        Wrap the on_message callback in bpx.streams.conflation.Conflator
+        to only handle the latest mark price per symbol.
         
         Returns:
             Subscription message dict
@@ -129,3 +137,69 @@ class BaseWsPublic:
             "method": "UNSUBSCRIBE",
             "params": streams
         }
+
+    def subscribe_streams(
+        self, streams: List[str], max_streams: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Subscribe to many streams with as few messages as possible
+
+        Args:
+            streams: List of stream names (e.g. ["depth.SOL_USDC", "trades.SOL_USDC"])
+            max_streams: Maximal number of streams in one message,
+                defaults to MAX_STREAMS_PER_MESSAGE
+
+        Returns:
+            List of subscription message dicts
+        """
+        max_streams = max_streams or self.MAX_STREAMS_PER_MESSAGE
+        return [
+            {"method": "SUBSCRIBE", "params": chunk}
+            for chunk in chunk_streams(streams, max_streams)
+        ]
+
+    def unsubscribe_streams(
+        self, streams: List[str], max_streams: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Unsubscribe from many streams with as few messages as possible
+
+        Args:
+            streams: List of stream names to unsubscribe from
+            max_streams: Maximal number of streams in one message,
+                defaults to MAX_STREAMS_PER_MESSAGE
+
+        Returns:
+            List of unsubscribe message dicts
+        """
+        max_streams = max_streams or self.MAX_STREAMS_PER_MESSAGE
+        return [
+            {"method": "UNSUBSCRIBE", "params": chunk}
+            for chunk in chunk_streams(streams, max_streams)
+        ]
+
+    def combine_subscriptions(
+        self, messages: List[Dict[str, Any]], max_streams: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Pack messages built by the subscribe_* and unsubscribe methods
+        into as few messages as possible, keeping their order
+
+        Only consecutive messages with the same method are merged, so a stream
+        unsubscribed and then subscribed again ends up subscribed.
+
+        Args:
+            messages: List of subscription or unsubscribe message dicts
+            max_streams: Maximal number of streams in one message,
+                defaults to MAX_STREAMS_PER_MESSAGE
+
+        Returns:
+            List of subscription and unsubscribe message dicts
+        """
+        combined = []
+        for method, streams in subscription_runs(messages):
+            if method == "UNSUBSCRIBE":
+                combined.extend(self.unsubscribe_streams(streams, max_streams))
+            else:
+                combined.extend(self.subscribe_streams(streams, max_streams))
+        return combined
@@ -0,0 +1,179 @@
+from time import time
+from typing import Dict, Optional, Tuple, Union
+from bpx.base.base_account import BaseAccount
+from bpx.constants.enums import (
+    OrderTypeEnum,
+    OrderTypeType,
+    SelfTradePreventionEnum,
+    SelfTradePreventionType,
+    SideEnum,
+    SideType,
+    TimeInForceEnum,
+    TimeInForceType,
+)
+from bpx.exceptions import (
+    EmptyOrderQuantityError,
+    InvalidSelfTradePreventionError,
+    InvalidTimeInForceValue,
+    OrderQuantityError,
+    OrderQuantityNotSpecifiedError,
+)
+from bpx.metrics.instrumentation import SIGN, now_ns
+from bpx.models.objects import RequestConfiguration
+
+INSTRUCTION = "orderExecute"
+
+
+class OrderTemplate:
+    """
+    Order with validated static fields, building signed order requests from
+    the fields which change between orders
+
+    The static parameters, the signing string layouts and the url are computed
+    once, build only fills in the quantity, price and client id, signs and
+    returns the same RequestConfiguration as BaseAccount.execute_order.
+
+    Usage:
+        template = OrderTemplate(
+            account, "SOL_USDC", "Bid", "Limit", time_in_force="GTC", post_only=True
+        )
+        request_config = template.build("1.25", price="150.10", client_id=7)
+        account.execute_template(template, "1.25", price="150.10")  # bpx.account
+    """
+
+    def __init__(
+        self,
+        account: BaseAccount,
+        symbol: str,
+        side: Union[SideEnum, SideType],
+        order_type: Union[OrderTypeEnum, OrderTypeType],
+        time_in_force: Optional[Union[TimeInForceEnum, TimeInForceType]] = None,
+        trigger_price: Optional[str] = None,
+        self_trade_prevention: Optional[
+            Union[SelfTradePreventionEnum, SelfTradePreventionType]
+        ] = None,
+        post_only: Optional[bool] = None,
+        reduce_only: Optional[bool] = None,
+        auto_borrow: Optional[bool] = None,
+        auto_borrow_repay: Optional[bool] = None,
+        auto_lend: Optional[bool] = None,
+        auto_lend_redeem: Optional[bool] = None,
+        window: Optional[int] = None,
+    ):
+        """
+        Args:
+            account: Account signing the orders
+            symbol: Market symbol
+            side: "Bid" or "Ask"
+            order_type: "Limit" or "Market"
+            window: Default window of the requests, the window of the account if None
+
+        The other arguments are the ones of BaseAccount.execute_order.
+        """
+        if not SideEnum.has_value(side):
+            raise ValueError(f"Invalid side {side}")
+        if not OrderTypeEnum.has_value(order_type):
+            raise ValueError(f"Invalid order type {order_type}")
+        params = {"symbol": symbol, "side": str(side), "orderType": str(order_type)}
+        if SelfTradePreventionEnum.has_value(self_trade_prevention):
+            params["selfTradePrevention"] = self_trade_prevention
+        elif self_trade_prevention:
+            raise InvalidSelfTradePreventionError(self_trade_prevention)
+        if trigger_price:
+            params["triggerPrice"] = trigger_price
+        if post_only:
+            params["postOnly"] = True
+        if TimeInForceEnum.has_value(time_in_force):
+            params["timeInForce"] = time_in_force
+        elif time_in_force:
+            raise InvalidTimeInForceValue(time_in_force)
+        if reduce_only:
+            params["reduceOnly"] = reduce_only
+        if auto_borrow:
+            params["autoBorrow"] = auto_borrow
+        if auto_borrow_repay:
+            params["autoBorrowRepay"] = auto_borrow_repay
+        if auto_lend:
+            params["autoLend"] = auto_lend
+        if auto_lend_redeem:
+            params["autoLendRedeem"] = auto_lend_redeem
+        self.account = account
+        self.params = params
+        self.is_market = params["orderType"] == OrderTypeEnum.MARKET
+        self.window = window
+        self.url = account.BPX_API_URL + "api/v1/order"
+        self._layouts: Dict[Tuple[str, ...], str] = {}
+
+    def build(
+        self,
+        quantity: Optional[str] = None,
+        price: Optional[str] = None,
+        client_id: Optional[int] = None,
+        quote_quantity: Optional[str] = None,
+        window: Optional[int] = None,
+    ) -> RequestConfiguration:
+        """
+        Returns the url, headers and request parameters for placing an order of the template
+
+        Args:
+            quantity: Order quantity
+            price: Limit price, ignored by market orders
+            client_id: Client order id
+            quote_quantity: Quote quantity of market orders, instead of quantity
+            window: Window of the request, the window of the template if None
+        """
+        dynamic = {}
+        if self.is_market:
+            if not quantity and not quote_quantity:
+                raise EmptyOrderQuantityError()
+            if quantity and quote_quantity:
+                raise OrderQuantityError()
+            if quote_quantity:
+                dynamic["quoteQuantity"] = quote_quantity
+            if quantity:
+                dynamic["quantity"] = quantity
+        else:
+            if not quantity:
+                raise OrderQuantityNotSpecifiedError()
+            dynamic["quantity"] = quantity
+            if price:
+                dynamic["price"] = price
+        if client_id:
+            dynamic["clientId"] = client_id
+
+        account = self.account
+        if window is None:
+            window = self.window if self.window is not None else account.window
+        timestamp = int(time() * 1e3)
+        sign_str = self._layout(tuple(dynamic)).format(*dynamic.values())
+        if account.instrumentation is None:
+            encoded_signature = account._sign_message(sign_str, timestamp, window)
+        else:
+            started = now_ns()
+            encoded_signature = account._sign_message(sign_str, timestamp, window)
+            account.instrumentation.record(SIGN, now_ns() - started, INSTRUCTION)
+        headers = account._signed_headers(encoded_signature, timestamp, window)
+        return RequestConfiguration(
+            url=self.url,
+            headers=headers,
+            data={**self.params, **dynamic},
+            method="POST",
+        )
+
+    def _layout(self, keys: Tuple[str, ...]) -> str:
+        # signing string of the template with positional fields for the given keys
+        layout = self._layouts.get(keys)
+        if layout is None:
+            fields = {}
+            for key, value in self.params.items():
+                if isinstance(value, bool):
+                    value = str(value).lower()
+                fields[key] = str(value).replace("{", "{{").replace("}", "}}")
+            for position, key in enumerate(keys):
+                fields[key] = "{%d}" % position
+            layout = "&".join(
+                [f"instruction={INSTRUCTION}"]
+                + [f"{key}={fields[key]}" for key in sorted(fields)]
+            )
+            self._layouts[keys] = layout
+        return layout
@@ -0,0 +1,44 @@
+"""
+Packing of WebSocket stream subscriptions into few messages, shared by the
+public and the account WebSocket clients
+"""
+
+from typing import Any, Dict, List, Tuple
+
+
+def chunk_streams(streams: List[str], max_streams: int) -> List[List[str]]:
+    """
+    Splits streams into chunks of at most max_streams, dropping duplicates
+
+    Args:
+        streams: List of stream names
+        max_streams: Maximal number of streams in one chunk
+    """
+    if max_streams < 1:
+        raise ValueError("max_streams must be positive")
+    unique = list(dict.fromkeys(streams))
+    return [unique[i : i + max_streams] for i in range(0, len(unique), max_streams)]
+
+
+def subscription_runs(messages: List[Dict[str, Any]]) -> List[Tuple[str, List[str]]]:
+    """
+    Groups the streams of consecutive messages with the same method
+
+    Messages are only merged with their neighbours so that the runs keep the
+    order of the messages: unsubscribing and then subscribing a stream leaves
+    it subscribed.
+
+    Args:
+        messages: List of subscription or unsubscribe message dicts
+
+    Returns:
+        List of (method, streams) tuples
+    """
+    runs: List[Tuple[str, List[str]]] = []
+    for message in messages:
+        method = message.get("method", "SUBSCRIBE")
+        if runs and runs[-1][0] == method:
+            runs[-1][1].extend(message.get("params", []))
+        else:
+            runs.append((method, list(message.get("params", []))))
+    return runs
@@ -252,3 +252,33 @@ class OrderTypeEnum(str, Enum):
 
 
 OrderTypeType = Literal["Market", "Limit"]
+
+
+class SideEnum(str, Enum):
+    BID = "Bid"
+    ASK = "Ask"
+
+    @classmethod
+    def has_value(cls, value):
+        return value in cls._value2member_map_
+
+    def __str__(self):
+        return self.value
+
+
+SideType = Literal["Bid", "Ask"]
+
+
+class ColumnarFormatEnum(str, Enum):
+    NUMPY = "numpy"
+    ARROW = "arrow"
+
+    @classmethod
+    def has_value(cls, value):
+        return value in cls._value2member_map_
+
+    def __str__(self):
+        return self.value
+
+
+ColumnarFormatType = Literal["numpy", "arrow"]
@@ -77,3 +77,18 @@ class OrderQuantityNotSpecifiedError(Exception):
             f"Order quantity must be specified for limit order"
             f"See the documentation for more details: {documentation_url}"
         )
+
+
+class StreamClosedError(Exception):
+    """Exception when reading from a stream which is closed and drained"""
+
+    def __init__(self):
+        super().__init__("Stream is closed")
+
+
+class UnexpectedResponseError(Exception):
+    """Exception when a response is not of the expected shape, e.g. an error instead of a page"""
+
+    def __init__(self, response):
+        self.response = response
+        super().__init__(f"Unexpected response {response!r}")
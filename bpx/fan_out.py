@@ -0,0 +1,160 @@
+"""
+Concurrent requests over many symbols
+
+fan_out runs a request per symbol in a thread pool, afan_out on the event loop
+with a semaphore. Both cap the number of requests in flight, optionally pace
+them with a RateLimiter shared between calls, and return the responses by
+symbol next to the errors by symbol: exceptions raised by the request and error
+responses of the exchange as UnexpectedResponseError.
+
+asyncio and concurrent.futures are imported on use, importing the Public
+clients stays cheap.
+"""
+
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+from bpx.exceptions import UnexpectedResponseError
+
+
+class RateLimiter:
+    """
+    Token bucket allowing rate requests per second on average and bursts of
+    burst requests, shared by threads and coroutines
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Requests per second
+            burst: Requests which can be sent at once after an idle period
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token and returns the seconds to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        import asyncio
+
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class FanOutResult(NamedTuple):
+    results: Dict[str, Any]
+    errors: Dict[str, Exception]
+
+
+def _check_concurrency(concurrency: int):
+    if concurrency < 1:
+        raise ValueError("concurrency must be positive")
+
+
+def _is_error(response: Any) -> bool:
+    return isinstance(response, dict) and "code" in response and "message" in response
+
+
+def fan_out(
+    request: Callable[[str], Any],
+    symbols: Iterable[str],
+    concurrency: int = 8,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> FanOutResult:
+    """
+    Calls request(symbol) for every symbol in a thread pool
+
+    Args:
+        request: Sync request of one symbol, e.g. Public.get_depth
+        symbols: Symbols to request
+        concurrency: Maximal number of requests in flight
+        rate_limiter: Paces the requests if given
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    _check_concurrency(concurrency)
+    symbols = list(dict.fromkeys(symbols))
+    result = FanOutResult({}, {})
+
+    def call(symbol: str):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return request(symbol)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, max(1, len(symbols)))) as pool:
+        futures = {symbol: pool.submit(call, symbol) for symbol in symbols}
+        for symbol, future in futures.items():
+            try:
+                response = future.result()
+            except Exception as e:
+                result.errors[symbol] = e
+                continue
+            _collect(result, symbol, response)
+    return result
+
+
+async def afan_out(
+    request: Callable[[str], Awaitable[Any]],
+    symbols: Iterable[str],
+    concurrency: int = 8,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> FanOutResult:
+    """
+    Awaits request(symbol) for every symbol concurrently, see fan_out
+
+    Args:
+        request: Async request of one symbol, e.g. the get_depth of bpx.async_.public.Public
+    """
+    import asyncio
+
+    _check_concurrency(concurrency)
+    symbols = list(dict.fromkeys(symbols))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(symbol: str):
+        async with semaphore:
+            if rate_limiter is not None:
+                await rate_limiter.acquire_async()
+            return await request(symbol)
+
+    responses = await asyncio.gather(
+        *(call(symbol) for symbol in symbols), return_exceptions=True
+    )
+    result = FanOutResult({}, {})
+    for symbol, response in zip(symbols, responses):
+        if isinstance(response, BaseException):
+            if not isinstance(response, Exception):
+                raise response
+            result.errors[symbol] = response
+        else:
+            _collect(result, symbol, response)
+    return result
+
+
+def _collect(result: FanOutResult, symbol: str, response: Any):
+    if _is_error(response):
+        result.errors[symbol] = UnexpectedResponseError(response)
+    else:
+        result.results[symbol] = response
@@ -1,6 +1,18 @@
 import aiohttp
-from typing import Union, List, Dict, Any, Awaitable
+from types import SimpleNamespace
+from typing import Union, List, Dict, Any, Optional
 from bpx.http_client.base.http_client import HttpClient
+from bpx.metrics.instrumentation import (
+    CONNECT,
+    DECODE,
+    FIRST_BYTE,
+    QUEUE_WAIT,
+    TOTAL,
+    Instrumentation,
+    now_ns,
+)
+from bpx.http_client.raw import RawResponse, raw_mode
+from bpx.sans_io import decode_body
 import json
 import certifi
 import ssl
@@ -8,30 +20,45 @@ import ssl
 
 class AsyncHttpClient(HttpClient):
 
-    def __init__(self, proxy: str = ""):
+    def __init__(
+        self,
+        proxy: str = "",
+        instrumentation: Optional[Instrumentation] = None,
+        raw: bool = False,
+    ):
+        """
+        Args:
+            proxy: Proxy url, none if empty
+            instrumentation: Records the latency phases of the requests
+            raw: Return every response as a RawResponse, see bpx.http_client.raw
+        """
         self.proxy = proxy
+        self.instrumentation = instrumentation
+        self.raw = raw
+        self._trace_config: Optional[aiohttp.TraceConfig] = None
+        self._traced: Optional[Instrumentation] = None
 
     async def get(
         self, url, headers=None, params=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        started = now_ns()
         ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            trace_configs=self._trace_configs()
+        ) as session:
             async with session.get(
                 url, proxy=self.proxy, params=params, headers=headers, ssl=ssl_context
             ) as response:
-
-                try:
-                    return await response.json()
-                except json.JSONDecodeError:
-                    return await response.text()
-                except aiohttp.client_exceptions.ContentTypeError:
-                    return await response.text()
+                return await self._result(response, started)
 
     async def post(
         self, url, headers=None, data=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        started = now_ns()
         ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            trace_configs=self._trace_configs()
+        ) as session:
             async with session.post(
                 url,
                 proxy=self.proxy,
@@ -39,19 +66,16 @@ class AsyncHttpClient(HttpClient):
                 data=json.dumps(data),
                 ssl=ssl_context,
             ) as response:
-
-                try:
-                    return await response.json()
-                except json.JSONDecodeError:
-                    return await response.text()
-                except aiohttp.client_exceptions.ContentTypeError:
-                    return await response.text()
+                return await self._result(response, started)
 
     async def delete(
         self, url, headers=None, data=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        started = now_ns()
         ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            trace_configs=self._trace_configs()
+        ) as session:
             async with session.delete(
                 url,
                 proxy=self.proxy,
@@ -59,17 +83,14 @@ class AsyncHttpClient(HttpClient):
                 data=json.dumps(data),
                 ssl=ssl_context,
             ) as response:
-
-                try:
-                    return await response.json()
-                except json.JSONDecodeError:
-                    return await response.text()
-                except aiohttp.client_exceptions.ContentTypeError:
-                    return await response.text()
+                return await self._result(response, started)
 
     async def patch(self, url, headers=None, data=None):
+        started = now_ns()
         ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            trace_configs=self._trace_configs()
+        ) as session:
             async with session.patch(
                 url,
                 proxy=self.proxy,
@@ -77,10 +98,76 @@ class AsyncHttpClient(HttpClient):
                 data=json.dumps(data),
                 ssl=ssl_context,
             ) as response:
+                return await self._result(response, started)
+
+    async def _result(
+        self, response: aiohttp.ClientResponse, started: int
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return await self._decode(response)
+        # read the body first so that only decoding is measured
+        await response.read()
+        decode_started = now_ns()
+        result = await self._decode(response)
+        finished = now_ns()
+        operation = response.url.path
+        instrumentation.record(DECODE, finished - decode_started, operation)
+        instrumentation.record(TOTAL, finished - started, operation)
+        return result
+
+    async def _decode(
+        self, response: aiohttp.ClientResponse
+    ) -> Union[Dict[str, Any], List[Any], str, RawResponse]:
+        body = await response.read()
+        if self.raw or raw_mode():
+            return RawResponse(response.status, response.headers, body)
+        return decode_body(body, response.content_type)
+
+    def _trace_configs(self) -> List[aiohttp.TraceConfig]:
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return []
+        if self._traced is not instrumentation:
+            self._trace_config = _latency_trace_config(instrumentation)
+            self._traced = instrumentation
+        return [self._trace_config]
+
+
+def _latency_trace_config(instrumentation: Instrumentation) -> aiohttp.TraceConfig:
+    """
+    Returns an aiohttp trace config recording the phases of every request
+    """
+    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+
+    async def on_request_start(session, context, params):
+        context.operation = params.url.path
+        context.started = now_ns()
+
+    async def on_connection_queued_start(session, context, params):
+        context.queued = now_ns()
+
+    async def on_connection_queued_end(session, context, params):
+        instrumentation.record(QUEUE_WAIT, now_ns() - context.queued, context.operation)
+
+    async def on_connection_create_start(session, context, params):
+        context.connecting = now_ns()
+
+    async def on_connection_create_end(session, context, params):
+        instrumentation.record(
+            CONNECT, now_ns() - context.connecting, context.operation
+        )
+
+    async def on_request_end(session, context, params):
+        # called once the response headers are received
+        instrumentation.record(
+            FIRST_BYTE, now_ns() - context.started, context.operation
+        )
 
-                try:
-                    return await response.json()
-                except json.JSONDecodeError:
-                    return await response.text()
-                except aiohttp.client_exceptions.ContentTypeError:
-                    return await response.text()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_queued_start.append(on_connection_queued_start)
+    trace_config.on_connection_queued_end.append(on_connection_queued_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
@@ -0,0 +1,158 @@
+import json
+import warnings
+from typing import Any, Dict, List, Optional, Union
+from bpx.http_client.base.http_client import HttpClient
+from bpx.metrics.instrumentation import DECODE, TOTAL, Instrumentation, now_ns
+from bpx.http_client.raw import RawResponse, raw_mode
+from bpx.sans_io import decode_body
+
+
+def _httpx():
+    # httpx is an optional dependency, imported when a client is created
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("HttpxHttpClient requires the httpx package") from None
+    return httpx
+
+
+def _has_h2() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpxHttpClient(HttpClient):
+    """
+    Async HTTP client on a persistent httpx connection pool speaking HTTP/2
+
+    Unlike AsyncHttpClient, which opens a session per request, concurrent
+    requests are multiplexed as HTTP/2 streams over one warm TLS connection to
+    the API. Servers without HTTP/2 are spoken to in HTTP/1.1 with keep-alive.
+    Requires the httpx package with its http2 extra (pip install bpx-py[http2]),
+    without the h2 package the client warns and speaks HTTP/1.1 only.
+
+    Usage:
+        http_client = HttpxHttpClient()
+        account = Account(..., http_client=http_client)  # bpx.async_.account
+        await asyncio.gather(*(account.cancel_order(...) for ...))
+        await http_client.aclose()
+    """
+
+    def __init__(
+        self,
+        proxy: str = "",
+        instrumentation: Optional[Instrumentation] = None,
+        http2: bool = True,
+        max_connections: int = 10,
+        timeout: Optional[float] = 10.0,
+        raw: bool = False,
+    ):
+        """
+        Args:
+            proxy: Proxy url, none if empty
+            instrumentation: Records the total and decoding time of the requests
+            http2: Negotiate HTTP/2 with the server
+            max_connections: Maximal number of connections of the pool
+            timeout: Seconds before a request fails, no timeout if None
+            raw: Return every response as a RawResponse, see bpx.http_client.raw
+        """
+        _httpx()
+        if http2 and not _has_h2():
+            warnings.warn(
+                "HTTP/2 requires the h2 package (pip install httpx[http2]), "
+                "HttpxHttpClient falls back to HTTP/1.1",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            http2 = False
+        self.proxy = proxy
+        self.instrumentation = instrumentation
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.raw = raw
+        self._client = None
+        self._client_proxy: Optional[str] = None
+
+    async def get(
+        self, url, headers=None, params=None
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        return await self._request("GET", url, headers, params=params)
+
+    async def post(
+        self, url, headers=None, data=None
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        return await self._request("POST", url, headers, data=data)
+
+    async def delete(
+        self, url, headers=None, data=None
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        return await self._request("DELETE", url, headers, data=data)
+
+    async def patch(
+        self, url, headers=None, data=None
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        return await self._request("PATCH", url, headers, data=data)
+
+    async def aclose(self):
+        """
+        Closes the connections of the pool
+        """
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def __aenter__(self) -> "HttpxHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _session(self):
+        # the clients set proxy after construction, the pool follows it
+        proxy = self.proxy or None
+        if self._client is not None and self._client_proxy != proxy:
+            await self.aclose()
+        if self._client is None:
+            httpx = _httpx()
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                proxy=proxy,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections),
+            )
+            self._client_proxy = proxy
+        return self._client
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict],
+        params: Optional[dict] = None,
+        data: Optional[Any] = None,
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        started = now_ns()
+        content = None if method == "GET" else json.dumps(data)
+        session = await self._session()
+        response = await session.request(
+            method, url, headers=headers, params=params, content=content
+        )
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self._decode(response)
+        decode_started = now_ns()
+        result = self._decode(response)
+        finished = now_ns()
+        operation = response.url.path
+        instrumentation.record(DECODE, finished - decode_started, operation)
+        instrumentation.record(TOTAL, finished - started, operation)
+        return result
+
+    def _decode(self, response) -> Union[Dict[str, Any], List[Any], str, RawResponse]:
+        if self.raw or raw_mode():
+            return RawResponse(response.status_code, response.headers, response.content)
+        return decode_body(response.content, response.headers.get("content-type", ""))
@@ -0,0 +1,68 @@
+"""
+Raw responses for consumers passing response bodies through undecoded
+
+An http client created with raw=True, or any client inside a raw_responses()
+block, returns a RawResponse with the status, headers and body bytes of the
+response instead of the decoded JSON. The block form is per call: it holds for
+the current thread or asyncio task only.
+
+Usage:
+    with raw_responses():
+        response = public.get_depth("SOL_USDC")
+    sink.write(response.view)
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Mapping
+from bpx.sans_io import decode_body
+
+_raw = ContextVar("bpx_raw_responses", default=False)
+
+
+class RawResponse:
+    """
+    Undecoded response of an http client
+    """
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Mapping[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def view(self) -> memoryview:
+        """
+        The body without a copy, for writers and buffer protocol consumers
+        """
+        return memoryview(self.body)
+
+    def decode(self) -> Any:
+        """
+        Returns the body decoded like the clients do without raw mode
+        """
+        return decode_body(self.body)
+
+    def __repr__(self):
+        return f"RawResponse(status={self.status}, body={len(self.body)} bytes)"
+
+
+@contextmanager
+def raw_responses(enabled: bool = True) -> Iterator[None]:
+    """
+    Makes the http clients return RawResponse within the block
+    """
+    token = _raw.set(enabled)
+    try:
+        yield
+    finally:
+        _raw.reset(token)
+
+
+def raw_mode() -> bool:
+    """
+    Returns True inside a raw_responses() block
+    """
+    return _raw.get()
@@ -1,52 +1,101 @@
-import requests
-from typing import Dict, Any, List, Union
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
+from urllib.parse import urlsplit
 from bpx.http_client.base.http_client import HttpClient
-import json
+from bpx.metrics.instrumentation import (
+    DECODE,
+    FIRST_BYTE,
+    TOTAL,
+    Instrumentation,
+    now_ns,
+)
+from bpx.http_client.raw import RawResponse, raw_mode
+from bpx.sans_io import decode_body
+
+# requests is imported on first use to keep `import bpx` fast
+if TYPE_CHECKING:
+    import requests
 
 
 class SyncHttpClient(HttpClient):
-    def __init__(self, proxies: dict = None):
+    def __init__(
+        self,
+        proxies: dict = None,
+        instrumentation: Optional[Instrumentation] = None,
+        raw: bool = False,
+    ):
+        """
+        Args:
+            proxies: Proxies of requests
+            instrumentation: Records the latency phases of the requests
+            raw: Return every response as a RawResponse, see bpx.http_client.raw
+        """
         self.proxies = proxies
+        self.instrumentation = instrumentation
+        self.raw = raw
 
     def get(
         self, url, headers=None, params=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        import requests
+
+        started = now_ns()
         response = requests.get(
             url=url, proxies=self.proxies, headers=headers, params=params
         )
-
-        try:
-            return response.json()
-        except json.JSONDecodeError:
-            return response.text
+        return self._result(response, started)
 
     def post(
         self, url, headers=None, data=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        import requests
+
+        started = now_ns()
         response = requests.post(
             url=url, proxies=self.proxies, headers=headers, json=data
         )
-        try:
-            return response.json()
-        except json.JSONDecodeError:
-            return response.text
+        return self._result(response, started)
 
     def delete(
         self, url, headers=None, data=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        import requests
+
+        started = now_ns()
         response = requests.delete(
             url, proxies=self.proxies, headers=headers, json=data
         )
-        try:
-            return response.json()
-        except json.JSONDecodeError:
-            return response.text
+        return self._result(response, started)
 
     def patch(
         self, url, headers=None, data=None
     ) -> Union[Dict[str, Any], List[Any], str]:
+        import requests
+
+        started = now_ns()
         response = requests.patch(url, proxies=self.proxies, headers=headers, json=data)
-        try:
-            return response.json()
-        except json.JSONDecodeError:
-            return response.text
+        return self._result(response, started)
+
+    def _result(
+        self, response: "requests.Response", started: int
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self._decode(response)
+        operation = urlsplit(response.url).path
+        decode_started = now_ns()
+        result = self._decode(response)
+        finished = now_ns()
+        # requests measures the time until the response headers are parsed
+        instrumentation.record(
+            FIRST_BYTE, int(response.elapsed.total_seconds() * 1e9), operation
+        )
+        instrumentation.record(DECODE, finished - decode_started, operation)
+        instrumentation.record(TOTAL, finished - started, operation)
+        return result
+
+    def _decode(
+        self, response: "requests.Response"
+    ) -> Union[Dict[str, Any], List[Any], str, RawResponse]:
+        if self.raw or raw_mode():
+            return RawResponse(response.status_code, response.headers, response.content)
+        return decode_body(response.content)
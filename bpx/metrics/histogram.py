@@ -0,0 +1,213 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class Histogram:
+    """
+    Log-linear histogram of non-negative integers with bounded relative error,
+    in the spirit of HdrHistogram
+
+    Values below 2 * 10 ** significant_figures are counted exactly, larger ones
+    in buckets whose width is a power of two and at most 10 ** -significant_figures
+    of their value, so memory does not depend on the number of recorded values.
+    Recording is a few integer operations, the histogram is not thread safe.
+    """
+
+    def __init__(self, significant_figures: int = 2, max_value: int = 60 * 10**9):
+        """
+        Args:
+            significant_figures: Number of significant decimal digits kept (1 to 5)
+            max_value: Highest trackable value, larger values are counted as max_value
+        """
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        if max_value < 1:
+            raise ValueError("max_value must be positive")
+        self.significant_figures = significant_figures
+        self.max_value = max_value
+        self._sub_bits = (2 * 10**significant_figures - 1).bit_length()
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count >> 1
+        self.counts: List[int] = [0] * (self._index(max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def record(self, value: int, count: int = 1):
+        """
+        Records a value, count times
+        """
+        if value < 0:
+            raise ValueError("value must not be negative")
+        if value > self.max_value:
+            value = self.max_value
+        self.counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percentile: float) -> Optional[int]:
+        """
+        Returns the value at or below which the given percentage of the values lie,
+        None if nothing was recorded
+
+        Args:
+            percentile: Percentage between 0 and 100
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not self.count:
+            return None
+        target = max(1, -(-self.count * percentile // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(self._highest(index), self.max)
+        return self.max
+
+    def percentiles(self, percentiles=(50, 90, 99, 99.9)) -> Dict[float, Optional[int]]:
+        """
+        Returns several percentiles with a single pass over the buckets
+        """
+        if not self.count:
+            return {p: None for p in percentiles}
+        targets = sorted((max(1, -(-self.count * p // 100)), p) for p in percentiles)
+        result: Dict[float, Optional[int]] = {}
+        seen = 0
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(targets) and seen >= targets[position][0]:
+                result[targets[position][1]] = min(self._highest(index), self.max)
+                position += 1
+            if position == len(targets):
+                break
+        return {p: result.get(p, self.max) for p in percentiles}
+
+    def merge(self, other: "Histogram"):
+        """
+        Adds the values of a histogram with the same configuration
+        """
+        if (other.significant_figures, other.max_value) != (
+            self.significant_figures,
+            self.max_value,
+        ):
+            raise ValueError("Histograms must have the same configuration")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return (
+            self._sub_count + (shift - 1) * self._half + (value >> shift) - self._half
+        )
+
+    def _highest(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        shift, sub = divmod(index - self._sub_count, self._half)
+        shift += 1
+        return ((sub + self._half + 1) << shift) - 1
+
+
+class RollingHistogram:
+    """
+    Histogram of the values recorded during the last window seconds
+
+    The window is split into slices of window / slices seconds, each with its
+    own Histogram, the slices older than the window are dropped when a new
+    one starts. Queries merge the live slices.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        slices: int = 6,
+        significant_figures: int = 2,
+        max_value: int = 60 * 10**6,
+    ):
+        """
+        Args:
+            window: Length of the window in seconds
+            slices: Number of slices the window is split into
+            significant_figures: Precision of the histograms
+            max_value: Highest trackable value
+        """
+        if window <= 0 or slices < 1:
+            raise ValueError("window and slices must be positive")
+        self.window = window
+        self.slices = slices
+        self.significant_figures = significant_figures
+        self.max_value = max_value
+        self._slice_seconds = window / slices
+        self._histograms: Deque[Tuple[int, Histogram]] = deque()
+
+    def record(self, value: int, now: Optional[float] = None):
+        """
+        Records a value
+
+        Args:
+            value: Non-negative value
+            now: time.monotonic() of the value, now if None
+        """
+        slice_id = self._slice_id(now)
+        if not self._histograms or self._histograms[-1][0] != slice_id:
+            self._expire(slice_id)
+            self._histograms.append(
+                (slice_id, Histogram(self.significant_figures, self.max_value))
+            )
+        self._histograms[-1][1].record(value)
+
+    def histogram(self, now: Optional[float] = None) -> Histogram:
+        """
+        Returns the values of the window merged into one histogram
+        """
+        self._expire(self._slice_id(now))
+        merged = Histogram(self.significant_figures, self.max_value)
+        for _, histogram in self._histograms:
+            merged.merge(histogram)
+        return merged
+
+    def percentiles(
+        self, percentiles=(50, 90, 99, 99.9), now: Optional[float] = None
+    ) -> Dict[float, Optional[int]]:
+        return self.histogram(now).percentiles(percentiles)
+
+    def _slice_id(self, now: Optional[float]) -> int:
+        if now is None:
+            now = time.monotonic()
+        return int(now // self._slice_seconds)
+
+    def _expire(self, slice_id: int):
+        while self._histograms and self._histograms[0][0] <= slice_id - self.slices:
+            self._histograms.popleft()
@@ -0,0 +1,212 @@
+"""
+Latency instrumentation of the REST and WebSocket clients
+
+Clients record the duration of each phase of a request or message into an
+Instrumentation instance when one is given, and skip every measurement when
+it is None (the default):
+
+    SIGN        signing the request (BaseAccount._headers)
+    QUEUE_WAIT  waiting for a free connection of the pool (async client)
+    CONNECT     opening a connection, TLS included (async client)
+    FIRST_BYTE  from sending the request to receiving the response headers
+    DECODE      decoding a response body or a WebSocket frame
+    CALLBACK    running on_message for a WebSocket frame
+    TOTAL       a whole REST call
+
+Durations are in nanoseconds. The operation label is the instruction for
+SIGN, the URL path for REST phases and the stream name for WebSocket phases.
+
+Usage:
+    instrumentation = Instrumentation()
+    account = Account(public_key, secret_key, instrumentation=instrumentation)
+    ...
+    print(instrumentation.summary())
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from bpx.metrics.histogram import Histogram
+
+SIGN = "sign"
+QUEUE_WAIT = "queue_wait"
+CONNECT = "connect"
+FIRST_BYTE = "first_byte"
+DECODE = "decode"
+CALLBACK = "callback"
+TOTAL = "total"
+
+PHASES = (SIGN, QUEUE_WAIT, CONNECT, FIRST_BYTE, DECODE, CALLBACK, TOTAL)
+
+Exporter = Callable[[str, str, int], None]
+
+now_ns = time.perf_counter_ns
+
+
+class Instrumentation:
+    """
+    Per phase and operation latency histograms with exporter hooks
+
+    Every exporter is called with (phase, operation, duration ns) for each recorded
+    duration, see PrometheusExporter and OpenTelemetryExporter.
+    """
+
+    def __init__(
+        self,
+        exporters: Iterable[Exporter] = (),
+        significant_figures: int = 2,
+        max_value_ns: int = 60 * 10**9,
+        by_operation: bool = True,
+    ):
+        """
+        Args:
+            exporters: Callables receiving every recorded duration
+            significant_figures: Precision of the histograms
+            max_value_ns: Highest trackable duration
+            by_operation: Keep one histogram per operation, otherwise one per phase
+        """
+        self.exporters: List[Exporter] = list(exporters)
+        self.significant_figures = significant_figures
+        self.max_value_ns = max_value_ns
+        self.by_operation = by_operation
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def record(self, phase: str, duration_ns: int, operation: str = ""):
+        """
+        Records the duration of a phase
+        """
+        if not self.by_operation:
+            operation = ""
+        key = (phase, operation)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(
+                self.significant_figures, self.max_value_ns
+            )
+        histogram.record(max(0, duration_ns))
+        for exporter in self.exporters:
+            exporter(phase, operation, duration_ns)
+
+    def histogram(self, phase: str, operation: Optional[str] = None) -> Histogram:
+        """
+        Returns the histogram of a phase and operation, or of all operations
+        of the phase merged together if operation is None
+        """
+        if operation is not None:
+            return self.histograms.get(
+                (phase, operation),
+                Histogram(self.significant_figures, self.max_value_ns),
+            )
+        merged = Histogram(self.significant_figures, self.max_value_ns)
+        for (recorded_phase, _), histogram in self.histograms.items():
+            if recorded_phase == phase:
+                merged.merge(histogram)
+        return merged
+
+    def summary(
+        self, percentiles: Iterable[float] = (50, 90, 99, 99.9)
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Returns count, mean, max and percentiles in microseconds
+        for every phase and operation, keyed "phase" or "phase:operation"
+        """
+        summary = {}
+        for (phase, operation), histogram in sorted(self.histograms.items()):
+            values = histogram.percentiles(tuple(percentiles))
+            key = f"{phase}:{operation}" if operation else phase
+            summary[key] = {
+                "count": histogram.count,
+                "mean": histogram.mean() / 1000,
+                "max": histogram.max / 1000,
+                **{f"p{p:g}": value / 1000 for p, value in values.items()},
+            }
+        return summary
+
+    def reset(self):
+        self.histograms.clear()
+
+
+class PrometheusExporter:
+    """
+    Exports the recorded durations to a prometheus_client histogram
+    labelled by phase and operation
+    """
+
+    DEFAULT_BUCKETS = (
+        0.00001,
+        0.00005,
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+    )
+
+    def __init__(
+        self,
+        name: str = "bpx_latency_seconds",
+        registry=None,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Args:
+            name: Metric name
+            registry: prometheus_client registry, the default registry if None
+            buckets: Histogram bucket bounds in seconds
+        """
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError(
+                "PrometheusExporter requires the prometheus_client package"
+            ) from None
+        kwargs = {} if registry is None else {"registry": registry}
+        self.metric = prometheus_client.Histogram(
+            name,
+            "Latency of bpx client phases",
+            ["phase", "operation"],
+            buckets=tuple(buckets),
+            **kwargs,
+        )
+
+    def __call__(self, phase: str, operation: str, duration_ns: int):
+        self.metric.labels(phase, operation).observe(duration_ns / 1e9)
+
+
+class OpenTelemetryExporter:
+    """
+    Exports the recorded durations to an OpenTelemetry histogram instrument
+    with phase and operation attributes
+    """
+
+    def __init__(self, meter=None, name: str = "bpx.client.latency"):
+        """
+        Args:
+            meter: OpenTelemetry meter, the one of the global meter provider if None
+            name: Instrument name
+        """
+        try:
+            from opentelemetry import metrics
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryExporter requires the opentelemetry-api package"
+            ) from None
+        if meter is None:
+            meter = metrics.get_meter("bpx")
+        self.instrument = meter.create_histogram(
+            name, unit="s", description="Latency of bpx client phases"
+        )
+
+    def __call__(self, phase: str, operation: str, duration_ns: int):
+        self.instrument.record(
+            duration_ns / 1e9, {"phase": phase, "operation": operation}
+        )
@@ -0,0 +1,295 @@
+"""
+Exchange-to-client latency of WebSocket stream messages
+
+The WebSocket clients stamp every frame with its wall clock and monotonic
+receive time when a StreamLatencyMonitor is given. The monitor compares the
+event time of the payload, corrected by the offset between the exchange and
+the local clock, with the receive time (exchange to receive), and the receive
+time with the moment the handlers returned (receive to handler), keeping
+rolling percentiles per stream. The frames are taken off the connection as
+they arrive, see StampedFrames, so a backlog behind a slow handler shows as
+receive to handler and not as network latency.
+
+Usage:
+    offset = measure_clock_offset(Public().get_time)
+    monitor = StreamLatencyMonitor(clock_offset_ms=offset.offset_ms)
+    ws = WsPublic(on_message=handler, latency_monitor=monitor)
+    ...
+    print(monitor.summary())
+"""
+
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from bpx.metrics.histogram import RollingHistogram
+from bpx.metrics.instrumentation import now_ns
+
+# event times below this value are in milliseconds, above in microseconds
+_MICROSECONDS_THRESHOLD = 10**14
+
+# frames stamped ahead of the handlers, beyond it the frames wait on the
+# connection and their wait counts as exchange to receive
+STAMPED_FRAMES_MAX = 1024
+
+
+class ClockOffset(NamedTuple):
+    # exchange clock minus local clock
+    offset_ms: float
+    # round trip time of the sample the offset was taken from
+    rtt_ms: float
+
+
+def _offset_sample(
+    server_time: Union[int, str], sent_ns: int, received_ns: int
+) -> ClockOffset:
+    midpoint_ms = (sent_ns + received_ns) / 2e6
+    return ClockOffset(
+        float(int(server_time)) - midpoint_ms, (received_ns - sent_ns) / 1e6
+    )
+
+
+def measure_clock_offset(
+    get_time: Callable[[], Union[int, str]], samples: int = 5
+) -> ClockOffset:
+    """
+    Estimates the exchange clock offset from the sample with the lowest round trip time
+
+    Args:
+        get_time: Returns the exchange time in ms, e.g. Public().get_time
+        samples: Number of requests
+    """
+    best = None
+    for _ in range(samples):
+        sent = time.time_ns()
+        server_time = get_time()
+        sample = _offset_sample(server_time, sent, time.time_ns())
+        if best is None or sample.rtt_ms < best.rtt_ms:
+            best = sample
+    return best
+
+
+async def async_measure_clock_offset(
+    get_time: Callable[[], Awaitable[Union[int, str]]], samples: int = 5
+) -> ClockOffset:
+    """
+    Estimates the exchange clock offset with an async time getter,
+    e.g. bpx.async_.public.Public().get_time
+    """
+    best = None
+    for _ in range(samples):
+        sent = time.time_ns()
+        server_time = await get_time()
+        sample = _offset_sample(server_time, sent, time.time_ns())
+        if best is None or sample.rtt_ms < best.rtt_ms:
+            best = sample
+    return best
+
+
+class StreamLatencyMonitor:
+    """
+    Rolling per stream percentiles of exchange-to-receive and receive-to-handler latency
+
+    Latencies are kept in microseconds. Exchange-to-receive latencies which come
+    out negative because of clock errors are counted in negative and recorded as 0.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        slices: int = 6,
+        clock_offset_ms: float = 0.0,
+        timestamp_field: str = "E",
+    ):
+        """
+        Args:
+            window: Seconds covered by the percentiles
+            slices: Number of slices of the rolling window
+            clock_offset_ms: Exchange clock minus local clock, see measure_clock_offset
+            timestamp_field: Payload field holding the exchange time,
+                "E" for the event time or "T" for the engine time
+        """
+        self.window = window
+        self.slices = slices
+        self.clock_offset_ms = clock_offset_ms
+        self.timestamp_field = timestamp_field
+        self.exchange_to_receive: Dict[str, RollingHistogram] = {}
+        self.receive_to_handler: Dict[str, RollingHistogram] = {}
+        self.negative = 0
+
+    def record(
+        self,
+        message: Any,
+        received_ns: int,
+        received_monotonic_ns: int,
+        handled_monotonic_ns: Optional[int] = None,
+    ):
+        """
+        Records the latencies of a decoded stream message
+
+        Args:
+            message: Decoded message, {"stream": ..., "data": {...}}
+            received_ns: time.time_ns() when the frame was received
+            received_monotonic_ns: time.perf_counter_ns() when the frame was received
+            handled_monotonic_ns: time.perf_counter_ns() when the handlers
+                of the message returned, now if None
+        """
+        if not isinstance(message, dict):
+            return
+        stream = message.get("stream")
+        if stream is None:
+            return
+        if handled_monotonic_ns is None:
+            handled_monotonic_ns = now_ns()
+        now = time.monotonic()
+        self._histogram(self.receive_to_handler, stream).record(
+            max(0, handled_monotonic_ns - received_monotonic_ns) // 1000, now
+        )
+        data = message.get("data")
+        event_time = data.get(self.timestamp_field) if isinstance(data, dict) else None
+        if event_time is None:
+            return
+        event_time = int(event_time)
+        if event_time < _MICROSECONDS_THRESHOLD:
+            event_time *= 1000
+        latency = received_ns // 1000 + int(self.clock_offset_ms * 1000) - event_time
+        if latency < 0:
+            self.negative += 1
+            latency = 0
+        self._histogram(self.exchange_to_receive, stream).record(latency, now)
+
+    def percentiles(
+        self, stream: str, percentiles: Tuple[float, ...] = (50, 90, 99, 99.9)
+    ) -> Dict[str, Dict[float, Optional[int]]]:
+        """
+        Returns the rolling percentiles of a stream in microseconds
+        """
+        result = {}
+        for name, histograms in (
+            ("exchange_to_receive", self.exchange_to_receive),
+            ("receive_to_handler", self.receive_to_handler),
+        ):
+            histogram = histograms.get(stream)
+            result[name] = (
+                histogram.percentiles(percentiles)
+                if histogram is not None
+                else {p: None for p in percentiles}
+            )
+        return result
+
+    def summary(
+        self, percentiles: Tuple[float, ...] = (50, 90, 99, 99.9)
+    ) -> Dict[str, Dict[str, Dict[str, Optional[int]]]]:
+        """
+        Returns count, max and percentiles in microseconds of every stream
+        """
+        summary: Dict[str, Dict[str, Dict[str, Optional[int]]]] = {}
+        for name, histograms in (
+            ("exchange_to_receive", self.exchange_to_receive),
+            ("receive_to_handler", self.receive_to_handler),
+        ):
+            for stream, rolling in sorted(histograms.items()):
+                histogram = rolling.histogram()
+                values = histogram.percentiles(percentiles)
+                summary.setdefault(stream, {})[name] = {
+                    "count": histogram.count,
+                    "max": histogram.max,
+                    **{f"p{p:g}": value for p, value in values.items()},
+                }
+        return summary
+
+    async def sync_clock(
+        self,
+        get_time: Callable[[], Awaitable[Union[int, str]]],
+        interval: float = 300.0,
+        samples: int = 5,
+    ):
+        """
+        Re-estimates the clock offset every interval seconds until cancelled
+
+        Args:
+            get_time: Async exchange time getter, e.g. bpx.async_.public.Public().get_time
+            interval: Seconds between estimates
+            samples: Requests per estimate
+        """
+        while True:
+            offset = await async_measure_clock_offset(get_time, samples)
+            self.clock_offset_ms = offset.offset_ms
+            await asyncio.sleep(interval)
+
+    def _histogram(
+        self, histograms: Dict[str, RollingHistogram], stream: str
+    ) -> RollingHistogram:
+        histogram = histograms.get(stream)
+        if histogram is None:
+            histogram = histograms[stream] = RollingHistogram(self.window, self.slices)
+        return histogram
+
+
+class StampedFrames:
+    """
+    Frames of a WebSocket connection with their wall clock and monotonic
+    receive time
+
+    A reader task takes the frames off the connection as they arrive, while
+    the handlers of earlier frames run, so the time a frame waits for them is
+    not counted as exchange to receive. Handlers blocking the event loop hold
+    the reader too. An error of the connection, ConnectionClosed included, is
+    raised after the frames received before it.
+
+    Usage:
+        frames = StampedFrames(ws)
+        try:
+            async for message, received_ns, received_monotonic_ns in frames:
+                ...
+        finally:
+            frames.close()
+    """
+
+    def __init__(self, ws: AsyncIterator[Any], max_queue: int = STAMPED_FRAMES_MAX):
+        """
+        Args:
+            ws: WebSocket connection
+            max_queue: Maximal number of frames read ahead of the handlers
+        """
+        self._queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self._done = False
+        self._reader = asyncio.ensure_future(self._read(ws))
+
+    async def _read(self, ws: AsyncIterator[Any]):
+        try:
+            async for frame in ws:
+                await self._queue.put((frame, time.time_ns(), now_ns()))
+        except Exception as e:
+            await self._queue.put(e)
+        else:
+            await self._queue.put(None)
+
+    def __aiter__(self) -> "StampedFrames":
+        return self
+
+    async def __anext__(self) -> Tuple[Any, int, int]:
+        if self._done:
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is None or isinstance(item, Exception):
+            self._done = True
+            if item is None:
+                raise StopAsyncIteration
+            raise item
+        return item
+
+    def close(self):
+        """
+        Stops reading the connection
+        """
+        self._reader.cancel()
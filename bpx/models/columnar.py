@@ -0,0 +1,191 @@
+"""
+Columnar decoding of history pages
+
+Pages of fills, orders, funding payments and trades are converted into NumPy
+structured arrays or Arrow record batches with one typed column per field:
+decimal strings become float64, or int64 scaled by 10 ** decimals when decimals
+is given, timestamps become datetime64[ms] and ids int64. Missing values are
+NaN / NaT in float and time columns, 0 in integer columns and "" in strings.
+
+Pages are joined with numpy.concatenate(pages) or pyarrow.Table.from_batches(pages).
+"""
+
+import json
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+from bpx.constants.enums import ColumnarFormatEnum, ColumnarFormatType
+from bpx.http_client.raw import RawResponse
+
+
+class Column(NamedTuple):
+    name: str
+    key: str
+    # one of "decimal", "int", "bool", "time" or "str"
+    kind: str
+    # maximal length of "str" columns
+    width: int = 0
+
+
+FILL_COLUMNS = (
+    Column("trade_id", "tradeId", "int"),
+    Column("order_id", "orderId", "int"),
+    Column("client_id", "clientId", "int"),
+    Column("symbol", "symbol", "str", 32),
+    Column("side", "side", "str", 3),
+    Column("price", "price", "decimal"),
+    Column("quantity", "quantity", "decimal"),
+    Column("fee", "fee", "decimal"),
+    Column("fee_symbol", "feeSymbol", "str", 16),
+    Column("is_maker", "isMaker", "bool"),
+    Column("timestamp", "timestamp", "time"),
+)
+
+ORDER_COLUMNS = (
+    Column("id", "id", "int"),
+    Column("client_id", "clientId", "int"),
+    Column("symbol", "symbol", "str", 32),
+    Column("side", "side", "str", 3),
+    Column("order_type", "orderType", "str", 16),
+    Column("time_in_force", "timeInForce", "str", 3),
+    Column("status", "status", "str", 16),
+    Column("price", "price", "decimal"),
+    Column("trigger_price", "triggerPrice", "decimal"),
+    Column("quantity", "quantity", "decimal"),
+    Column("quote_quantity", "quoteQuantity", "decimal"),
+    Column("executed_quantity", "executedQuantity", "decimal"),
+    Column("executed_quote_quantity", "executedQuoteQuantity", "decimal"),
+    Column("created_at", "createdAt", "time"),
+)
+
+FUNDING_PAYMENT_COLUMNS = (
+    Column("subaccount_id", "subaccountId", "int"),
+    Column("symbol", "symbol", "str", 32),
+    Column("quantity", "quantity", "decimal"),
+    Column("funding_rate", "fundingRate", "decimal"),
+    Column("interval_end_timestamp", "intervalEndTimestamp", "time"),
+)
+
+TRADE_COLUMNS = (
+    Column("id", "id", "int"),
+    Column("price", "price", "decimal"),
+    Column("quantity", "quantity", "decimal"),
+    Column("quote_quantity", "quoteQuantity", "decimal"),
+    Column("timestamp", "timestamp", "time"),
+    Column("is_buyer_maker", "isBuyerMaker", "bool"),
+)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Columnar output requires the numpy package") from None
+    return numpy
+
+
+def _dtype(column: Column, decimals: Optional[int]) -> str:
+    if column.kind == "decimal":
+        return "float64" if decimals is None else "int64"
+    if column.kind == "int":
+        return "int64"
+    if column.kind == "bool":
+        return "bool"
+    if column.kind == "time":
+        return "datetime64[ms]"
+    return f"U{column.width}"
+
+
+def _values(column: Column, rows: List[Dict[str, Any]], decimals: Optional[int]):
+    key = column.key
+    kind = column.kind
+    if kind == "decimal":
+        if decimals is None:
+            # numpy parses the strings itself
+            return [
+                "nan" if value is None else value
+                for value in (row.get(key) for row in rows)
+            ]
+        return [_scaled(row.get(key), decimals) for row in rows]
+    if kind == "int":
+        return [int(row.get(key) or 0) for row in rows]
+    if kind == "bool":
+        return [bool(row.get(key)) for row in rows]
+    if kind == "time":
+        return [
+            "NaT" if value is None else value
+            for value in (row.get(key) for row in rows)
+        ]
+    return [row.get(key) or "" for row in rows]
+
+
+def _scaled(value: Optional[str], decimals: int) -> int:
+    if value is None:
+        return 0
+    return int(Decimal(value).scaleb(decimals).to_integral_value())
+
+
+def to_numpy(
+    rows: Union[List[Dict[str, Any]], bytes, str],
+    columns: Sequence[Column],
+    decimals: Optional[int] = None,
+):
+    """
+    Returns a page as a NumPy structured array
+
+    Args:
+        rows: Decoded page or its raw JSON body
+        columns: Columns of the array, e.g. FILL_COLUMNS
+        decimals: Scale of the int64 decimal columns, float64 columns if None
+    """
+    numpy = _numpy()
+    if isinstance(rows, (bytes, str)):
+        rows = json.loads(rows)
+    array = numpy.empty(
+        len(rows), dtype=[(column.name, _dtype(column, decimals)) for column in columns]
+    )
+    for column in columns:
+        array[column.name] = _values(column, rows, decimals)
+    return array
+
+
+def to_arrow(
+    rows: Union[List[Dict[str, Any]], bytes, str],
+    columns: Sequence[Column],
+    decimals: Optional[int] = None,
+):
+    """
+    Returns a page as an Arrow record batch, see to_numpy
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow output requires the pyarrow package") from None
+    array = to_numpy(rows, columns, decimals)
+    return pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array(array[column.name]) for column in columns],
+        names=[column.name for column in columns],
+    )
+
+
+def columnar_page(
+    page: Any,
+    columns: Sequence[Column],
+    columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]],
+    decimals: Optional[int] = None,
+) -> Any:
+    """
+    Converts a page returned by a client to the requested columnar format,
+    responses which are not pages (errors) are returned unchanged
+
+    A requested columnar format takes precedence over raw mode, the body of a
+    RawResponse is decoded and converted.
+    """
+    if columnar is not None and isinstance(page, RawResponse):
+        page = page.decode()
+    if columnar is None or not isinstance(page, list):
+        return page
+    if not ColumnarFormatEnum.has_value(columnar):
+        raise ValueError(f"Unknown columnar format {columnar}")
+    if columnar == ColumnarFormatEnum.ARROW:
+        return to_arrow(page, columns, decimals)
+    return to_numpy(page, columns, decimals)
@@ -8,11 +8,13 @@ class RequestConfiguration:
         headers: Optional[dict] = None,
         params: Optional[dict] = None,
         data: Optional[dict] = None,
+        method: str = "GET",
     ):
         self.url = url
         self.headers = headers
         self.params = params
         self.data = data
+        self.method = method
 
     def __repr__(self):
         return (
@@ -20,7 +22,8 @@ class RequestConfiguration:
             f"url={self.url!r}, "
             f"headers={self.headers!r}, "
             f"params={self.params!r}, "
-            f"data={self.data!r})"
+            f"data={self.data!r}, "
+            f"method={self.method!r})"
         )
 
 
@@ -0,0 +1,233 @@
+from array import array
+from bisect import bisect_left
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from bpx.order_book.order_book import Level, OrderBook
+
+
+class CompactBookSide:
+    """
+    One side of an order book stored in two int64 arrays
+
+    Prices are stored as integer ticks of the market tick size and quantities
+    as integer steps of the market step size. Like BookSide, the ticks are
+    kept ascending with the ticks of asks negated, so the best level of both
+    sides is the last one and the frequent changes near the top of the book
+    shift few levels. The arrays are preallocated and updated in place, so
+    views returned by top_view stay valid until the side has to grow.
+    """
+
+    def __init__(
+        self,
+        descending: bool,
+        tick_size: Decimal,
+        step_size: Decimal,
+        capacity: int = 64,
+    ):
+        """
+        Args:
+            descending: True for bids, where the best price is the highest one
+            tick_size: Price increment of the market
+            step_size: Quantity increment of the market
+            capacity: Number of levels allocated up front
+        """
+        self.descending = descending
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.ticks = array("q", bytes(8 * capacity))
+        self.steps = array("q", bytes(8 * capacity))
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ticks)
+
+    def update(self, price: Union[Decimal, str], quantity: Union[Decimal, str]):
+        """
+        Sets the quantity of a price level, zero quantity removes the level
+        """
+        self.update_ticks(
+            to_units(price, self.tick_size), to_units(quantity, self.step_size)
+        )
+
+    def update_ticks(self, tick: int, steps: int):
+        """
+        Sets the quantity of a price level given in ticks and steps
+        """
+        if not self.descending:
+            tick = -tick
+        size = self.size
+        ticks = self.ticks
+        i = bisect_left(ticks, tick, 0, size)
+        found = i < size and ticks[i] == tick
+        if not steps:
+            if found:
+                # same length slice assignment, the buffer is never resized,
+                # nothing to shift for the best level (an empty slice
+                # assignment would try to resize the exported buffer)
+                if i < size - 1:
+                    ticks[i : size - 1] = ticks[i + 1 : size]
+                    self.steps[i : size - 1] = self.steps[i + 1 : size]
+                self.size = size - 1
+            return
+        if found:
+            self.steps[i] = steps
+            return
+        if size == len(ticks):
+            self._grow()
+            ticks = self.ticks
+        if i < size:
+            ticks[i + 1 : size + 1] = ticks[i:size]
+            self.steps[i + 1 : size + 1] = self.steps[i:size]
+        ticks[i] = tick
+        self.steps[i] = steps
+        self.size = size + 1
+
+    def clear(self):
+        self.size = 0
+
+    def best(self) -> Optional[Level]:
+        """
+        Returns the best price level or None for an empty side
+        """
+        if not self.size:
+            return None
+        return self._level(self.size - 1)
+
+    def levels(self, n: Optional[int] = None) -> List[Level]:
+        """
+        Returns the n best price levels, best first, all levels if n is None
+        """
+        return list(self._iter_levels(n))
+
+    def iter_levels(self) -> Iterator[Level]:
+        """
+        Iterates over the price levels, best first
+        """
+        return self._iter_levels(None)
+
+    def top_view(self, n: Optional[int] = None) -> Tuple[memoryview, memoryview]:
+        """
+        Returns zero-copy views of the ticks and steps of the n best levels
+        in storage order, best last: ascending price ticks for bids and
+        ascending negated price ticks, i.e. descending prices, for asks
+
+        The views can be wrapped without copying, e.g. numpy.frombuffer(view, "int64").
+        They cover fixed positions of the arrays: a quantity change shows in
+        place, after levels were added or removed they show the levels now at
+        these positions, and they may hold stale data once the side grew.
+        """
+        n = self.size if n is None else min(n, self.size)
+        lo = self.size - n
+        return (
+            memoryview(self.ticks)[lo : self.size],
+            memoryview(self.steps)[lo : self.size],
+        )
+
+    def _iter_levels(self, n: Optional[int]) -> Iterator[Level]:
+        n = self.size if n is None else min(n, self.size)
+        for i in range(self.size - 1, self.size - 1 - n, -1):
+            yield self._level(i)
+
+    def _level(self, i: int) -> Level:
+        tick = self.ticks[i] if self.descending else -self.ticks[i]
+        return tick * self.tick_size, self.steps[i] * self.step_size
+
+    def _grow(self):
+        # a new buffer is allocated so exported views of the old one stay readable
+        capacity = max(1, len(self.ticks)) * 2
+        for name in ("ticks", "steps"):
+            old = getattr(self, name)
+            new = array("q", bytes(8 * capacity))
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+
+class CompactOrderBook(OrderBook):
+    """
+    Order book keeping its levels in integer tick arrays instead of dicts of Decimals
+
+    Behaves like OrderBook (snapshot, depth stream diffs, gap detection and
+    queries) while using 16 bytes per price level, which matters when
+    hundreds of books are kept in memory.
+
+    Usage:
+        markets = {m["symbol"]: m for m in public.get_markets()}
+        book = CompactOrderBook.from_market(markets["SOL_USDC"], public.get_depth)
+        ws = WsPublic(on_message=book.on_message)
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        tick_size: Union[Decimal, str],
+        step_size: Union[Decimal, str],
+        snapshot_fetcher: Optional[Callable] = None,
+        max_buffer: int = 10000,
+        capacity: int = 64,
+        on_error: Optional[Callable] = None,
+        resync_backoff: float = 0.5,
+        max_resync_backoff: float = 30.0,
+    ):
+        """
+        Args:
+            symbol: Market symbol (e.g. "SOL_USDC")
+            tick_size: Price increment of the market
+            step_size: Quantity increment of the market
+            snapshot_fetcher: Callable taking the symbol and returning a depth
+                snapshot like Public.get_depth, sync callables run in an executor
+            max_buffer: Maximal number of diffs buffered while waiting for a snapshot
+            capacity: Number of levels allocated up front per side
+            on_error: Callback function for the exception of a failed automatic
+                resync, the exception is logged if None
+            resync_backoff: Seconds before an automatic resync is retried
+                after a first failure
+            max_resync_backoff: Maximal seconds between retries
+        """
+        self.tick_size = Decimal(tick_size)
+        self.step_size = Decimal(step_size)
+        if self.tick_size <= 0 or self.step_size <= 0:
+            raise ValueError("tick_size and step_size must be positive")
+        self.capacity = capacity
+        super().__init__(
+            symbol,
+            snapshot_fetcher,
+            max_buffer,
+            on_error,
+            resync_backoff,
+            max_resync_backoff,
+        )
+
+    @classmethod
+    def from_market(
+        cls,
+        market: Dict[str, Any],
+        snapshot_fetcher: Optional[Callable] = None,
+        **kwargs,
+    ) -> "CompactOrderBook":
+        """
+        Creates a book with the tick and step size of a market from Public.get_markets
+        """
+        filters = market["filters"]
+        return cls(
+            market["symbol"],
+            tick_size=filters["price"]["tickSize"],
+            step_size=filters["quantity"]["stepSize"],
+            snapshot_fetcher=snapshot_fetcher,
+            **kwargs,
+        )
+
+    def _new_side(self, descending: bool) -> CompactBookSide:
+        return CompactBookSide(
+            descending, self.tick_size, self.step_size, self.capacity
+        )
+
+
+def to_units(value: Union[Decimal, str], unit: Decimal) -> int:
+    """
+    Returns a decimal value as an integer number of units (ticks or steps)
+    """
+    return int((Decimal(value) / unit).to_integral_value())
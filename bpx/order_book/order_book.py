@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from bpx.constants.enums import SideEnum, SideType
+
+Level = Tuple[Decimal, Decimal]
+
+logger = logging.getLogger(__name__)
+
+
+class BookSide:
+    """
+    One side of an order book
+
+    Sort keys are kept in an ascending list next to a price -> quantity dict,
+    so a level is found with a binary search and the best level is read in
+    O(1). The key is the price for bids and the negated price for asks, which
+    puts the best level of both sides at the end of the list: inserting or
+    removing a level shifts the levels in front of it, so the changes near the
+    top of the book, most of the depth stream, stay cheap. A change deep in the
+    book costs a memmove of up to n pointers, still faster than a balanced
+    tree up to books of tens of thousands of levels (benchmarks/bench_order_book.py).
+    """
+
+    def __init__(self, descending: bool):
+        """
+        Args:
+            descending: True for bids, where the best price is the highest one
+        """
+        self.descending = descending
+        self.keys: List[Decimal] = []
+        self.quantities: Dict[Decimal, Decimal] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def update(self, price: Union[Decimal, str], quantity: Union[Decimal, str]):
+        """
+        Sets the quantity of a price level, zero quantity removes the level
+        """
+        price = Decimal(price)
+        quantity = Decimal(quantity)
+        key = price if self.descending else -price
+        if not quantity:
+            if self.quantities.pop(price, None) is not None:
+                del self.keys[bisect_left(self.keys, key)]
+            return
+        if price not in self.quantities:
+            insort(self.keys, key)
+        self.quantities[price] = quantity
+
+    def clear(self):
+        self.keys.clear()
+        self.quantities.clear()
+
+    def best(self) -> Optional[Level]:
+        """
+        Returns the best price level or None for an empty side
+        """
+        if not self.keys:
+            return None
+        price = self._price(self.keys[-1])
+        return price, self.quantities[price]
+
+    def levels(self, n: Optional[int] = None) -> List[Level]:
+        """
+        Returns the n best price levels, best first, all levels if n is None
+        """
+        keys = self.keys[::-1] if n is None else self.keys[: -n - 1 : -1]
+        quantities = self.quantities
+        if self.descending:
+            return [(price, quantities[price]) for price in keys]
+        return [(-key, quantities[-key]) for key in keys]
+
+    def iter_levels(self) -> Iterator[Level]:
+        """
+        Iterates over the price levels, best first
+        """
+        for key in reversed(self.keys):
+            price = self._price(key)
+            yield price, self.quantities[price]
+
+    def _price(self, key: Decimal) -> Decimal:
+        return key if self.descending else -key
+
+
+class OrderBook:
+    """
+    Local order book maintained from a REST depth snapshot and the depth stream
+
+    Diffs received before the snapshot are buffered and replayed on top of it.
+    The update ids of every diff are checked against the last applied one,
+    a sequence gap marks the book as out of sync and, when a snapshot fetcher
+    is given, a new snapshot is requested automatically (also for the very
+    first diff, so the book bootstraps itself). A failed resync is passed to
+    on_error, or logged, and retried on the first diff after a backoff which
+    doubles with every failure in a row, so an unavailable or rate limited
+    snapshot endpoint is not called for every diff.
+
+    Usage:
+        public = Public()  # bpx.async_.public
+        book = OrderBook("SOL_USDC", snapshot_fetcher=public.get_depth)
+        ws = WsPublic(on_message=book.on_message)
+        ...
+        await ws.subscribe(ws.subscribe_depth("SOL_USDC"))
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        snapshot_fetcher: Optional[Callable] = None,
+        max_buffer: int = 10000,
+        on_error: Optional[Callable] = None,
+        resync_backoff: float = 0.5,
+        max_resync_backoff: float = 30.0,
+    ):
+        """
+        Args:
+            symbol: Market symbol (e.g. "SOL_USDC")
+            snapshot_fetcher: Callable taking the symbol and returning a depth
+                snapshot like Public.get_depth, sync callables run in an executor
+            max_buffer: Maximal number of diffs buffered while waiting for a snapshot
+            on_error: Callback function for the exception of a failed automatic
+                resync, the exception is logged if None
+            resync_backoff: Seconds before an automatic resync is retried
+                after a first failure
+            max_resync_backoff: Maximal seconds between retries
+        """
+        self.symbol = symbol
+        self.stream = f"depth.{symbol}"
+        self.snapshot_fetcher = snapshot_fetcher
+        self.on_error = on_error
+        self.bids = self._new_side(descending=True)
+        self.asks = self._new_side(descending=False)
+        self.last_update_id: Optional[int] = None
+        self.synced = False
+        self.gaps = 0
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max_buffer)
+        self._resync_task: Optional[asyncio.Future] = None
+        self.resync_error: Optional[BaseException] = None
+        self.resync_backoff = resync_backoff
+        self.max_resync_backoff = max_resync_backoff
+        self._resync_delay = 0.0
+        # time.monotonic() before which no automatic resync is started
+        self._next_resync = 0.0
+
+    def _new_side(self, descending: bool) -> BookSide:
+        """
+        Creates the storage of one book side, overridden by other storage options
+        """
+        return BookSide(descending)
+
+    def apply_snapshot(self, snapshot: Dict[str, Any]):
+        """
+        Replaces the book content with a REST depth snapshot and replays
+        the buffered diffs newer than the snapshot
+
+        Args:
+            snapshot: Response of Public.get_depth
+        """
+        self.bids.clear()
+        self.asks.clear()
+        for price, quantity in snapshot.get("bids", []):
+            self.bids.update(price, quantity)
+        for price, quantity in snapshot.get("asks", []):
+            self.asks.update(price, quantity)
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        self.synced = True
+        buffered = list(self._buffer)
+        self._buffer.clear()
+        for update in buffered:
+            if self.synced:
+                self.apply_update(update)
+            else:
+                self._buffer.append(update)
+
+    def apply_update(self, update: Dict[str, Any]) -> bool:
+        """
+        Applies a depth stream diff
+
+        Args:
+            update: "data" payload of a depth stream message
+
+        Returns:
+            False when the book is out of sync and needs a new snapshot
+        """
+        if not self.synced:
+            self._buffer.append(update)
+            return False
+        first_id = int(update["U"])
+        last_id = int(update["u"])
+        if last_id <= self.last_update_id:
+            return True
+        if first_id > self.last_update_id + 1:
+            self.synced = False
+            self.gaps += 1
+            self._buffer.clear()
+            self._buffer.append(update)
+            return False
+        for price, quantity in update.get("b", []):
+            self.bids.update(price, quantity)
+        for price, quantity in update.get("a", []):
+            self.asks.update(price, quantity)
+        self.last_update_id = last_id
+        return True
+
+    async def on_message(self, message: Any):
+        """
+        Entry point to be passed as the on_message callback of a WebSocket client,
+        messages of other streams are ignored
+        """
+        if not isinstance(message, dict) or message.get("stream") != self.stream:
+            return
+        if not self.apply_update(message["data"]) and self.snapshot_fetcher:
+            if (
+                self._resync_task is None or self._resync_task.done()
+            ) and time.monotonic() >= self._next_resync:
+                self._resync_task = asyncio.ensure_future(self.resync())
+                self._resync_task.add_done_callback(self._on_resync_done)
+
+    async def resync(self):
+        """
+        Fetches a new snapshot with the snapshot fetcher and applies it
+        """
+        if self.snapshot_fetcher is None:
+            raise ValueError("snapshot_fetcher is required to resync the order book")
+        if asyncio.iscoroutinefunction(self.snapshot_fetcher):
+            snapshot = await self.snapshot_fetcher(self.symbol)
+        else:
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(
+                None, self.snapshot_fetcher, self.symbol
+            )
+        self.apply_snapshot(snapshot)
+
+    def _on_resync_done(self, task: asyncio.Future):
+        # retrieves the exception of the background resync and reports it
+        if task.cancelled():
+            return
+        self.resync_error = task.exception()
+        if self.resync_error is None:
+            self._resync_delay = 0.0
+            self._next_resync = 0.0
+            return
+        self._resync_delay = min(
+            self.max_resync_backoff,
+            self._resync_delay * 2 if self._resync_delay else self.resync_backoff,
+        )
+        self._next_resync = time.monotonic() + self._resync_delay
+        if self.on_error is None:
+            logger.error(
+                "Resync of the %s order book failed",
+                self.symbol,
+                exc_info=self.resync_error,
+            )
+        elif asyncio.iscoroutinefunction(self.on_error):
+            asyncio.ensure_future(self.on_error(self.resync_error))
+        else:
+            self.on_error(self.resync_error)
+
+    def best_bid(self) -> Optional[Level]:
+        """
+        Returns the best bid price and quantity
+        """
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        """
+        Returns the best ask price and quantity
+        """
+        return self.asks.best()
+
+    def mid_price(self) -> Optional[Decimal]:
+        """
+        Returns the mid price or None when one of the sides is empty
+        """
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[Decimal]:
+        """
+        Returns the difference between the best ask and the best bid
+        """
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, n: int) -> Dict[str, List[Level]]:
+        """
+        Returns the n best levels of both sides, best first
+        """
+        return {"bids": self.bids.levels(n), "asks": self.asks.levels(n)}
+
+    def vwap(
+        self, side: Union[SideEnum, SideType], quantity: Union[Decimal, str]
+    ) -> Optional[Decimal]:
+        """
+        Returns the volume weighted average price of filling an order of the
+        given side and quantity against the book, None if the book is too thin
+
+        Args:
+            side: Order side, "Bid" walks the asks and "Ask" walks the bids
+            quantity: Order quantity
+        """
+        quantity = Decimal(quantity)
+        if quantity <= 0:
+            raise ValueError("quantity must be positive")
+        book_side = self.asks if side == SideEnum.BID else self.bids
+        remaining = quantity
+        notional = Decimal(0)
+        for price, level_quantity in book_side.iter_levels():
+            filled = min(remaining, level_quantity)
+            notional += filled * price
+            remaining -= filled
+            if not remaining:
+                return notional / quantity
+        return None
@@ -0,0 +1,52 @@
+"""
+Iteration over the pages of offset paginated endpoints
+
+Pages are decoded even in raw mode: the length of a page decides whether
+another one is requested, so a RawResponse page is yielded decoded.
+"""
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+from bpx.exceptions import UnexpectedResponseError
+from bpx.http_client.raw import RawResponse
+
+
+def iter_pages(get_page: Callable[[int, int], Any], page_size: int) -> Iterator[Any]:
+    """
+    Yields pages until one is shorter than page_size
+
+    Args:
+        get_page: Returns the page for (limit, offset), a list or a columnar page
+        page_size: Number of items per request
+    """
+    offset = 0
+    while True:
+        page = get_page(page_size, offset)
+        if isinstance(page, RawResponse):
+            page = page.decode()
+        if isinstance(page, (dict, str)):
+            raise UnexpectedResponseError(page)
+        if len(page):
+            yield page
+        if len(page) < page_size:
+            return
+        offset += page_size
+
+
+async def aiter_pages(
+    get_page: Callable[[int, int], Awaitable[Any]], page_size: int
+) -> AsyncIterator[Any]:
+    """
+    Yields pages of an async client until one is shorter than page_size, see iter_pages
+    """
+    offset = 0
+    while True:
+        page = await get_page(page_size, offset)
+        if isinstance(page, RawResponse):
+            page = page.decode()
+        if isinstance(page, (dict, str)):
+            raise UnexpectedResponseError(page)
+        if len(page):
+            yield page
+        if len(page) < page_size:
+            return
+        offset += page_size
@@ -1,17 +1,23 @@
 from bpx.base.base_public import BasePublic
 from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.metrics.instrumentation import Instrumentation
+from bpx.models.columnar import TRADE_COLUMNS, columnar_page
+from bpx.fan_out import FanOutResult, RateLimiter, fan_out
+from bpx.pagination import iter_pages
 from bpx.models.objects import (
     MMFFunction,
     IMFFunction,
     HaircutFunction,
 )
 from bpx.constants.enums import (
+    ColumnarFormatEnum,
+    ColumnarFormatType,
     TimeIntervalType,
     TimeIntervalEnum,
     BorrowLendMarketHistoryIntervalType,
     BorrowLendMarketHistoryIntervalEnum,
 )
-from typing import Optional, Union, Dict, Any, List
+from typing import Optional, Union, Dict, Any, List, Iterable, Iterator, Callable
 
 default_http_client = SyncHttpClient()
 
@@ -22,7 +28,13 @@ class Public(BasePublic):
         self,
         proxy: Optional[dict] = None,
         http_client: SyncHttpClient = default_http_client,
+        instrumentation: Optional[Instrumentation] = None,
     ):
+        if instrumentation is not None and http_client is default_http_client:
+            # the default client is shared by all instances, it is left untouched
+            http_client = SyncHttpClient(instrumentation=instrumentation)
+        elif instrumentation is not None:
+            http_client.instrumentation = instrumentation
         self.http_client = http_client
         self.http_client.proxies = proxy
 
@@ -174,17 +186,45 @@ class Public(BasePublic):
         """
         return self.http_client.get(self.get_recent_trades_url(symbol, limit))
 
-    def get_history_trades(self, symbol: str, limit=100, offset=0):
+    def get_history_trades(
+        self,
+        symbol: str,
+        limit=100,
+        offset=0,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ):
         """
         Returns historical trades for a specified market
 
+        With columnar set the page is returned as a NumPy structured array or an
+        Arrow record batch, see bpx.models.columnar
+
         https://docs.backpack.exchange/#tag/Trades/operation/get_historical_trades
         """
-        return self.http_client.get(
+        page = self.http_client.get(
             self.get_historical_trades_url(symbol, limit, offset)
         )
+        return columnar_page(page, TRADE_COLUMNS, columnar, decimals)
 
-    async def get_all_mark_prices(
+    def iter_history_trades(
+        self,
+        symbol: str,
+        page_size: int = 1000,
+        columnar: Optional[Union[ColumnarFormatEnum, ColumnarFormatType]] = None,
+        decimals: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Yields the historical trades page by page, see get_history_trades
+        """
+        return iter_pages(
+            lambda limit, offset: self.get_history_trades(
+                symbol, limit, offset, columnar, decimals
+            ),
+            page_size,
+        )
+
+    def get_all_mark_prices(
         self,
         symbol: Optional[str] = None,
     ) -> Union[Dict[str, Any], List[Any], str]:
@@ -194,3 +234,26 @@ class Public(BasePublic):
         https://docs.backpack.exchange/#tag/Trades/operation/get_historical_trades
         """
         return self.http_client.get(self.get_all_mark_prices_url(symbol))
+
+    def fan_out(
+        self,
+        request: Union[str, Callable[[str], Any]],
+        symbols: Iterable[str],
+        concurrency: int = 8,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> FanOutResult:
+        """
+        Runs a request per symbol in a thread pool and returns the responses and
+        errors by symbol
+
+        Args:
+            request: Name of a method taking a symbol ("get_ticker", "get_depth",
+                "get_open_interest", "get_all_mark_prices", ...) or a callable
+            symbols: Symbols to request
+            concurrency: Maximal number of requests in flight
+            rate_limiter: Paces the requests, share one between calls to keep
+                a global rate
+        """
+        if isinstance(request, str):
+            request = getattr(self, request)
+        return fan_out(request, symbols, concurrency, rate_limiter)
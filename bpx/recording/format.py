@@ -0,0 +1,151 @@
+"""
+Capture file format shared by the recorder and the replay engine
+
+A capture file is a sequence of independently compressed chunks:
+
+    chunk header  <4sBIIQQ  magic, codec id, payload length, record count,
+                            first and last receive time (ns since epoch)
+    payload       compressed concatenation of records
+    record        <QI       receive time (ns since epoch), frame length
+                            followed by the raw frame bytes
+
+Next to every capture file an index file (same name + ".idx") holds one
+<QQQI entry per chunk: first and last receive time, chunk offset and record count.
+"""
+
+import struct
+import zlib
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+MAGIC = b"BPXC"
+CHUNK_HEADER = struct.Struct("<4sBIIQQ")
+RECORD_HEADER = struct.Struct("<QI")
+INDEX_ENTRY = struct.Struct("<QQQI")
+CAPTURE_SUFFIX = ".bpxrec"
+INDEX_SUFFIX = ".idx"
+
+
+class Codec(NamedTuple):
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+class IndexEntry(NamedTuple):
+    first_ns: int
+    last_ns: int
+    offset: int
+    count: int
+
+
+def _zstd() -> Codec:
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd codec requires the zstandard package") from None
+    compressor = zstandard.ZstdCompressor(level=3)
+    decompressor = zstandard.ZstdDecompressor()
+    return Codec(2, "zstd", compressor.compress, decompressor.decompress)
+
+
+def _lz4() -> Codec:
+    try:
+        import lz4.frame
+    except ImportError:
+        raise ImportError("lz4 codec requires the lz4 package") from None
+    return Codec(3, "lz4", lz4.frame.compress, lz4.frame.decompress)
+
+
+def _zlib() -> Codec:
+    return Codec(1, "zlib", lambda data: zlib.compress(data, 6), zlib.decompress)
+
+
+def _none() -> Codec:
+    return Codec(0, "none", bytes, bytes)
+
+
+_CODECS: Dict[str, Callable[[], Codec]] = {
+    "none": _none,
+    "zlib": _zlib,
+    "zstd": _zstd,
+    "lz4": _lz4,
+}
+_CODEC_NAMES = {0: "none", 1: "zlib", 2: "zstd", 3: "lz4"}
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Returns a codec by name ("zstd", "lz4", "zlib" or "none"),
+    the best installed one if name is None
+    """
+    if name is None:
+        for candidate in ("zstd", "lz4"):
+            try:
+                return _CODECS[candidate]()
+            except ImportError:
+                continue
+        return _zlib()
+    if name not in _CODECS:
+        raise ValueError(f"Unknown codec {name}")
+    return _CODECS[name]()
+
+
+def get_codec_by_id(codec_id: int) -> Codec:
+    if codec_id not in _CODEC_NAMES:
+        raise ValueError(f"Unknown codec id {codec_id}")
+    return get_codec(_CODEC_NAMES[codec_id])
+
+
+def encode_chunk(codec: Codec, records: List[Tuple[int, bytes]]) -> bytes:
+    """
+    Returns a compressed chunk holding (receive time ns, frame) records
+    """
+    payload = b"".join(
+        RECORD_HEADER.pack(received_ns, len(frame)) + frame
+        for received_ns, frame in records
+    )
+    compressed = codec.compress(payload)
+    header = CHUNK_HEADER.pack(
+        MAGIC,
+        codec.id,
+        len(compressed),
+        len(records),
+        records[0][0],
+        records[-1][0],
+    )
+    return header + compressed
+
+
+def iter_records(payload) -> Iterator[Tuple[int, memoryview]]:
+    """
+    Iterates over the records of a decompressed chunk payload,
+    frames are returned as memoryviews of the payload
+    """
+    view = memoryview(payload)
+    offset = 0
+    size = len(view)
+    while offset < size:
+        received_ns, length = RECORD_HEADER.unpack_from(view, offset)
+        offset += RECORD_HEADER.size
+        yield received_ns, view[offset : offset + length]
+        offset += length
+
+
+def read_index(path: str) -> List[IndexEntry]:
+    """
+    Reads the index file of a capture file
+    """
+    with open(path + INDEX_SUFFIX, "rb") as file:
+        data = file.read()
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    return [IndexEntry(*entry) for entry in INDEX_ENTRY.iter_unpack(data[:usable])]
+
+
+def seek_index(entries: List[IndexEntry], start_ns: int) -> int:
+    """
+    Returns the position of the first index entry which may hold records
+    received at or after start_ns
+    """
+    return bisect_left([entry.last_ns for entry in entries], start_ns)
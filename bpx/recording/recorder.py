@@ -0,0 +1,246 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+from bpx.recording.format import (
+    CAPTURE_SUFFIX,
+    INDEX_ENTRY,
+    INDEX_SUFFIX,
+    Codec,
+    encode_chunk,
+    get_codec,
+)
+from bpx.ws_public import WsPublic
+
+RECORDED_STREAMS = ("depth", "trades", "ticker", "markPrice")
+
+_STOP = object()
+
+
+def market_streams(
+    symbols: Iterable[str], kinds: Iterable[str] = RECORDED_STREAMS
+) -> List[str]:
+    """
+    Returns the stream names of the given kinds for every symbol
+
+    Args:
+        symbols: Market symbols, e.g. [m["symbol"] for m in public.get_markets()]
+        kinds: Stream kinds (e.g. "depth", "trades", "ticker", "markPrice")
+    """
+    return [f"{kind}.{symbol}" for symbol in symbols for kind in kinds]
+
+
+class CaptureWriter:
+    """
+    Background writer appending raw frames to rotating, chunk-compressed capture files
+
+    write() only stamps the frame and puts it on a queue, a writer thread batches
+    frames into chunks, compresses them and appends them together with an index
+    entry, so disk I/O never blocks the caller.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "capture",
+        codec: Optional[str] = None,
+        chunk_records: int = 2000,
+        flush_interval: float = 1.0,
+        rotate_bytes: int = 256 * 1024 * 1024,
+        rotate_seconds: Optional[float] = 3600.0,
+    ):
+        """
+        Args:
+            directory: Directory of the capture files, created if missing
+            prefix: File name prefix
+            codec: "zstd", "lz4", "zlib" or "none", the best installed one if None
+            chunk_records: Maximal number of frames in one compressed chunk
+            flush_interval: Maximal seconds a frame waits before its chunk is written
+            rotate_bytes: Size after which a new capture file is started
+            rotate_seconds: Age after which a new capture file is started, None disables it
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.codec: Codec = get_codec(codec)
+        self.chunk_records = chunk_records
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.files: List[str] = []
+        self.records_written = 0
+        self.error: Optional[BaseException] = None
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = None
+        self._index = None
+        self._opened_at = 0.0
+        self._sequence = 0
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        """
+        Starts the writer thread
+        """
+        if self._thread is not None:
+            raise RuntimeError("Writer is already started")
+        self._thread = threading.Thread(
+            target=self._run, name="bpx-capture-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, frame: Union[str, bytes], received_ns: Optional[int] = None):
+        """
+        Queues a raw frame
+
+        Args:
+            frame: Raw WebSocket frame
+            received_ns: Receive time in ns since epoch, now if None
+        """
+        if received_ns is None:
+            received_ns = time.time_ns()
+        self._queue.put((received_ns, frame))
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Writes the queued frames and closes the capture files
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        try:
+            self._write_loop()
+        except BaseException as e:
+            self.error = e
+            raise
+        finally:
+            self._close_files()
+
+    def _write_loop(self):
+        batch: List[Tuple[int, bytes]] = []
+        deadline = None
+        while True:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                if batch:
+                    self._write_chunk(batch)
+                return
+            if item is not None:
+                received_ns, frame = item
+                if isinstance(frame, str):
+                    frame = frame.encode()
+                batch.append((received_ns, frame))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (
+                len(batch) >= self.chunk_records or time.monotonic() >= deadline
+            ):
+                self._write_chunk(batch)
+                batch = []
+                deadline = None
+
+    def _write_chunk(self, batch: List[Tuple[int, bytes]]):
+        if self._file is None or self._should_rotate():
+            self._rotate()
+        chunk = encode_chunk(self.codec, batch)
+        offset = self._file.tell()
+        self._file.write(chunk)
+        self._file.flush()
+        self._index.write(
+            INDEX_ENTRY.pack(batch[0][0], batch[-1][0], offset, len(batch))
+        )
+        self._index.flush()
+        self.records_written += len(batch)
+
+    def _should_rotate(self) -> bool:
+        if self._file.tell() >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds is None:
+            return False
+        return time.monotonic() - self._opened_at >= self.rotate_seconds
+
+    def _rotate(self):
+        self._close_files()
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        name = f"{self.prefix}-{stamp}-{self._sequence:04d}{CAPTURE_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        self._file = open(path, "ab")
+        self._index = open(path + INDEX_SUFFIX, "ab")
+        self._opened_at = time.monotonic()
+        self.files.append(path)
+
+    def _close_files(self):
+        for file in (self._file, self._index):
+            if file is not None:
+                file.close()
+        self._file = None
+        self._index = None
+
+
+class MarketDataRecorder:
+    """
+    Records raw public stream frames with their receive time to capture files
+
+    Usage:
+        markets = Public().get_markets()
+        recorder = MarketDataRecorder(
+            "captures", market_streams(m["symbol"] for m in markets), codec="zstd"
+        )
+        await recorder.run()
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        streams: Iterable[str],
+        client: Optional[WsPublic] = None,
+        on_error: Optional[Callable] = None,
+        **writer_options,
+    ):
+        """
+        Args:
+            directory: Directory of the capture files
+            streams: Stream names to record, see market_streams
+            client: WebSocket client to record from, a new WsPublic if None
+            on_error: Callback function for connection errors
+            writer_options: Options of CaptureWriter (codec, chunk_records, rotate_bytes...)
+        """
+        self.streams = list(streams)
+        self.writer = CaptureWriter(directory, **writer_options)
+        self.client = client or WsPublic()
+        self.client.on_raw_message_callback = self.writer.write
+        self.client.on_open_callback = self._on_open
+        if on_error is not None:
+            self.client.on_error_callback = on_error
+
+    async def run(self):
+        """
+        Connects and records until the connection is closed
+        """
+        self.writer.start()
+        try:
+            await self.client.connect()
+        finally:
+            # joining the writer thread must not block the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.writer.close)
+
+    async def close(self):
+        """
+        Closes the connection, run() returns once the queued frames are written
+        """
+        await self.client.close()
+
+    async def _on_open(self):
+        await self.client.subscribe(self.client.subscribe_streams(self.streams))
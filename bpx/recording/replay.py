@@ -0,0 +1,324 @@
+import asyncio
+import glob
+import mmap
+import os
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from bpx.recording.format import (
+    CAPTURE_SUFFIX,
+    CHUNK_HEADER,
+    INDEX_SUFFIX,
+    MAGIC,
+    get_codec_by_id,
+    iter_records,
+    read_index,
+    seek_index,
+)
+from bpx.ws_public import WsPublic
+
+_END = object()
+
+
+def capture_files(directory: str, prefix: str = "capture") -> List[str]:
+    """
+    Returns the capture files written by CaptureWriter in recording order
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*{CAPTURE_SUFFIX}")))
+
+
+def iter_chunks(
+    path: str, start_ns: Optional[int] = None
+) -> Iterator[Tuple[int, memoryview]]:
+    """
+    Iterates over the (codec id, compressed payload) chunks of a memory mapped capture file
+
+    Args:
+        path: Capture file
+        start_ns: Skip the chunks received before this time using the index file
+    """
+    offset = 0
+    if start_ns is not None and os.path.exists(path + INDEX_SUFFIX):
+        entries = read_index(path)
+        position = seek_index(entries, start_ns)
+        if position == len(entries):
+            return
+        offset = entries[position].offset
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                size = len(view)
+                while offset + CHUNK_HEADER.size <= size:
+                    magic, codec_id, length, _, _, _ = CHUNK_HEADER.unpack_from(
+                        view, offset
+                    )
+                    start = offset + CHUNK_HEADER.size
+                    if magic != MAGIC or start + length > size:
+                        # truncated tail of a capture still being written
+                        return
+                    chunk = view[start : start + length]
+                    try:
+                        yield codec_id, chunk
+                    finally:
+                        chunk.release()
+                    offset = start + length
+            finally:
+                view.release()
+
+
+class CaptureReader:
+    """
+    Reads the records of capture files in order
+
+    Chunks are read from memory mapped files and decompressed by a background
+    thread a few chunks ahead of the consumer. Frames are returned as
+    memoryviews of the decompressed chunk, copy them to keep them.
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, Iterable[str]],
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        prefetch: int = 8,
+    ):
+        """
+        Args:
+            paths: Capture file or files in recording order, see capture_files
+            start_ns: Skip records received before this time (ns since epoch)
+            end_ns: Stop at the first record received after this time
+            prefetch: Number of decompressed chunks kept ahead of the consumer
+        """
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self._payloads: queue.Queue = queue.Queue(prefetch)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def __iter__(self) -> Iterator[Tuple[int, memoryview]]:
+        """
+        Yields (receive time ns, frame) records
+        """
+        while True:
+            payload = self.next_payload()
+            if payload is None:
+                return
+            for received_ns, frame in iter_records(payload):
+                if self.start_ns is not None and received_ns < self.start_ns:
+                    continue
+                if self.end_ns is not None and received_ns > self.end_ns:
+                    self.close()
+                    return
+                yield received_ns, frame
+
+    def next_payload(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Returns the next decompressed chunk payload, None at the end of the capture
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._decompress, name="bpx-capture-reader", daemon=True
+            )
+            self._thread.start()
+        payload = self._payloads.get(timeout=timeout)
+        if payload is _END:
+            # keep returning the end for later calls
+            self._payloads.put(_END)
+            return None
+        if isinstance(payload, BaseException):
+            raise payload
+        return payload
+
+    def close(self):
+        """
+        Stops the background thread
+        """
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            # the thread stops within a chunk and a put timeout
+            thread.join()
+        try:
+            while True:
+                self._payloads.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._payloads.put_nowait(_END)
+        except queue.Full:
+            # the end is already queued for next_payload
+            pass
+
+    def _decompress(self):
+        try:
+            for path in self.paths:
+                for codec_id, chunk in iter_chunks(path, self.start_ns):
+                    if self._stopped.is_set():
+                        return
+                    payload = get_codec_by_id(codec_id).decompress(chunk)
+                    self._put(payload)
+            self._put(_END)
+        except BaseException as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._payloads.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+class ReplayConnection:
+    """
+    Stand-in for a websockets connection yielding recorded frames
+    """
+
+    YIELD_EVERY = 1000
+
+    def __init__(
+        self,
+        reader: CaptureReader,
+        speed: Optional[float] = 1.0,
+        on_frame: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        Args:
+            reader: Capture reader
+            speed: Replay speed relative to the recording, 1.0 is real time,
+                None replays as fast as possible
+            on_frame: Called with the receive time of every frame before it is yielded
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.reader = reader
+        self.speed = speed
+        self.on_frame = on_frame
+        self.close_code: Optional[int] = None
+        self.sent: List[str] = []
+
+    def __aiter__(self):
+        return self._frames()
+
+    async def send(self, message: str):
+        self.sent.append(message)
+
+    async def close(self):
+        self.close_code = 1000
+        self.reader.close()
+
+    async def _frames(self):
+        loop = asyncio.get_running_loop()
+        first_ns = None
+        started = 0.0
+        count = 0
+        while self.close_code is None:
+            payload = await loop.run_in_executor(None, self.reader.next_payload)
+            if payload is None:
+                break
+            for received_ns, frame in iter_records(payload):
+                if self.close_code is not None:
+                    return
+                if (
+                    self.reader.start_ns is not None
+                    and received_ns < self.reader.start_ns
+                ):
+                    continue
+                if self.reader.end_ns is not None and received_ns > self.reader.end_ns:
+                    return
+                if self.speed is None:
+                    count += 1
+                    if count % self.YIELD_EVERY == 0:
+                        await asyncio.sleep(0)
+                else:
+                    if first_ns is None:
+                        first_ns, started = received_ns, time.monotonic()
+                    delay = (
+                        started
+                        + (received_ns - first_ns) / 1e9 / self.speed
+                        - time.monotonic()
+                    )
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if self.on_frame is not None:
+                    self.on_frame(received_ns)
+                yield str(frame, "utf-8")
+
+
+class ReplayWsPublic(WsPublic):
+    """
+    WsPublic replaying capture files instead of reading a live connection
+
+    Frames go through the same _listen dispatch as live messages, so
+    on_message, stream() subscriptions and on_raw_message_callback behave as
+    they do in production. replay_time_ns holds the receive time of the
+    frame being dispatched.
+
+    Usage:
+        ws = ReplayWsPublic(capture_files("captures"), speed=None, on_message=handler)
+        await ws.connect()
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, Iterable[str]],
+        speed: Optional[float] = None,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        prefetch: int = 8,
+        on_message: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        on_close: Optional[Callable] = None,
+        on_open: Optional[Callable] = None,
+    ):
+        """
+        Args:
+            paths: Capture file or files in recording order, see capture_files
+            speed: Replay speed relative to the recording, 1.0 is real time,
+                None replays as fast as possible
+            start_ns: Skip frames received before this time (ns since epoch)
+            end_ns: Stop after the frames received at this time
+            prefetch: Number of decompressed chunks kept ahead of the dispatch
+            on_message: Callback function for messages
+            on_error: Callback function for errors
+            on_close: Callback function called when the replay is finished or closed
+            on_open: Callback function called before the first frame
+        """
+        super().__init__(on_message, on_error, on_close, on_open)
+        self.paths = paths
+        self.speed = speed
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.prefetch = prefetch
+        self.replay_time_ns: Optional[int] = None
+
+    async def connect(self):
+        """
+        Replays the capture files until the end or until close() is called
+        """
+        reader = CaptureReader(self.paths, self.start_ns, self.end_ns, self.prefetch)
+        self.ws = ReplayConnection(reader, self.speed, self._on_frame)
+        self._running = True
+        try:
+            if self.on_open_callback:
+                if asyncio.iscoroutinefunction(self.on_open_callback):
+                    await self.on_open_callback()
+                else:
+                    self.on_open_callback()
+            await self._listen()
+        finally:
+            reader.close()
+        if self.on_close_callback:
+            if asyncio.iscoroutinefunction(self.on_close_callback):
+                await self.on_close_callback(1000, "Replay finished")
+            else:
+                self.on_close_callback(1000, "Replay finished")
+
+    def _on_frame(self, received_ns: int):
+        self.replay_time_ns = received_ns
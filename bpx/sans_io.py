@@ -0,0 +1,146 @@
+"""
+Sans-IO request core
+
+The REST endpoints as fully encoded requests and decoded responses, without
+any I/O: RequestCore turns a client method name and its arguments into an
+EncodedRequest (method, url, header list, body bytes) with the builders of
+BaseAccount and BasePublic, and decode_body parses the bytes of the response.
+Any transport can send the requests: raw asyncio streams, an HTTP/2 client or
+a native extension.
+
+The HTTP method of a request is set by its BaseAccount builder, and the Account
+clients send it with that method and the query encoding of query_params, so a
+request goes out the same way through a client or through the core.
+
+Usage:
+    core = RequestCore(BaseAccount(public_key, secret_key, window=5000, debug=False))
+    request = core.request(
+        "execute_order", "SOL_USDC", "Bid", "Limit", quantity="1", price="150"
+    )
+    status, body = transport(request.method, request.url, request.headers, request.body)
+    order = decode_body(body)
+"""
+
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlencode
+from bpx.base.base_account import BaseAccount
+from bpx.base.base_public import BasePublic
+from bpx.models.objects import RequestConfiguration
+
+# BasePublic url builders of the Public methods not named <method>_url
+PUBLIC_URLS = {
+    "get_history_trades": "get_historical_trades_url",
+}
+
+# content types decoded as JSON when the content type is given, like aiohttp does
+_JSON_CONTENT_TYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+
+
+class EncodedRequest(NamedTuple):
+    method: str
+    url: str
+    headers: List[Tuple[str, str]]
+    # empty for requests without a body
+    body: bytes
+
+
+def query_params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    """
+    Returns query parameters as sent by all clients: booleans as signed,
+    true / false, and None values dropped
+    """
+    if params is None:
+        return None
+    return {
+        key: str(value).lower() if isinstance(value, bool) else str(value)
+        for key, value in params.items()
+        if value is not None
+    }
+
+
+def encode_request(request_config: Union[RequestConfiguration, str]) -> EncodedRequest:
+    """
+    Encodes a RequestConfiguration of BaseAccount with its HTTP method,
+    or a url of BasePublic as a GET request
+
+    Args:
+        request_config: Output of a builder
+    """
+    if isinstance(request_config, str):
+        return EncodedRequest("GET", request_config, [], b"")
+    method = request_config.method
+    url = request_config.url
+    params = query_params(request_config.params)
+    if params:
+        url = f"{url}?{urlencode(params)}"
+    headers = list((request_config.headers or {}).items())
+    body = b""
+    if method != "GET" and request_config.data is not None:
+        body = json.dumps(request_config.data).encode()
+    return EncodedRequest(method, url, headers, body)
+
+
+def decode_body(
+    body: Union[bytes, bytearray, memoryview, str], content_type: Optional[str] = None
+) -> Any:
+    """
+    Decodes a response body like the clients: JSON when it parses, text otherwise
+
+    Args:
+        body: Response body
+        content_type: Content type of the response, bodies of other content
+            types than JSON are returned as text when given. The async clients
+            pass it, like response.json() of aiohttp they return text/plain
+            bodies such as the one of get_time as str. The sync client parses
+            every body, as requests does.
+    """
+    if isinstance(body, memoryview):
+        body = body.tobytes()
+    if content_type is None or _JSON_CONTENT_TYPE.match(content_type):
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    if isinstance(body, (bytes, bytearray)):
+        return body.decode(errors="replace")
+    return body
+
+
+class RequestCore:
+    """
+    Encodes the requests of the Account and Public client methods by name
+    """
+
+    def __init__(
+        self,
+        account: Optional[BaseAccount] = None,
+        public: Optional[BasePublic] = None,
+    ):
+        """
+        Args:
+            account: Signs the account requests, any Account works as the
+                builders of BaseAccount are called
+            public: Builds the public urls, a BasePublic if None
+        """
+        self.account = account
+        self.public = public if public is not None else BasePublic()
+
+    def request(self, name: str, *args, **kwargs) -> EncodedRequest:
+        """
+        Returns the encoded request of a client method
+
+        Args:
+            name: Name of a method of Account or Public, e.g. "execute_order" or "get_depth"
+            args, kwargs: Arguments of the BaseAccount method or the BasePublic url builder
+        """
+        builder = getattr(BaseAccount, name, None)
+        if builder is not None and not name.startswith("_"):
+            if self.account is None:
+                raise ValueError(f"{name} requires an account")
+            return encode_request(builder(self.account, *args, **kwargs))
+        url_builder = getattr(BasePublic, PUBLIC_URLS.get(name, name + "_url"), None)
+        if url_builder is None:
+            raise AttributeError(f"No request named {name}")
+        return encode_request(url_builder(self.public, *args, **kwargs))
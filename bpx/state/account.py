@@ -0,0 +1,288 @@
+import asyncio
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+Entry = Dict[str, Any]
+
+BALANCE = "balance"
+POSITION = "position"
+
+# balanceUpdate event fields by the key of the same field in get_balances entries
+BALANCE_UPDATE_FIELDS = {
+    "f": "available",
+    "l": "locked",
+    "s": "staked",
+}
+
+# positionUpdate event fields by the key of the same field in get_open_positions entries
+POSITION_UPDATE_FIELDS = {
+    "s": "symbol",
+    "i": "positionId",
+    "q": "netQuantity",
+    "Q": "netExposureQuantity",
+    "n": "netExposureNotional",
+    "B": "entryPrice",
+    "b": "breakEvenPrice",
+    "M": "markPrice",
+    "l": "estLiquidationPrice",
+    "p": "pnlRealized",
+    "P": "pnlUnrealized",
+    "f": "imf",
+    "m": "mmf",
+}
+
+
+def _same(cached: Any, rest: Any) -> bool:
+    if cached == rest:
+        return True
+    try:
+        # "1.50" and "1.5" are the same quantity
+        return Decimal(cached) == Decimal(rest)
+    except (TypeError, ArithmeticError, ValueError):
+        return False
+
+
+async def _fetch(fetcher: Callable) -> Any:
+    if asyncio.iscoroutinefunction(fetcher):
+        return await fetcher()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, fetcher)
+
+
+class AccountCache:
+    """
+    Live balances and positions maintained from REST and the account streams
+
+    Entries keep the format of get_balances and get_open_positions and are
+    updated by account.balanceUpdate and account.positionUpdate events. Every
+    change increments version and the version of the entry, and is passed to
+    the listeners. Refreshing from REST checks the entries which did not change
+    since the request was sent: differences are recorded in mismatches and
+    corrected. The collateral is only refreshed from REST.
+
+    Usage:
+        account = Account(...)  # bpx.async_.account
+        cache = AccountCache(
+            balances_fetcher=account.get_balances,
+            positions_fetcher=account.get_open_positions,
+            collateral_fetcher=account.get_collateral,
+        )
+        ws = WsAccount(..., on_message=cache.on_message)
+        ...
+        await ws.subscribe(ws.subscribe_streams(
+            ["account.balanceUpdate", "account.positionUpdate"]
+        ))
+        await cache.refresh()
+        refresher = asyncio.ensure_future(cache.refresh_every(60))
+        if cache.available("USDC") >= notional: ...
+    """
+
+    def __init__(
+        self,
+        balances_fetcher: Optional[Callable] = None,
+        positions_fetcher: Optional[Callable] = None,
+        collateral_fetcher: Optional[Callable] = None,
+    ):
+        """
+        Args:
+            balances_fetcher: Callable returning the balances like
+                Account.get_balances, sync callables run in an executor
+            positions_fetcher: Callable returning the open positions like
+                Account.get_open_positions
+            collateral_fetcher: Callable returning the collateral like
+                Account.get_collateral
+        """
+        self.balances_fetcher = balances_fetcher
+        self.positions_fetcher = positions_fetcher
+        self.collateral_fetcher = collateral_fetcher
+        self.balances: Dict[str, Entry] = {}
+        self.positions: Dict[str, Entry] = {}
+        self.collateral: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.versions: Dict[Tuple[str, str], int] = {}
+        # (kind, symbol, cached, rest) of the entries corrected by the last refresh
+        self.mismatches: List[Tuple[str, str, Optional[Entry], Optional[Entry]]] = []
+        self._listeners: List[Callable] = []
+        self._updated: Dict[Tuple[str, str], float] = {}
+        self._seeded: Set[str] = set()
+
+    def subscribe(self, listener: Callable) -> Callable[[], None]:
+        """
+        Calls listener(kind, symbol, entry) after every change, entry is None
+        when removed
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def available(self, symbol: str) -> Decimal:
+        """
+        Returns the available balance of an asset, 0 when unknown
+        """
+        balance = self.balances.get(symbol)
+        return Decimal(balance.get("available") or 0) if balance else Decimal(0)
+
+    def position_quantity(self, symbol: str) -> Decimal:
+        """
+        Returns the signed net quantity of a position, 0 when there is none
+        """
+        position = self.positions.get(symbol)
+        return Decimal(position.get("netQuantity") or 0) if position else Decimal(0)
+
+    def apply_balance_update(self, update: Dict[str, Any]):
+        """
+        Applies a balanceUpdate event
+
+        Args:
+            update: "data" payload of an account.balanceUpdate message
+        """
+        symbol = update.get("a")
+        if symbol is None:
+            return
+        balance = dict(self.balances.get(symbol) or {})
+        for key, field in BALANCE_UPDATE_FIELDS.items():
+            if key in update:
+                balance[field] = update[key]
+        self._set(BALANCE, self.balances, symbol, balance, time.monotonic())
+
+    def apply_position_update(self, update: Dict[str, Any]):
+        """
+        Applies a positionUpdate event, positionClosed events remove the position
+
+        Args:
+            update: "data" payload of an account.positionUpdate message
+        """
+        symbol = update.get("s")
+        if symbol is None:
+            return
+        now = time.monotonic()
+        if update.get("e") == "positionClosed":
+            self._set(POSITION, self.positions, symbol, None, now)
+            return
+        position = dict(self.positions.get(symbol) or {})
+        for key, field in POSITION_UPDATE_FIELDS.items():
+            if key in update:
+                position[field] = update[key]
+        self._set(POSITION, self.positions, symbol, position, now)
+
+    def apply_balances(
+        self, balances: Dict[str, Entry], requested: Optional[float] = None
+    ):
+        """
+        Checks and corrects the balances with a get_balances response
+
+        Args:
+            balances: Response of Account.get_balances
+            requested: time.monotonic() when the request was sent, balances
+                changed by the stream since then are kept as they are
+        """
+        self._apply_snapshot(BALANCE, self.balances, balances, requested)
+
+    def apply_positions(
+        self, positions: List[Entry], requested: Optional[float] = None
+    ):
+        """
+        Checks and corrects the positions with a get_open_positions response, see apply_balances
+        """
+        self._apply_snapshot(
+            POSITION,
+            self.positions,
+            {position["symbol"]: position for position in positions},
+            requested,
+        )
+
+    async def on_message(self, message: Any):
+        """
+        Entry point to be passed as the on_message callback of a WebSocket client,
+        messages of other streams are ignored
+        """
+        if not isinstance(message, dict):
+            return
+        stream = message.get("stream")
+        if stream is None:
+            return
+        if stream.startswith("account.balanceUpdate"):
+            self.apply_balance_update(message["data"])
+        elif stream.startswith("account.positionUpdate"):
+            self.apply_position_update(message["data"])
+
+    async def refresh(self):
+        """
+        Fetches the balances, positions and collateral with the given fetchers
+        and checks the cache against them
+        """
+        mismatches = []
+        if self.balances_fetcher is not None:
+            requested = time.monotonic()
+            self.apply_balances(await _fetch(self.balances_fetcher), requested)
+            mismatches += self.mismatches
+        if self.positions_fetcher is not None:
+            requested = time.monotonic()
+            self.apply_positions(await _fetch(self.positions_fetcher), requested)
+            mismatches += self.mismatches
+        if self.collateral_fetcher is not None:
+            self.collateral = await _fetch(self.collateral_fetcher)
+        self.mismatches = mismatches
+
+    async def refresh_every(self, interval: float):
+        """
+        Refreshes every interval seconds until cancelled
+        """
+        while True:
+            await self.refresh()
+            await asyncio.sleep(interval)
+
+    def _apply_snapshot(
+        self,
+        kind: str,
+        entries: Dict[str, Entry],
+        snapshot: Dict[str, Entry],
+        requested: Optional[float],
+    ):
+        if requested is None:
+            requested = time.monotonic()
+        mismatches = []
+        for symbol in set(entries) | set(snapshot):
+            if self._updated.get((kind, symbol), requested) > requested:
+                continue
+            cached = entries.get(symbol)
+            rest = snapshot.get(symbol)
+            if cached is None and rest is None:
+                continue
+            if cached is not None and rest is not None:
+                # the stream sends a subset of the fields, compare only those
+                if all(
+                    _same(value, rest[field])
+                    for field, value in cached.items()
+                    if field in rest
+                ):
+                    if any(field not in cached for field in rest):
+                        self._set(kind, entries, symbol, {**rest, **cached}, requested)
+                    continue
+            if kind in self._seeded:
+                mismatches.append((kind, symbol, cached, rest))
+            self._set(kind, entries, symbol, rest and dict(rest), requested)
+        self._seeded.add(kind)
+        self.mismatches = mismatches
+
+    def _set(
+        self,
+        kind: str,
+        entries: Dict[str, Entry],
+        symbol: str,
+        entry: Optional[Entry],
+        now: float,
+    ):
+        if entry is None:
+            if entries.pop(symbol, None) is None:
+                return
+        else:
+            entries[symbol] = entry
+        self.version += 1
+        self.versions[(kind, symbol)] = self.version
+        self._updated[(kind, symbol)] = now
+        for listener in list(self._listeners):
+            listener(kind, symbol, entry)
@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+# client ids are unsigned 32 bit integers, 0 means no client id
+CLIENT_ID_MAX = 2**32 - 1
+
+# errors after which an order may or may not have reached the exchange
+UNCERTAIN_ERRORS: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, OSError)
+
+
+class ClientIdAllocator:
+    """
+    Allocates client order ids unique within the process
+
+    Ids count up from the current time in milliseconds modulo 2 ** 32, so a
+    restarted process does not reuse the ids of the previous one unless it
+    allocated more than one id per millisecond on average. allocate is safe to
+    call from several threads.
+    """
+
+    def __init__(self, start: Optional[int] = None):
+        """
+        Args:
+            start: First id, derived from the current time if None
+        """
+        if start is None:
+            start = int(time.time() * 1000)
+        self._counter = itertools.count(start % CLIENT_ID_MAX)
+
+    def allocate(self) -> int:
+        # next on itertools.count is atomic under the GIL
+        return next(self._counter) % CLIENT_ID_MAX + 1
+
+    __call__ = allocate
+
+
+class PendingOrder(NamedTuple):
+    client_id: int
+    symbol: str
+    # keyword arguments of execute_order
+    params: Dict[str, Any]
+    # time.time() when the last attempt started, right before it was signed
+    sent: float
+    attempts: int
+
+
+async def _call(
+    function: Callable, on_start: Optional[Callable[[], None]] = None, **kwargs
+) -> Any:
+    # on_start runs right before the function, in the executor for sync ones
+    if asyncio.iscoroutinefunction(function):
+        if on_start is not None:
+            on_start()
+        return await function(**kwargs)
+
+    def run():
+        if on_start is not None:
+            on_start()
+        return function(**kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, run)
+
+
+class PendingOrders:
+    """
+    Places orders with allocated client ids and resolves the ones whose outcome
+    is unknown instead of placing them twice
+
+    When an order request times out or fails at the connection level, the
+    request is not resent right away: the order is looked up by client id once
+    the signature window of the request has passed, since the exchange rejects
+    the request after that. A found order is returned, otherwise the same
+    request is signed again with the same client id. An order accepted by the
+    exchange but still queued for matching when the window passes can be
+    missed, margin adds time for it. The window is counted from the moment the
+    call of the account starts, so the time a sync account waits for a free
+    executor thread is not mistaken for elapsed window.
+
+    Usage:
+        account = Account(..., window=1000)  # bpx.async_.account or bpx.account
+        orders = PendingOrders(account, timeout=0.3)
+        order = await orders.execute_order(
+            "SOL_USDC", "Bid", "Limit", quantity="1", price="150"
+        )
+    """
+
+    def __init__(
+        self,
+        account: Any,
+        allocator: Optional[ClientIdAllocator] = None,
+        timeout: Optional[float] = None,
+        retries: int = 2,
+        margin: float = 0.1,
+        errors: Tuple[Type[BaseException], ...] = UNCERTAIN_ERRORS,
+    ):
+        """
+        Args:
+            account: Sync or async Account, sync methods run in an executor
+            allocator: Client id allocator, a new one if None
+            timeout: Seconds before an order request is given up, no timeout if None
+            retries: Number of times an unresolved order is sent again
+            margin: Seconds waited after the window of a request before looking
+                up its order
+            errors: Exceptions leaving the outcome of a request unknown
+        """
+        self.account = account
+        self.allocator = allocator or ClientIdAllocator()
+        self.timeout = timeout
+        self.retries = retries
+        self.margin = margin
+        self.errors = errors
+        self.pending: Dict[int, PendingOrder] = {}
+
+    def get(self, client_id: int) -> Optional[PendingOrder]:
+        return self.pending.get(client_id)
+
+    async def execute_order(self, symbol: str, side: str, order_type: str, **kwargs):
+        """
+        Places an order and returns the order status, see Account.execute_order
+
+        A client id is allocated unless one is given. Raises the last error when
+        the order was neither placed nor found after all retries.
+        """
+        params = dict(kwargs, side=side, order_type=order_type)
+        client_id = params.get("client_id") or self.allocator.allocate()
+        params["client_id"] = client_id
+        try:
+            for attempt in range(self.retries + 1):
+                self.pending[client_id] = PendingOrder(
+                    client_id, symbol, params, time.time(), attempt + 1
+                )
+
+                def started(attempts=attempt + 1):
+                    # a late start of a previous attempt must not touch this one
+                    pending = self.pending.get(client_id)
+                    if pending is not None and pending.attempts == attempts:
+                        self.pending[client_id] = pending._replace(sent=time.time())
+
+                try:
+                    return await asyncio.wait_for(
+                        _call(
+                            self.account.execute_order,
+                            started,
+                            symbol=symbol,
+                            **params,
+                        ),
+                        self.timeout,
+                    )
+                except self.errors:
+                    if attempt == self.retries:
+                        raise
+                    window = params.get("window") or self.account.window
+                    sent = self.pending[client_id].sent
+                    order = await self.resolve(symbol, client_id, sent, window)
+                    if order is not None:
+                        return order
+        finally:
+            self.pending.pop(client_id, None)
+
+    async def resolve(
+        self, symbol: str, client_id: int, sent: float, window: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Waits until a request signed at sent expired and returns its order
+        looked up by client id, None if the exchange did not accept it
+
+        A later start of the pending attempt of the client id, like a sync call
+        still queued for an executor thread when it timed out, extends the wait.
+
+        Args:
+            symbol: Market of the order
+            client_id: Client id of the order
+            sent: time.time() when the request was signed
+            window: Window of the request in milliseconds
+        """
+        while True:
+            pending = self.pending.get(client_id)
+            if pending is not None and pending.sent > sent:
+                sent = pending.sent
+            delay = sent + window / 1000 + self.margin - time.time()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        order = await _call(
+            self.account.get_open_order, symbol=symbol, client_id=client_id
+        )
+        if isinstance(order, dict) and "id" in order:
+            return order
+        # the order may have been filled or cancelled already
+        history = await _call(
+            self.account.get_order_history, symbol=symbol, limit=100, offset=0
+        )
+        if isinstance(history, list):
+            for order in history:
+                if str(order.get("clientId")) == str(client_id):
+                    return order
+        return None
@@ -0,0 +1,457 @@
+"""
+Local margin engine evaluating the collateral functions of the exchange
+
+The account is reduced to one vector of asset quantities and one of perpetual
+positions. With the collateral parameters of Public.get_collateral and the
+margin functions of Public.get_markets:
+
+    imf(size) = max(base, factor * sqrt(size))        (same for mmf)
+    asset value = quantity * price * haircut weight    (held assets)
+                - quantity * price * (1 + imf(quantity)) (borrowed assets)
+    position value = -|quantity| * mark price * imf(|quantity|)
+    available = sum of asset and position values + unrealized pnl
+
+Maximal order, borrow and withdrawal quantities are the largest changes that
+keep the available value non-negative, solved for all candidates of a search
+step at once. Haircut kinds other than identity use their plain weight. The
+results approximate the REST limits, compare_with_rest reports the differences.
+
+Usage:
+    engine = MarginEngine(public.get_markets(), public.get_collateral())
+    engine.set_prices({"SOL": "150", "SOL_USDC_PERP": "150.2"})
+    engine.set_balances(account.get_balances(), account.get_borrow_lend_positions())
+    engine.set_positions(account.get_open_positions())
+    engine.max_order_quantity("SOL_USDC_PERP", "Bid")
+"""
+
+from decimal import ROUND_DOWN, Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from bpx.constants.enums import SideEnum, SideType
+
+try:
+    import numpy
+except ImportError:
+    raise ImportError("bpx.state.margin requires the numpy package") from None
+
+# candidates evaluated per search step and number of steps,
+# narrowing the bracket by 32 ** 10
+_CANDIDATES = 33
+_STEPS = 10
+
+Number = Union[Decimal, str, float, int]
+
+
+def _fraction(base, factor, size):
+    return numpy.maximum(base, factor * numpy.sqrt(size))
+
+
+def _parameters(items: List[Dict[str, Any]], key: str):
+    # (bases, factors) of the margin functions, a margin of 100% without one
+    rows = []
+    for item in items:
+        function = item.get(key) or {}
+        rows.append((function.get("base") or 1, function.get("factor") or 0))
+    return numpy.array(rows, dtype=float).reshape(-1, 2).T
+
+
+class MarginEngine:
+    """
+    Vectorised cross margin model of an account
+
+    Assets without collateral parameters are not counted as collateral and
+    need a margin of 100% when borrowed, except the quote symbol which has a
+    weight of 1.
+    """
+
+    def __init__(
+        self,
+        markets: List[Dict[str, Any]],
+        collateral: List[Dict[str, Any]],
+        quote_symbol: str = "USDC",
+    ):
+        """
+        Args:
+            markets: Response of Public.get_markets
+            collateral: Response of Public.get_collateral
+            quote_symbol: Asset the values are expressed in
+        """
+        self.quote_symbol = quote_symbol
+        self.markets = {market["symbol"]: market for market in markets}
+        collateral_by_symbol = {item["symbol"]: item for item in collateral}
+        symbols = set(collateral_by_symbol) | {quote_symbol}
+        for market in markets:
+            symbols.update((market.get("baseSymbol"), market.get("quoteSymbol")))
+        symbols.discard(None)
+        self.assets = sorted(symbols)
+        self._asset_index = {symbol: i for i, symbol in enumerate(self.assets)}
+        items = [collateral_by_symbol.get(symbol, {}) for symbol in self.assets]
+        self.weight = numpy.array(
+            [
+                float(
+                    (item.get("haircutFunction") or {}).get("weight")
+                    or (1 if symbol == quote_symbol else 0)
+                )
+                for symbol, item in zip(self.assets, items)
+            ]
+        )
+        self.asset_imf = _parameters(items, "imfFunction")
+        self.asset_mmf = _parameters(items, "mmfFunction")
+        self.quantity = numpy.zeros(len(self.assets))
+        self.free = numpy.zeros(len(self.assets))
+        self.price = numpy.where(
+            numpy.array(self.assets) == quote_symbol, 1.0, numpy.nan
+        )
+
+        self.perps = sorted(markets_with_margin(markets))
+        self._perp_index = {symbol: i for i, symbol in enumerate(self.perps)}
+        perps = [self.markets[symbol] for symbol in self.perps]
+        self.perp_imf = _parameters(perps, "imfFunction")
+        self.perp_mmf = _parameters(perps, "mmfFunction")
+        self.position = numpy.zeros(len(self.perps))
+        self.mark_price = numpy.full(len(self.perps), numpy.nan)
+        self.unrealized_pnl = 0.0
+
+    def set_prices(self, prices: Dict[str, Number]):
+        """
+        Sets the prices of assets (e.g. "SOL") and mark prices of perpetual
+        markets (e.g. "SOL_USDC_PERP") in the quote symbol
+        """
+        for symbol, price in prices.items():
+            if symbol in self._asset_index:
+                self.price[self._asset_index[symbol]] = float(price)
+            if symbol in self._perp_index:
+                self.mark_price[self._perp_index[symbol]] = float(price)
+
+    def set_balances(
+        self,
+        balances: Dict[str, Dict[str, Any]],
+        borrow_lend_positions: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        Args:
+            balances: Response of Account.get_balances
+            borrow_lend_positions: Response of Account.get_borrow_lend_positions,
+                their net quantities are added to the balances
+        """
+        self.quantity[:] = 0
+        self.free[:] = 0
+        for symbol, balance in balances.items():
+            i = self._asset(symbol)
+            available = float(balance.get("available") or 0)
+            self.free[i] = available
+            self.quantity[i] = (
+                available
+                + float(balance.get("locked") or 0)
+                + float(balance.get("staked") or 0)
+            )
+        for position in borrow_lend_positions or ():
+            i = self._asset(position["symbol"])
+            self.quantity[i] += float(position.get("netQuantity") or 0)
+
+    def set_positions(self, positions: Iterable[Dict[str, Any]]):
+        """
+        Args:
+            positions: Response of Account.get_open_positions, their mark
+                prices are used for the markets without a price set
+        """
+        self.position[:] = 0
+        self.unrealized_pnl = 0.0
+        for position in positions:
+            i = self._perp_index.get(position["symbol"])
+            if i is None:
+                continue
+            self.position[i] = float(position.get("netQuantity") or 0)
+            if numpy.isnan(self.mark_price[i]) and position.get("markPrice"):
+                self.mark_price[i] = float(position["markPrice"])
+            self.unrealized_pnl += float(position.get("pnlUnrealized") or 0)
+
+    def net_equity(self) -> float:
+        held = numpy.maximum(self.quantity, 0)
+        borrowed = numpy.maximum(-self.quantity, 0)
+        return float(
+            numpy.nansum(held * self.price * self.weight)
+            - numpy.nansum(borrowed * self.price)
+            + self.unrealized_pnl
+        )
+
+    def initial_margin(self) -> float:
+        return self._margin(self.asset_imf, self.perp_imf)
+
+    def maintenance_margin(self) -> float:
+        return self._margin(self.asset_mmf, self.perp_mmf)
+
+    def net_equity_available(self) -> float:
+        return self.net_equity() - self.initial_margin()
+
+    def max_order_quantity(
+        self,
+        symbol: str,
+        side: Union[SideEnum, SideType],
+        price: Optional[Number] = None,
+        auto_borrow: bool = False,
+    ) -> Decimal:
+        """
+        Returns the largest order quantity keeping the initial margin covered
+
+        Args:
+            symbol: Market symbol
+            side: "Bid" or "Ask"
+            price: Order price, the mark price of perpetuals or the asset price
+                of spot markets if None
+            auto_borrow: Spot orders may borrow the asset they spend
+        """
+        market = self.markets[symbol]
+        sign = 1.0 if str(side) == SideEnum.BID else -1.0
+        if symbol in self._perp_index:
+            quantity = self._max_perp_order(symbol, sign, price)
+        else:
+            quantity = self._max_spot_order(market, sign, price, auto_borrow)
+        return self._round(quantity, _step_size(market))
+
+    def max_withdrawal_quantity(
+        self, symbol: str, auto_borrow: bool = False
+    ) -> Decimal:
+        """
+        Returns the largest quantity of an asset which can be withdrawn
+
+        Args:
+            symbol: Asset symbol
+            auto_borrow: Borrow what exceeds the available balance
+        """
+        return self._round(self.max_withdrawal_quantities(auto_borrow)[symbol])
+
+    def max_borrow_quantity(self, symbol: str) -> Decimal:
+        """
+        Returns the largest quantity of an asset which can be borrowed and spent
+        """
+        return self._round(self.max_borrow_quantities()[symbol])
+
+    def max_withdrawal_quantities(self, auto_borrow: bool = False) -> Dict[str, float]:
+        """
+        Returns the largest withdrawable quantity of every asset with a price
+        """
+        limit = self._max_asset_decrease(self.free if not auto_borrow else None)
+        return dict(zip(self.assets, limit.tolist()))
+
+    def max_borrow_quantities(self) -> Dict[str, float]:
+        """
+        Returns the largest borrowable quantity of every asset with a price,
+        the part of a withdrawal with auto borrow exceeding the held quantity
+        """
+        limit = self._max_asset_decrease(None) - numpy.maximum(self.quantity, 0)
+        return dict(zip(self.assets, numpy.maximum(limit, 0).tolist()))
+
+    def _asset(self, symbol: str) -> int:
+        i = self._asset_index.get(symbol)
+        if i is None:
+            raise ValueError(f"Unknown asset {symbol}")
+        return i
+
+    def _margin(self, asset_function, perp_function) -> float:
+        borrowed = numpy.maximum(-self.quantity, 0)
+        size = numpy.abs(self.position)
+        return float(
+            numpy.nansum(borrowed * self.price * _fraction(*asset_function, borrowed))
+            + numpy.nansum(size * self.mark_price * _fraction(*perp_function, size))
+        )
+
+    def _asset_values(self, quantity):
+        # contribution of every asset to the available value, for (..., assets) quantities
+        held = numpy.maximum(quantity, 0)
+        borrowed = numpy.maximum(-quantity, 0)
+        return held * self.price * self.weight - borrowed * self.price * (
+            1 + _fraction(*self.asset_imf, borrowed)
+        )
+
+    def _max_asset_decrease(self, cap: Optional[numpy.ndarray]) -> numpy.ndarray:
+        available = self.net_equity_available()
+        current = self._asset_values(self.quantity)
+
+        def feasible(decrease):
+            change = self._asset_values(self.quantity - decrease) - current
+            return available + numpy.nan_to_num(change, nan=-numpy.inf) >= 0
+
+        caps = numpy.full(len(self.assets), numpy.inf) if cap is None else cap
+        limit = _max_feasible(feasible, numpy.zeros(len(self.assets)), caps)
+        return numpy.where(numpy.isnan(self.price), 0.0, limit)
+
+    def _max_perp_order(self, symbol: str, sign: float, price: Optional[Number]):
+        i = self._perp_index[symbol]
+        mark = self.mark_price[i]
+        if numpy.isnan(mark):
+            raise ValueError(f"No mark price for {symbol}")
+        price = mark if price is None else float(price)
+        imf = self.perp_imf[:, i]
+        position = self.position[i]
+        available = self.net_equity_available()
+        current = abs(position) * mark * _fraction(*imf, abs(position))
+        # reducing the position only releases margin
+        reducible = max(-sign * position, 0.0)
+
+        def feasible(quantity):
+            size = numpy.abs(position + sign * quantity)
+            change = current - size * mark * _fraction(*imf, size)
+            return available + change + sign * quantity * (mark - price) >= 0
+
+        start = numpy.array([reducible])
+        if not feasible(start)[0]:
+            return reducible
+        return float(_max_feasible(feasible, start, numpy.array([numpy.inf]))[0])
+
+    def _max_spot_order(
+        self,
+        market: Dict[str, Any],
+        sign: float,
+        price: Optional[Number],
+        auto_borrow: bool,
+    ):
+        base = self._asset(market["baseSymbol"])
+        quote = self._asset(market["quoteSymbol"])
+        if price is None:
+            price = self.price[base] / self.price[quote]
+        price = float(price)
+        if numpy.isnan(price) or price <= 0:
+            raise ValueError(f"No price for {market['symbol']}")
+        # a bid spends quote, an ask spends base
+        spent, received = (quote, base) if sign > 0 else (base, quote)
+        cost = price if sign > 0 else 1.0
+        gain = 1.0 if sign > 0 else price
+        if not auto_borrow:
+            return max(self.free[spent], 0.0) / cost
+        available = self.net_equity_available()
+        current = self._asset_values(self.quantity)
+
+        def feasible(quantity):
+            delta = numpy.zeros(quantity.shape + (len(self.assets),))
+            delta[..., spent] -= quantity * cost
+            delta[..., received] += quantity * gain
+            change = (self._asset_values(self.quantity + delta) - current).sum(-1)
+            return available + change >= 0
+
+        start = numpy.array([max(self.free[spent], 0.0) / cost])
+        if not feasible(start)[0]:
+            return float(start[0])
+        return float(_max_feasible(feasible, start, numpy.array([numpy.inf]))[0])
+
+    @staticmethod
+    def _round(quantity: float, step: Optional[Decimal] = None) -> Decimal:
+        # 12 significant digits absorb the float error of limits on a step
+        value = Decimal(f"{max(float(quantity), 0.0):.12g}")
+        step = step or Decimal("0.00000001")
+        return (value / step).to_integral_value(ROUND_DOWN) * step
+
+
+def markets_with_margin(markets: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the markets with margin functions (perpetuals) by symbol
+    """
+    return {
+        market["symbol"]: market
+        for market in markets
+        if market.get("imfFunction") and market.get("marketType") != "SPOT"
+    }
+
+
+def _step_size(market: Dict[str, Any]) -> Optional[Decimal]:
+    step = ((market.get("filters") or {}).get("quantity") or {}).get("stepSize")
+    return Decimal(step) if step else None
+
+
+def _max_feasible(
+    feasible: Callable[[numpy.ndarray], numpy.ndarray],
+    start: numpy.ndarray,
+    cap: numpy.ndarray,
+) -> numpy.ndarray:
+    """
+    Returns per column the largest x in [start, cap] with feasible(x), for
+    feasible predicates true at start and monotonic in x
+
+    feasible is called with (candidates, columns) arrays.
+    """
+    columns = numpy.arange(len(start))
+    finite = numpy.isfinite(cap)
+    at_cap = finite & feasible(numpy.where(finite, cap, start)[None, :])[0]
+    low = start.astype(float)
+    high = numpy.where(finite, cap, start + numpy.maximum(abs(start), 1.0))
+    # grow the unbounded brackets until they contain an infeasible value
+    for _ in range(200):
+        open_ = ~finite & feasible(high[None, :])[0]
+        if not open_.any():
+            break
+        low = numpy.where(open_, high, low)
+        high = numpy.where(open_, start + (high - start) * 16, high)
+    ticks = numpy.linspace(0.0, 1.0, _CANDIDATES)[:, None]
+    for _ in range(_STEPS):
+        grid = low + (high - low) * ticks
+        ok = feasible(grid)
+        last = _CANDIDATES - 1 - numpy.argmax(ok[::-1], axis=0)
+        low, high = (
+            grid[last, columns],
+            grid[numpy.minimum(last + 1, _CANDIDATES - 1), columns],
+        )
+    return numpy.where(at_cap, cap, low)
+
+
+def compare_with_rest(
+    engine: MarginEngine,
+    account: Any,
+    orders: Iterable[Tuple[str, Union[SideEnum, SideType]]] = (),
+    borrows: Iterable[str] = (),
+    withdrawals: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Compares the local limits with the limits returned by the REST endpoints
+
+    Args:
+        engine: Engine loaded with the state of the account
+        account: bpx.account.Account
+        orders: (symbol, side) pairs compared with get_max_order_quantity
+        borrows: Assets compared with get_max_borrow_quantity
+        withdrawals: Assets compared with get_max_withdrawal_quantity
+
+    Returns:
+        {"kind", "symbol", "local", "rest", "error"} per limit, error is the
+        relative difference
+    """
+    results = []
+
+    def add(kind: str, symbol: str, local: Decimal, response: Any, key: str):
+        rest = Decimal(str(response[key])) if isinstance(response, dict) else None
+        error = None
+        if rest is not None:
+            error = float(abs(local - rest) / rest) if rest else float(local != rest)
+        results.append(
+            {
+                "kind": kind,
+                "symbol": symbol,
+                "local": local,
+                "rest": rest,
+                "error": error,
+            }
+        )
+
+    for symbol, side in orders:
+        add(
+            "order",
+            symbol,
+            engine.max_order_quantity(symbol, side),
+            account.get_max_order_quantity(symbol, str(side)),
+            "maxOrderQuantity",
+        )
+    for symbol in borrows:
+        add(
+            "borrow",
+            symbol,
+            engine.max_borrow_quantity(symbol),
+            account.get_max_borrow_quantity(symbol),
+            "maxBorrowQuantity",
+        )
+    for symbol in withdrawals:
+        add(
+            "withdrawal",
+            symbol,
+            engine.max_withdrawal_quantity(symbol),
+            account.get_max_withdrawal_quantity(symbol),
+            "maxWithdrawalQuantity",
+        )
+    return results
@@ -0,0 +1,266 @@
+import asyncio
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from bpx.constants.enums import SideEnum, SideType
+
+Order = Dict[str, Any]
+LevelKey = Tuple[str, str, Decimal]
+
+# orderUpdate event fields by the key of the same field in REST orders
+ORDER_UPDATE_FIELDS = {
+    "i": "id",
+    "c": "clientId",
+    "s": "symbol",
+    "S": "side",
+    "o": "orderType",
+    "f": "timeInForce",
+    "q": "quantity",
+    "Q": "quoteQuantity",
+    "p": "price",
+    "P": "triggerPrice",
+    "X": "status",
+    "z": "executedQuantity",
+    "Z": "executedQuoteQuantity",
+    "V": "selfTradePrevention",
+}
+
+CLOSED_STATUSES = frozenset(("Filled", "Cancelled", "Expired", "TriggerFailed"))
+
+# fields compared to decide whether a REST order differs from the tracked one
+_STATE_FIELDS = ("status", "price", "triggerPrice", "quantity", "executedQuantity")
+
+
+class OrderTracker:
+    """
+    Live own orders maintained from REST open orders and the account.orderUpdate stream
+
+    Orders are kept as REST order dicts indexed by id, client id and
+    (symbol, side, price), so lookups never leave the process. Filled, cancelled
+    and expired orders are removed. Reconciling with REST replaces the orders
+    which did not change since the request was sent, adds the orders missed by
+    the stream and drops the ones REST no longer lists.
+
+    Usage:
+        account = Account(...)  # bpx.async_.account
+        tracker = OrderTracker(open_orders_fetcher=account.get_open_orders)
+        ws = WsAccount(..., on_message=tracker.on_message)
+        ...
+        await ws.subscribe(ws.subscribe_order_update())
+        await tracker.reconcile()
+        reconciler = asyncio.ensure_future(tracker.reconcile_every(30))
+    """
+
+    def __init__(
+        self,
+        open_orders_fetcher: Optional[Callable] = None,
+        symbol: Optional[str] = None,
+    ):
+        """
+        Args:
+            open_orders_fetcher: Callable returning the open orders like
+                Account.get_open_orders, sync callables run in an executor
+            symbol: Track the orders of this market only
+        """
+        self.open_orders_fetcher = open_orders_fetcher
+        self.symbol = symbol
+        self.orders: Dict[str, Order] = {}
+        self.by_client_id: Dict[int, Order] = {}
+        self.by_level: Dict[LevelKey, Dict[str, Order]] = {}
+        self.reconciled = False
+        # orders fixed by the last reconciliation: added, dropped or replaced
+        self.corrections = 0
+        self._updated: Dict[str, float] = {}
+        self._closed: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.orders
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self.orders.get(str(order_id))
+
+    def get_by_client_id(self, client_id: int) -> Optional[Order]:
+        return self.by_client_id.get(int(client_id))
+
+    def at_price(
+        self,
+        symbol: str,
+        side: Union[SideEnum, SideType],
+        price: Union[Decimal, str],
+    ) -> List[Order]:
+        """
+        Returns the live orders of a price level
+        """
+        level = self.by_level.get((symbol, str(side), Decimal(price)))
+        return list(level.values()) if level else []
+
+    def open_orders(
+        self,
+        symbol: Optional[str] = None,
+        side: Optional[Union[SideEnum, SideType]] = None,
+    ) -> List[Order]:
+        """
+        Returns the live orders, optionally of one market and side
+        """
+        side = None if side is None else str(side)
+        return [
+            order
+            for order in self.orders.values()
+            if (symbol is None or order.get("symbol") == symbol)
+            and (side is None or order.get("side") == side)
+        ]
+
+    def apply_update(self, update: Dict[str, Any]) -> Optional[Order]:
+        """
+        Applies an orderUpdate event
+
+        Args:
+            update: "data" payload of an account.orderUpdate message
+
+        Returns:
+            The updated order
+        """
+        order_id = update.get("i")
+        if order_id is None:
+            return None
+        order_id = str(order_id)
+        if self.symbol is not None and update.get("s") != self.symbol:
+            return None
+        order = self.orders.get(order_id)
+        if order is None:
+            order = {}
+        else:
+            self._unindex(order)
+        for key, field in ORDER_UPDATE_FIELDS.items():
+            if key in update:
+                order[field] = update[key]
+        order["id"] = order_id
+        if isinstance(order.get("orderType"), str):
+            # the stream sends LIMIT / MARKET, REST Limit / Market
+            order["orderType"] = order["orderType"].capitalize()
+        now = time.monotonic()
+        if order.get("status") in CLOSED_STATUSES:
+            self.orders.pop(order_id, None)
+            self._updated.pop(order_id, None)
+            self._closed[order_id] = now
+        else:
+            self._index(order)
+            self._updated[order_id] = now
+        return order
+
+    def apply_open_orders(self, orders: List[Order], requested: Optional[float] = None):
+        """
+        Reconciles the tracked orders with a REST open orders response
+
+        Args:
+            orders: Response of Account.get_open_orders
+            requested: time.monotonic() when the request was sent, orders
+                changed by the stream since then are kept as they are
+        """
+        if requested is None:
+            requested = time.monotonic()
+        listed = {}
+        for order in orders:
+            if self.symbol is None or order.get("symbol") == self.symbol:
+                listed[str(order["id"])] = order
+        corrections = 0
+        for order_id in list(self.orders):
+            if order_id not in listed and self._updated[order_id] < requested:
+                self._unindex(self.orders.pop(order_id))
+                del self._updated[order_id]
+                corrections += 1
+        for order_id, order in listed.items():
+            if self._updated.get(order_id, requested) > requested:
+                continue
+            if self._closed.get(order_id, requested) > requested:
+                continue
+            current = self.orders.get(order_id)
+            if current is not None and all(
+                current.get(field) == order.get(field) for field in _STATE_FIELDS
+            ):
+                # same state, only complete the fields the stream does not send
+                current.update((k, v) for k, v in order.items() if k not in current)
+                continue
+            if current is not None:
+                self._unindex(current)
+            order = dict(order, id=order_id)
+            self._index(order)
+            self._updated[order_id] = requested
+            corrections += 1
+        self._closed = {
+            order_id: closed
+            for order_id, closed in self._closed.items()
+            if closed > requested
+        }
+        self.corrections = corrections if self.reconciled else 0
+        self.reconciled = True
+
+    async def on_message(self, message: Any):
+        """
+        Entry point to be passed as the on_message callback of a WebSocket client,
+        messages of other streams are ignored
+        """
+        if not isinstance(message, dict):
+            return
+        stream = message.get("stream")
+        if stream is None or not stream.startswith("account.orderUpdate"):
+            return
+        self.apply_update(message["data"])
+
+    async def reconcile(self):
+        """
+        Fetches the open orders with the open orders fetcher and reconciles with them
+        """
+        if self.open_orders_fetcher is None:
+            raise ValueError("open_orders_fetcher is required to reconcile the orders")
+        kwargs = {} if self.symbol is None else {"symbol": self.symbol}
+        requested = time.monotonic()
+        if asyncio.iscoroutinefunction(self.open_orders_fetcher):
+            orders = await self.open_orders_fetcher(**kwargs)
+        else:
+            loop = asyncio.get_running_loop()
+            orders = await loop.run_in_executor(
+                None, lambda: self.open_orders_fetcher(**kwargs)
+            )
+        self.apply_open_orders(orders, requested)
+
+    async def reconcile_every(self, interval: float):
+        """
+        Reconciles every interval seconds until cancelled
+        """
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(interval)
+
+    def _index(self, order: Order):
+        order_id = order["id"]
+        self.orders[order_id] = order
+        client_id = order.get("clientId")
+        if client_id is not None:
+            self.by_client_id[int(client_id)] = order
+        key = self._level_key(order)
+        if key is not None:
+            self.by_level.setdefault(key, {})[order_id] = order
+
+    def _unindex(self, order: Order):
+        client_id = order.get("clientId")
+        if client_id is not None:
+            client_id = int(client_id)
+            if self.by_client_id.get(client_id) is order:
+                del self.by_client_id[client_id]
+        key = self._level_key(order)
+        level = self.by_level.get(key) if key is not None else None
+        if level is not None:
+            level.pop(order["id"], None)
+            if not level:
+                del self.by_level[key]
+
+    @staticmethod
+    def _level_key(order: Order) -> Optional[LevelKey]:
+        price = order.get("price")
+        if price is None:
+            return None
+        return order.get("symbol"), order.get("side"), Decimal(price)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Conflator:
+    """
+    Conflating consumer for ticker and mark price streams
+
+    Keeps one latest-value slot per symbol and wakes the handler at most once
+    per interval with the symbols that changed since the previous call.
+    Messages from other streams are forwarded untouched to on_message.
+    Exceptions of the handler are passed to on_error, or logged.
+
+    Usage:
+        conflator = Conflator(on_update=handle_changes, interval=0.5)
+        ws = WsPublic(on_message=conflator.on_message)
+        ...
+        await ws.subscribe(ws.subscribe_tickers())
+    """
+
+    CONFLATED_STREAMS = ("ticker", "markPrice")
+
+    def __init__(
+        self,
+        on_update: Callable,
+        interval: float = 1.0,
+        on_message: Optional[Callable] = None,
+        streams: Iterable[str] = CONFLATED_STREAMS,
+        on_error: Optional[Callable] = None,
+    ):
+        """
+        Args:
+            on_update: Callback (sync or async) receiving a dict of
+                symbol -> latest payload for the symbols changed since the last call
+            interval: Minimal number of seconds between two on_update calls
+            on_message: Callback for messages of streams which are not conflated
+            streams: Stream name prefixes to conflate (e.g. "ticker", "markPrice")
+            on_error: Callback function for the exceptions of on_update,
+                the exception is logged if None
+        """
+        if interval < 0:
+            raise ValueError("interval can't be negative")
+        self.on_update_callback = on_update
+        self.on_message_callback = on_message
+        self.on_error_callback = on_error
+        self.interval = interval
+        self.streams: Set[str] = set(streams)
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self._changed: Set[str] = set()
+        self._last_flush = float("-inf")
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_requested = False
+
+    async def on_message(self, message: Any):
+        """
+        Entry point to be passed as the on_message callback of a WebSocket client
+        """
+        key = self._conflation_key(message)
+        if key is None:
+            await self._forward(message)
+            return
+        self.latest[key] = message["data"]
+        self._changed.add(key)
+        self._schedule()
+
+    def pending(self) -> Set[str]:
+        """
+        Returns the symbols changed since the last on_update call
+        """
+        return set(self._changed)
+
+    def flush(self):
+        """
+        Hands the pending changes to the handler right away, or as soon as
+        the async handler still running returned
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is not None and not self._task.done():
+            self._flush_requested = True
+            return
+        self._flush()
+
+    def close(self):
+        """
+        Drops the scheduled wake up and cancels a running async handler,
+        pending changes stay available in latest
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._flush_requested = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _conflation_key(self, message: Any) -> Optional[str]:
+        if not isinstance(message, dict):
+            return None
+        data = message.get("data")
+        stream = message.get("stream")
+        if not isinstance(data, dict) or not isinstance(stream, str):
+            return None
+        name, _, symbol = stream.partition(".")
+        if name not in self.streams:
+            return None
+        return data.get("s") or symbol or None
+
+    def _schedule(self):
+        if self._timer is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, self._last_flush + self.interval - time.monotonic())
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        if self._task is not None and not self._task.done():
+            # previous async handler is still busy, keep conflating meanwhile
+            self._schedule_after(self.interval)
+            return
+        self._flush()
+
+    def _schedule_after(self, delay: float):
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _flush(self):
+        if not self._changed:
+            return
+        changes = {symbol: self.latest[symbol] for symbol in self._changed}
+        self._changed = set()
+        self._last_flush = time.monotonic()
+        if asyncio.iscoroutinefunction(self.on_update_callback):
+            self._task = asyncio.ensure_future(self.on_update_callback(changes))
+            self._task.add_done_callback(self._on_update_done)
+            return
+        try:
+            self.on_update_callback(changes)
+        except Exception as e:
+            self._report(e)
+
+    def _on_update_done(self, task: asyncio.Future):
+        # retrieves the exception of the async handler and runs a requested flush
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self._report(error)
+        if self._flush_requested:
+            self._flush_requested = False
+            self._flush()
+
+    def _report(self, error: BaseException):
+        if self.on_error_callback is None:
+            logger.error("Conflated update handler failed", exc_info=error)
+        elif asyncio.iscoroutinefunction(self.on_error_callback):
+            asyncio.ensure_future(self.on_error_callback(error))
+        else:
+            self.on_error_callback(error)
+
+    async def _forward(self, message: Any):
+        if self.on_message_callback is None:
+            return
+        if asyncio.iscoroutinefunction(self.on_message_callback):
+            await self.on_message_callback(message)
+        else:
+            self.on_message_callback(message)
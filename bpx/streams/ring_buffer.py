@@ -0,0 +1,100 @@
+import threading
+from collections import deque
+from queue import Empty
+from typing import Any, Deque, List, Optional
+from bpx.exceptions import StreamClosedError
+
+
+class RingBuffer:
+    """
+    Thread-safe bounded FIFO buffer
+
+    put never blocks: when the buffer is full the oldest item is overwritten
+    and counted in dropped, so a slow consumer can't stall the producer.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Args:
+            capacity: Maximal number of buffered items
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dropped = 0
+        self.closed = False
+        self._items: Deque[Any] = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any):
+        """
+        Appends an item, items put after close are ignored
+        """
+        with self._condition:
+            if self.closed:
+                return
+            if len(self._items) == self.capacity:
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Removes and returns the oldest item
+
+        Args:
+            timeout: Seconds to wait for an item, None waits forever
+
+        Raises:
+            queue.Empty: no item arrived within timeout
+            StreamClosedError: the buffer is closed and drained
+        """
+        with self._condition:
+            if not self._condition.wait_for(self._readable, timeout):
+                raise Empty
+            if self._items:
+                return self._items.popleft()
+            raise StreamClosedError()
+
+    def drain(
+        self, max_items: Optional[int] = None, timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Removes and returns up to max_items buffered items, waiting for at least one
+
+        Args:
+            max_items: Maximal number of returned items, everything buffered if None
+            timeout: Seconds to wait for an item, None waits forever
+
+        Returns:
+            Buffered items, empty list on timeout
+
+        Raises:
+            StreamClosedError: the buffer is closed and drained
+        """
+        with self._condition:
+            if not self._condition.wait_for(self._readable, timeout):
+                return []
+            if not self._items:
+                raise StreamClosedError()
+            count = (
+                len(self._items)
+                if max_items is None
+                else min(max_items, len(self._items))
+            )
+            return [self._items.popleft() for _ in range(count)]
+
+    def close(self):
+        """
+        Stops accepting items and wakes up waiting consumers,
+        the buffered items can still be read
+        """
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def _readable(self) -> bool:
+        return bool(self._items) or self.closed
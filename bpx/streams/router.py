@@ -0,0 +1,162 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+_CLOSED = object()
+
+# all symbols streams, their messages arrive as <kind>.<symbol>
+ALL_SYMBOLS_STREAMS = {"ticker": "tickers", "markPrice": "markPrices"}
+
+
+def all_symbols_stream(stream: Any) -> Optional[str]:
+    """
+    Returns the all symbols stream a message stream belongs to, e.g. "tickers"
+    for "ticker.SOL_USDC", None for the other streams
+    """
+    if not isinstance(stream, str):
+        return None
+    return ALL_SYMBOLS_STREAMS.get(stream.partition(".")[0])
+
+
+class StreamSubscription:
+    """
+    Async iterator over the messages of one or more streams
+
+    Every subscription owns a bounded queue, when the consumer falls behind
+    the oldest queued message is dropped and counted in dropped.
+    The iteration stops once the subscription or its connection is closed.
+
+    Usage:
+        async with ws.stream("trades.SOL_USDC") as trades:
+            async for message in trades:
+                ...
+    """
+
+    def __init__(self, router: "StreamRouter", streams: Iterable[str], maxsize: int):
+        self.streams = frozenset(streams)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.closed = False
+        self._router = router
+
+    def __aiter__(self) -> "StreamSubscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+        message = await self.queue.get()
+        if message is _CLOSED:
+            raise StopAsyncIteration
+        return message
+
+    async def __aenter__(self) -> "StreamSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Returns the next message
+
+        Args:
+            timeout: Seconds to wait for a message, raises asyncio.TimeoutError when exceeded
+
+        Raises:
+            StopAsyncIteration: the subscription is closed
+        """
+        return await asyncio.wait_for(self.__anext__(), timeout)
+
+    def close(self):
+        """
+        Stops receiving messages, the messages already queued can still be read
+        """
+        if self.closed:
+            return
+        self._router.unsubscribe(self)
+        self.closed = True
+        if not self.queue.full():
+            # wakes up a consumer waiting on an empty queue
+            self.queue.put_nowait(_CLOSED)
+
+    def put(self, message: Any):
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class StreamRouter:
+    """
+    Fans the messages of one connection out to any number of stream subscriptions
+
+    The same message object is handed to every matching subscription, nothing is copied.
+    Subscriptions of an all symbols stream ("tickers", "markPrices") receive
+    the messages of its per symbol streams ("ticker.SOL_USDC", ...).
+    """
+
+    def __init__(self):
+        self._by_stream: Dict[str, List[StreamSubscription]] = {}
+        self._all: List[StreamSubscription] = []
+
+    def __len__(self) -> int:
+        return len(self._all) + sum(len(subs) for subs in self._by_stream.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._all or self._by_stream)
+
+    def subscribe(
+        self, streams: Iterable[str] = (), maxsize: int = 1000
+    ) -> StreamSubscription:
+        """
+        Creates a subscription
+
+        Args:
+            streams: Stream names to receive (e.g. "trades.SOL_USDC"), every message if empty
+            maxsize: Maximal number of queued messages, 0 for an unbounded queue
+        """
+        subscription = StreamSubscription(self, streams, maxsize)
+        if not subscription.streams:
+            self._all.append(subscription)
+        for stream in subscription.streams:
+            self._by_stream.setdefault(stream, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription):
+        if subscription in self._all:
+            self._all.remove(subscription)
+        for stream in subscription.streams:
+            subscriptions = self._by_stream.get(stream, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._by_stream.pop(stream, None)
+
+    def publish(self, message: Any):
+        """
+        Queues a decoded message for every subscription of its stream
+        """
+        for subscription in self._all:
+            subscription.put(message)
+        if self._by_stream and isinstance(message, dict):
+            stream = message.get("stream")
+            subscriptions = self._by_stream.get(stream, ())
+            for subscription in subscriptions:
+                subscription.put(message)
+            aggregate = all_symbols_stream(stream)
+            if aggregate is not None:
+                for subscription in self._by_stream.get(aggregate, ()):
+                    if subscription not in subscriptions:
+                        subscription.put(message)
+
+    def close(self):
+        """
+        Closes every subscription
+        """
+        for subscription in list(self._all):
+            subscription.close()
+        for subscriptions in list(self._by_stream.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
@@ -0,0 +1,1076 @@
+"""
+Local simulated Backpack exchange for offline load and latency testing
+
+Serves the REST routes used by BaseAccount and BasePublic with aiohttp and
+the public and account streams with websockets. Signed requests are checked
+exactly like the real API does: the ed25519 signature of
+"instruction=...&<sorted params>&timestamp=...&window=..." made with the key
+sent in X-API-Key, and the timestamp must lie within the window.
+Synthetic depth and trade streams are pushed at configurable rates.
+
+Usage:
+    with SimulatedExchange(depth_rate=100) as exchange:
+        public = exchange.attach(Public())
+        public.get_depth("SOL_USDC")
+
+    async with SimulatedExchange() as exchange:
+        ws = exchange.attach(WsPublic(on_message=handler))
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import socket
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union
+import websockets
+from aiohttp import web
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from bpx.testing.market import SyntheticMarket, now_ms, now_us
+
+MAX_WINDOW = 60000
+
+DEFAULT_MARKETS = {
+    "SOL_USDC": ("150", "0.01", "0.01"),
+    "BTC_USDC": ("60000", "0.1", "0.00001"),
+    "ETH_USDC": ("3000", "0.01", "0.0001"),
+    "SOL_USDC_PERP": ("150", "0.01", "0.01"),
+}
+
+Handler = Callable[["SimulatedAccount", Dict[str, Any]], Any]
+
+
+def signing_string(
+    instruction: str, params: Dict[str, Any], timestamp: int, window: int
+) -> str:
+    """
+    Returns the string signed for a request, formatted like BaseAccount._sign
+    """
+    sign_str = f"instruction={instruction}"
+    sorted_params_list = []
+    for key, value in sorted(params.items()):
+        if isinstance(value, bool):
+            value = str(value).lower()
+        sorted_params_list.append(f"{key}={value}")
+    if sorted_params_list:
+        sign_str += "&" + "&".join(sorted_params_list)
+    return sign_str + f"&timestamp={timestamp}&window={window}"
+
+
+def verify_signature(api_key: str, signature: str, message: str) -> bool:
+    """
+    Returns True if signature is the base64 ed25519 signature of message
+    made with the private key of the base64 public key api_key
+    """
+    try:
+        public_key = ed25519.Ed25519PublicKey.from_public_bytes(
+            base64.b64decode(api_key)
+        )
+        public_key.verify(base64.b64decode(signature), message.encode())
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+    return True
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class SimulatedAccount:
+    """
+    In-memory state of one API key: balances, open orders and history
+    """
+
+    def __init__(self, api_key: str, balances: Dict[str, str]):
+        self.api_key = api_key
+        self.balances = {symbol: Decimal(v) for symbol, v in balances.items()}
+        self.settings = {
+            "autoBorrowSettlements": False,
+            "autoLend": False,
+            "autoRealizePnl": False,
+            "autoRepayBorrows": False,
+            "borrowLimit": "0",
+            "futuresMakerFee": "2",
+            "futuresTakerFee": "5",
+            "leverageLimit": "10",
+            "limitOrders": 500,
+            "liquidating": False,
+            "positionLimit": "1000000",
+            "spotMakerFee": "8",
+            "spotTakerFee": "10",
+            "triggerOrders": 500,
+        }
+        self.open_orders: Dict[str, Dict[str, Any]] = {}
+        self.orders: List[Dict[str, Any]] = []
+        self.fills: List[Dict[str, Any]] = []
+        self.withdrawals: List[Dict[str, Any]] = []
+
+    def find_order(
+        self, order_id: Optional[str], client_id: Optional[Any]
+    ) -> Optional[Dict[str, Any]]:
+        if order_id:
+            return self.open_orders.get(str(order_id))
+        if client_id:
+            for order in self.open_orders.values():
+                if str(order.get("clientId")) == str(client_id):
+                    return order
+        return None
+
+
+class SimulatedExchange:
+    """
+    Local Backpack REST and WebSocket server backed by synthetic markets
+    """
+
+    def __init__(
+        self,
+        markets: Optional[Iterable[Union[str, SyntheticMarket]]] = None,
+        depth_rate: float = 10.0,
+        trade_rate: float = 5.0,
+        api_keys: Optional[Iterable[str]] = None,
+        balances: Optional[Dict[str, str]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ws_port: int = 0,
+        clock_offset_ms: int = 0,
+        rest_latency: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            markets: Market symbols or SyntheticMarket instances, DEFAULT_MARKETS if None
+            depth_rate: Depth updates pushed per second and market, 0 disables them
+            trade_rate: Trades pushed per second and market, 0 disables them
+            api_keys: Accepted API keys (base64 public keys), any valid key if None
+            balances: Initial balances of every account
+            host: Interface to listen on
+            port: REST port, a free port if 0
+            ws_port: WebSocket port, a free port if 0
+            clock_offset_ms: Offset of the server clock, to simulate clock skew
+            rest_latency: Seconds added before every REST response
+            seed: Seed of the synthetic markets
+        """
+        if markets is None:
+            markets = DEFAULT_MARKETS
+        self.markets: Dict[str, SyntheticMarket] = {}
+        for index, market in enumerate(markets):
+            if not isinstance(market, SyntheticMarket):
+                price, tick_size, step_size = DEFAULT_MARKETS.get(
+                    market, ("100", "0.01", "0.01")
+                )
+                market = SyntheticMarket(
+                    market,
+                    price,
+                    tick_size,
+                    step_size,
+                    seed=None if seed is None else seed + index,
+                )
+            self.markets[market.symbol] = market
+        self.depth_rate = depth_rate
+        self.trade_rate = trade_rate
+        self.api_keys = None if api_keys is None else set(api_keys)
+        self.balances = balances or {"USDC": "1000000", "SOL": "10000", "BTC": "10"}
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.clock_offset_ms = clock_offset_ms
+        self.rest_latency = rest_latency
+        self.accounts: Dict[str, SimulatedAccount] = {}
+        self.request_count = 0
+        self.messages_sent = 0
+        self._order_ids = itertools.count(int(now_ms()) * 1000)
+        self._subscribers: Dict[str, Set[Any]] = {}
+        self._account_keys: Dict[Any, str] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._ws_server = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.ws_port}/"
+
+    def attach(self, client):
+        """
+        Points a REST or WebSocket client at this exchange and returns it
+        """
+        if hasattr(client, "BASE_URL"):
+            client.BASE_URL = self.rest_url
+        if hasattr(client, "BPX_API_URL"):
+            client.BPX_API_URL = self.rest_url
+        if hasattr(client, "WS_URL"):
+            client.WS_URL = self.ws_url
+        for attribute in ("client", "clients"):
+            # threaded clients and pools wrap other clients
+            inner = getattr(client, attribute, None)
+            if isinstance(inner, list):
+                for item in inner:
+                    self.attach(item)
+            elif inner is not None and hasattr(inner, "WS_URL"):
+                self.attach(inner)
+        return client
+
+    def account(self, api_key: str) -> SimulatedAccount:
+        """
+        Returns the state of an API key, created on first use
+        """
+        if api_key not in self.accounts:
+            self.accounts[api_key] = SimulatedAccount(api_key, self.balances)
+        return self.accounts[api_key]
+
+    async def __aenter__(self) -> "SimulatedExchange":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __enter__(self) -> "SimulatedExchange":
+        self.start_in_thread()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_in_thread()
+
+    async def start(self):
+        """
+        Starts the REST and WebSocket servers and the stream publishers on the running loop
+        """
+        rest_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        rest_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        rest_socket.bind((self.host, self.port))
+        self.port = rest_socket.getsockname()[1]
+        self._runner = web.AppRunner(self._application(), access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, rest_socket).start()
+        self._ws_server = await websockets.serve(
+            self._handle_connection, self.host, self.ws_port
+        )
+        self.ws_port = self._ws_server.sockets[0].getsockname()[1]
+        for kind, rate, make in (
+            ("depth", self.depth_rate, SyntheticMarket.next_depth),
+            ("trades", self.trade_rate, SyntheticMarket.next_trade),
+        ):
+            if rate:
+                self._tasks.append(
+                    asyncio.ensure_future(self._publish(kind, rate, make))
+                )
+
+    async def close(self):
+        """
+        Stops the servers and the stream publishers
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._ws_server is not None:
+            self._ws_server.close()
+            await self._ws_server.wait_closed()
+            self._ws_server = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self, timeout: Optional[float] = 10.0):
+        """
+        Runs the exchange on its own event loop thread, for synchronous clients
+        """
+        if self._thread is not None:
+            raise RuntimeError("Exchange is already running")
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        async def serve():
+            self._stopped = asyncio.Event()
+            try:
+                await self.start()
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            try:
+                await self._stopped.wait()
+            finally:
+                await self.close()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(serve())
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(
+            target=run, name="bpx-simulated-exchange", daemon=True
+        )
+        self._thread.start()
+        if not started.wait(timeout):
+            raise TimeoutError("Simulated exchange did not start")
+        if errors:
+            self._thread = None
+            raise errors[0]
+
+    def stop_in_thread(self, timeout: Optional[float] = 10.0):
+        """
+        Stops an exchange started with start_in_thread
+        """
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join(timeout)
+        self._thread = None
+
+    async def push(self, stream: str, data: Dict[str, Any]):
+        """
+        Sends an event to the subscribers of a public stream
+        """
+        await self._broadcast(self._subscribers.get(stream, ()), stream, data)
+
+    async def push_account(self, api_key: str, stream: str, data: Dict[str, Any]):
+        """
+        Sends an event to the connections of an API key subscribed to an account stream
+        """
+        connections = [
+            connection
+            for connection in self._subscribers.get(stream, ())
+            if self._account_keys.get(connection) == api_key
+        ]
+        await self._broadcast(connections, stream, data)
+
+    async def _broadcast(self, connections: Iterable[Any], stream: str, data: Any):
+        message = None
+        for connection in list(connections):
+            if message is None:
+                message = json.dumps({"stream": stream, "data": data})
+            try:
+                await connection.send(message)
+                self.messages_sent += 1
+            except websockets.exceptions.ConnectionClosed:
+                pass
+
+    async def _publish(
+        self, kind: str, rate: float, make: Callable[[SyntheticMarket, int], Any]
+    ):
+        loop = asyncio.get_running_loop()
+        interval = max(1.0 / rate, 0.001)
+        started = loop.time()
+        published = 0
+        while True:
+            await asyncio.sleep(interval)
+            # catch up in bursts when the rate is above the timer resolution
+            due = min(int((loop.time() - started) * rate) - published, 1000)
+            published += due
+            for symbol, market in self.markets.items():
+                stream = f"{kind}.{symbol}"
+                subscribers = self._subscribers.get(stream)
+                for _ in range(due):
+                    data = make(market, now_us(self.clock_offset_ms))
+                    if subscribers:
+                        await self._broadcast(subscribers, stream, data)
+
+    async def _handle_connection(self, connection, path: Optional[str] = None):
+        try:
+            async for raw in connection:
+                try:
+                    message = json.loads(raw)
+                    method = message["method"]
+                    streams = list(message.get("params") or [])
+                except (ValueError, KeyError, TypeError):
+                    await self._send_error(connection, 4001, "Invalid request")
+                    continue
+                if any(stream.startswith("account.") for stream in streams):
+                    api_key = self._authenticate_stream(message)
+                    if api_key is None:
+                        await self._send_error(connection, 4006, "Invalid signature")
+                        continue
+                    self._account_keys[connection] = api_key
+                for stream in streams:
+                    if method == "SUBSCRIBE":
+                        self._subscribers.setdefault(stream, set()).add(connection)
+                    elif method == "UNSUBSCRIBE":
+                        self._subscribers.get(stream, set()).discard(connection)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            for subscribers in self._subscribers.values():
+                subscribers.discard(connection)
+            self._account_keys.pop(connection, None)
+
+    def _authenticate_stream(self, message: Dict[str, Any]) -> Optional[str]:
+        try:
+            api_key = message["apiKey"]
+            timestamp = int(message["timestamp"])
+            window = int(message["window"])
+            signature = message["signature"]
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not self._key_allowed(api_key) or not self._in_window(timestamp, window):
+            return None
+        sign_str = f"instruction=subscribe&timestamp={timestamp}&window={window}"
+        if not verify_signature(api_key, signature, sign_str):
+            return None
+        return api_key
+
+    async def _send_error(self, connection, code: int, message: str):
+        try:
+            await connection.send(
+                json.dumps({"id": None, "error": {"code": code, "message": message}})
+            )
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def _key_allowed(self, api_key: str) -> bool:
+        return self.api_keys is None or api_key in self.api_keys
+
+    def _in_window(self, timestamp: int, window: int) -> bool:
+        if not 0 < window <= MAX_WINDOW:
+            return False
+        now = now_ms(self.clock_offset_ms)
+        return timestamp <= now + window and now - timestamp <= window
+
+    def _application(self) -> web.Application:
+        app = web.Application()
+        public_routes = {
+            "api/v1/assets": self._assets,
+            "api/v1/collateral": self._collateral,
+            "api/v1/borrowLend/markets": self._borrow_lend_markets,
+            "api/v1/borrowLend/markets/history": self._empty_list,
+            "api/v1/markets": self._markets,
+            "api/v1/market": self._market,
+            "api/v1/ticker": self._ticker,
+            "api/v1/tickers": self._tickers,
+            "api/v1/depth": self._depth,
+            "api/v1/klines": self._klines,
+            "api/v1/markPrices": self._mark_prices,
+            "api/v1/openInterest": self._open_interest,
+            "api/v1/fundingRates": self._empty_list,
+            "api/v1/status": self._status,
+            "api/v1/trades": self._trades,
+            "api/v1/trades/history": self._trades,
+        }
+        for path, handler in public_routes.items():
+            app.router.add_get("/" + path, self._public(handler))
+        app.router.add_get("/api/v1/ping", self._text(lambda: "pong"))
+        app.router.add_get(
+            "/api/v1/time", self._text(lambda: str(now_ms(self.clock_offset_ms)))
+        )
+        private_routes = [
+            ("GET", "api/v1/account", "accountQuery", self._get_settings),
+            ("PATCH", "api/v1/account", "accountUpdate", self._update_settings),
+            (
+                "GET",
+                "api/v1/account/limits/borrow",
+                "maxBorrowQuantity",
+                self._limit("maxBorrowQuantity"),
+            ),
+            (
+                "GET",
+                "api/v1/account/limits/order",
+                "maxOrderQuantity",
+                self._limit("maxOrderQuantity"),
+            ),
+            (
+                "GET",
+                "api/v1/account/limits/withdrawal",
+                "maxWithdrawalQuantity",
+                self._limit("maxWithdrawalQuantity"),
+            ),
+            (
+                "GET",
+                "api/v1/borrowLend/positions",
+                "borrowLendPositionQuery",
+                self._no_records,
+            ),
+            ("POST", "api/v1/borrowLend", "borrowLendExecute", self._no_records),
+            ("GET", "api/v1/capital", "balanceQuery", self._get_balances),
+            (
+                "GET",
+                "api/v1/capital/collateral",
+                "collateralQuery",
+                self._get_collateral,
+            ),
+            ("GET", "wapi/v1/capital/deposits", "depositQueryAll", self._no_records),
+            (
+                "GET",
+                "wapi/v1/capital/deposit/address",
+                "depositAddressQuery",
+                self._deposit_address,
+            ),
+            (
+                "GET",
+                "wapi/v1/capital/withdrawals",
+                "withdrawalQueryAll",
+                self._get_withdrawals,
+            ),
+            ("POST", "wapi/v1/capital/withdrawals", "withdraw", self._withdraw),
+            ("GET", "api/v1/position", "positionQuery", self._no_records),
+            (
+                "GET",
+                "wapi/v1/history/borrowLend",
+                "borrowHistoryQueryAll",
+                self._no_records,
+            ),
+            (
+                "GET",
+                "wapi/v1/history/interest",
+                "interestHistoryQueryAll",
+                self._no_records,
+            ),
+            ("GET", "wapi/v1/history/fills", "fillHistoryQueryAll", self._fill_history),
+            (
+                "GET",
+                "wapi/v1/history/funding",
+                "fundingHistoryQueryAll",
+                self._no_records,
+            ),
+            (
+                "GET",
+                "wapi/v1/history/orders",
+                "orderHistoryQueryAll",
+                self._order_history,
+            ),
+            ("GET", "wapi/v1/history/pnl", "pnlHistoryQueryAll", self._no_records),
+            (
+                "GET",
+                "wapi/v1/history/settlement",
+                "settlementHistoryQueryAll",
+                self._no_records,
+            ),
+            ("GET", "api/v1/order", "orderQuery", self._get_order),
+            ("POST", "api/v1/order", "orderExecute", self._execute_order),
+            ("DELETE", "api/v1/order", "orderCancel", self._cancel_order),
+            ("GET", "api/v1/orders", "orderQueryAll", self._get_open_orders),
+            ("DELETE", "api/v1/orders", "orderCancelAll", self._cancel_all_orders),
+            ("POST", "api/v1/rfq/quote", "quoteSubmit", self._submit_quote),
+        ]
+        for method, path, instruction, handler in private_routes:
+            app.router.add_route(method, "/" + path, self._signed(instruction, handler))
+        return app
+
+    def _text(self, make: Callable[[], str]):
+        async def handle(request: web.Request) -> web.Response:
+            self.request_count += 1
+            await self._delay()
+            return web.Response(text=make())
+
+        return handle
+
+    def _public(self, handler: Callable[[Dict[str, str]], Any]):
+        async def handle(request: web.Request) -> web.Response:
+            self.request_count += 1
+            await self._delay()
+            try:
+                return web.json_response(handler(dict(request.query)))
+            except ApiError as e:
+                return self._error_response(e)
+
+        return handle
+
+    def _signed(self, instruction: str, handler: Handler):
+        async def handle(request: web.Request) -> web.Response:
+            self.request_count += 1
+            await self._delay()
+            try:
+                params = await self._request_params(request)
+                api_key = self._authenticate(request, instruction, params)
+                result = handler(self.account(api_key), params)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return web.json_response(result)
+            except ApiError as e:
+                return self._error_response(e)
+
+        return handle
+
+    async def _request_params(self, request: web.Request) -> Dict[str, Any]:
+        if request.method == "GET":
+            return dict(request.query)
+        body = await request.read()
+        if not body:
+            return {}
+        try:
+            params = json.loads(body)
+        except ValueError:
+            raise ApiError(400, "INVALID_CLIENT_REQUEST", "Invalid JSON body")
+        if params is None:
+            return {}
+        if not isinstance(params, dict):
+            raise ApiError(400, "INVALID_CLIENT_REQUEST", "Body must be an object")
+        return params
+
+    def _authenticate(
+        self, request: web.Request, instruction: str, params: Dict[str, Any]
+    ) -> str:
+        headers = request.headers
+        api_key = headers.get("X-API-Key")
+        signature = headers.get("X-Signature")
+        if not api_key or not signature or "X-Timestamp" not in headers:
+            raise ApiError(401, "UNAUTHORIZED", "Missing authentication headers")
+        if not self._key_allowed(api_key):
+            raise ApiError(401, "UNAUTHORIZED", "Unknown API key")
+        try:
+            timestamp = int(headers["X-Timestamp"])
+            window = int(headers.get("X-Window", "5000"))
+        except ValueError:
+            raise ApiError(400, "INVALID_CLIENT_REQUEST", "Invalid timestamp or window")
+        if not 0 < window <= MAX_WINDOW:
+            raise ApiError(
+                400, "INVALID_CLIENT_REQUEST", f"Window must be at most {MAX_WINDOW}"
+            )
+        if not self._in_window(timestamp, window):
+            raise ApiError(400, "INVALID_CLIENT_REQUEST", "Request has expired")
+        message = signing_string(instruction, params, timestamp, window)
+        if not verify_signature(api_key, signature, message):
+            raise ApiError(400, "INVALID_SIGNATURE", "Invalid signature")
+        return api_key
+
+    def _error_response(self, error: ApiError) -> web.Response:
+        return web.json_response(
+            {"code": error.code, "message": error.message}, status=error.status
+        )
+
+    async def _delay(self):
+        if self.rest_latency:
+            await asyncio.sleep(self.rest_latency)
+
+    def _get_market(self, symbol: Optional[str]) -> SyntheticMarket:
+        if symbol not in self.markets:
+            raise ApiError(400, "INVALID_MARKET", f"Market {symbol} not found")
+        return self.markets[symbol]
+
+    # public routes
+
+    def _assets(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        symbols = sorted(
+            {m.base_symbol for m in self.markets.values()}
+            | {m.quote_symbol for m in self.markets.values()}
+        )
+        return [{"symbol": symbol, "tokens": []} for symbol in symbols]
+
+    def _collateral(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "symbol": symbol,
+                "imfFunction": {"type": "sqrt", "base": "0.02", "factor": "0.0001"},
+                "mmfFunction": {"type": "sqrt", "base": "0.01", "factor": "0.00005"},
+                "haircutFunction": {"weight": "0.9", "kind": {"type": "identity"}},
+            }
+            for symbol in sorted({m.base_symbol for m in self.markets.values()})
+        ]
+
+    def _borrow_lend_markets(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "symbol": symbol,
+                "borrowInterestRate": "0.05",
+                "lendInterestRate": "0.03",
+                "state": "Open",
+            }
+            for symbol in sorted({m.quote_symbol for m in self.markets.values()})
+        ]
+
+    def _markets(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        return [market.info() for market in self.markets.values()]
+
+    def _market(self, query: Dict[str, str]) -> Dict[str, Any]:
+        return self._get_market(query.get("symbol")).info()
+
+    def _ticker(self, query: Dict[str, str]) -> Dict[str, Any]:
+        return self._get_market(query.get("symbol")).ticker()
+
+    def _tickers(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        return [market.ticker() for market in self.markets.values()]
+
+    def _depth(self, query: Dict[str, str]) -> Dict[str, Any]:
+        market = self._get_market(query.get("symbol"))
+        return market.snapshot(now_ms(self.clock_offset_ms))
+
+    def _klines(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        market = self._get_market(query.get("symbol"))
+        price = market.price(market.last_price)
+        return [
+            {
+                "start": query.get("startTime"),
+                "end": query.get("endTime"),
+                "open": price,
+                "high": market.price(market.high),
+                "low": market.price(market.low),
+                "close": price,
+                "volume": market.quantity(market.volume),
+                "trades": str(market.trades),
+            }
+        ]
+
+    def _mark_prices(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        markets = (
+            [self._get_market(query["symbol"])]
+            if "symbol" in query
+            else self.markets.values()
+        )
+        return [
+            {
+                "symbol": market.symbol,
+                "markPrice": market.price(market.mid),
+                "indexPrice": market.price(market.mid),
+                "fundingRate": "0.0001",
+                "nextFundingTimestamp": now_ms(self.clock_offset_ms) + 3600000,
+            }
+            for market in markets
+            if market.market_type == "PERP"
+        ]
+
+    def _open_interest(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        return [
+            {"symbol": market.symbol, "openInterest": "0"}
+            for market in self.markets.values()
+            if market.market_type == "PERP"
+            and query.get("symbol") in (None, market.symbol)
+        ]
+
+    def _status(self, query: Dict[str, str]) -> Dict[str, Any]:
+        return {"status": "Ok", "message": None}
+
+    def _trades(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        market = self._get_market(query.get("symbol"))
+        return market.recent_trades(
+            now_ms(self.clock_offset_ms), int(query.get("limit", 100))
+        )
+
+    def _empty_list(self, query: Dict[str, str]) -> List[Any]:
+        return []
+
+    # signed routes
+
+    def _no_records(
+        self, account: SimulatedAccount, params: Dict[str, Any]
+    ) -> List[Any]:
+        return []
+
+    def _get_settings(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return account.settings
+
+    def _update_settings(self, account: SimulatedAccount, params: Dict[str, Any]):
+        account.settings.update(params)
+        return None
+
+    @staticmethod
+    def _limit(key: str) -> Callable:
+        def limit(account: SimulatedAccount, params: Dict[str, Any]):
+            return {key: "1000", **params}
+
+        return limit
+
+    def _get_balances(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return {
+            symbol: {"available": str(amount), "locked": "0", "staked": "0"}
+            for symbol, amount in account.balances.items()
+        }
+
+    def _get_collateral(self, account: SimulatedAccount, params: Dict[str, Any]):
+        total = str(account.balances.get("USDC", Decimal(0)))
+        return {
+            "assetsValue": total,
+            "borrowLiability": "0",
+            "collateral": [],
+            "imf": "0",
+            "unsettledEquity": "0",
+            "liabilitiesValue": "0",
+            "marginFraction": None,
+            "mmf": "0",
+            "netEquity": total,
+            "netEquityAvailable": total,
+            "netEquityLocked": "0",
+            "netExposureFutures": "0",
+            "pnlUnrealized": "0",
+        }
+
+    def _deposit_address(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return {"address": "0x" + account.api_key.encode().hex()[:40]}
+
+    def _get_withdrawals(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return account.withdrawals
+
+    def _withdraw(self, account: SimulatedAccount, params: Dict[str, Any]):
+        withdrawal = {
+            "id": len(account.withdrawals) + 1,
+            "blockchain": params.get("blockchain"),
+            "quantity": params.get("quantity"),
+            "symbol": params.get("symbol"),
+            "toAddress": params.get("address"),
+            "status": "pending",
+            "createdAt": now_ms(self.clock_offset_ms),
+        }
+        account.withdrawals.append(withdrawal)
+        return withdrawal
+
+    def _fill_history(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return self._page(account.fills, params)
+
+    def _order_history(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return self._page(account.orders, params)
+
+    @staticmethod
+    def _page(items: List[Dict[str, Any]], params: Dict[str, Any]) -> List[Any]:
+        if "symbol" in params:
+            items = [item for item in items if item.get("symbol") == params["symbol"]]
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        return items[::-1][offset : offset + limit]
+
+    def _get_order(self, account: SimulatedAccount, params: Dict[str, Any]):
+        order = account.find_order(params.get("orderId"), params.get("clientId"))
+        if order is None or order["symbol"] != params.get("symbol"):
+            raise ApiError(404, "RESOURCE_NOT_FOUND", "Order not found")
+        return order
+
+    def _get_open_orders(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return [
+            order
+            for order in account.open_orders.values()
+            if params.get("symbol") in (None, order["symbol"])
+            and params.get("marketType")
+            in (None, self.markets[order["symbol"]].market_type)
+        ]
+
+    async def _execute_order(self, account: SimulatedAccount, params: Dict[str, Any]):
+        market = self._get_market(params.get("symbol"))
+        side = params.get("side")
+        order_type = params.get("orderType")
+        if side not in ("Bid", "Ask"):
+            raise ApiError(400, "INVALID_ORDER", f"Invalid side {side}")
+        if order_type not in ("Limit", "Market"):
+            raise ApiError(400, "INVALID_ORDER", f"Invalid order type {order_type}")
+        try:
+            limit = (
+                market.to_ticks(str(params["price"])) if order_type == "Limit" else None
+            )
+            if "quantity" in params:
+                steps = market.to_steps(str(params["quantity"]))
+            else:
+                price = market.fill_price(side) or market.mid
+                quote = Decimal(str(params["quoteQuantity"]))
+                steps = market.to_steps(str(quote / Decimal(market.price(price))))
+        except (KeyError, ArithmeticError, ValueError):
+            raise ApiError(400, "INVALID_ORDER", "Invalid price or quantity")
+        if steps <= 0:
+            raise ApiError(400, "INVALID_QUANTITY", "Quantity is too small")
+        fill = market.fill_price(side, limit)
+        if fill is not None and params.get("postOnly"):
+            raise ApiError(
+                400, "INVALID_ORDER", "Order would immediately match and take"
+            )
+        if fill is None and (
+            order_type == "Market" or params.get("timeInForce") in ("IOC", "FOK")
+        ):
+            status = "Expired"
+        else:
+            status = "New" if fill is None else "Filled"
+        order = {
+            "id": str(next(self._order_ids)),
+            "clientId": params.get("clientId"),
+            "createdAt": now_ms(self.clock_offset_ms),
+            "executedQuantity": market.quantity(steps if fill is not None else 0),
+            "executedQuoteQuantity": str(
+                Decimal(market.quantity(steps)) * Decimal(market.price(fill))
+                if fill is not None
+                else Decimal(0)
+            ),
+            "orderType": order_type,
+            "postOnly": bool(params.get("postOnly", False)),
+            "price": None if limit is None else market.price(limit),
+            "quantity": market.quantity(steps),
+            "reduceOnly": params.get("reduceOnly"),
+            "selfTradePrevention": params.get("selfTradePrevention", "RejectTaker"),
+            "side": side,
+            "status": status,
+            "symbol": market.symbol,
+            "timeInForce": params.get("timeInForce", "GTC"),
+            "triggerPrice": params.get("triggerPrice"),
+        }
+        account.orders.append(order)
+        await self._order_update(account, order, "orderAccepted")
+        if status == "New":
+            account.open_orders[order["id"]] = order
+        elif status == "Filled":
+            self._settle(account, market, order, fill, steps)
+            await self._order_update(account, order, "orderFill", fill, steps)
+            await self._balance_update(account, market)
+        else:
+            await self._order_update(account, order, "orderExpired")
+        return order
+
+    async def _cancel_order(self, account: SimulatedAccount, params: Dict[str, Any]):
+        order = account.find_order(params.get("orderId"), params.get("clientId"))
+        if order is None or order["symbol"] != params.get("symbol"):
+            raise ApiError(404, "RESOURCE_NOT_FOUND", "Order not found")
+        del account.open_orders[order["id"]]
+        order["status"] = "Cancelled"
+        await self._order_update(account, order, "orderCancelled")
+        return order
+
+    async def _cancel_all_orders(
+        self, account: SimulatedAccount, params: Dict[str, Any]
+    ):
+        self._get_market(params.get("symbol"))
+        cancelled = []
+        for order in list(account.open_orders.values()):
+            if order["symbol"] == params["symbol"]:
+                del account.open_orders[order["id"]]
+                order["status"] = "Cancelled"
+                await self._order_update(account, order, "orderCancelled")
+                cancelled.append(order)
+        return cancelled
+
+    def _submit_quote(self, account: SimulatedAccount, params: Dict[str, Any]):
+        return {
+            "quoteId": str(next(self._order_ids)),
+            "clientId": params.get("clientId"),
+            "rfqId": params.get("rfqId"),
+            "bidPrice": params.get("bidPrice"),
+            "askPrice": params.get("askPrice"),
+            "status": "New",
+        }
+
+    def _settle(
+        self,
+        account: SimulatedAccount,
+        market: SyntheticMarket,
+        order: Dict[str, Any],
+        ticks: int,
+        steps: int,
+    ):
+        quantity = Decimal(market.quantity(steps))
+        quote = quantity * Decimal(market.price(ticks))
+        sign = 1 if order["side"] == "Bid" else -1
+        base, quote_symbol = market.base_symbol, market.quote_symbol
+        balances = account.balances
+        if market.market_type == "SPOT":
+            balances[base] = balances.get(base, Decimal(0)) + sign * quantity
+        balances[quote_symbol] = balances.get(quote_symbol, Decimal(0)) - sign * quote
+        market._record_trade(ticks, steps)
+        account.fills.append(
+            {
+                "clientId": order["clientId"],
+                "fee": "0",
+                "feeSymbol": quote_symbol,
+                "isMaker": False,
+                "orderId": order["id"],
+                "price": market.price(ticks),
+                "quantity": market.quantity(steps),
+                "side": order["side"],
+                "symbol": market.symbol,
+                "systemOrderType": None,
+                "timestamp": now_ms(self.clock_offset_ms),
+                "tradeId": market.trade_id,
+            }
+        )
+
+    async def _order_update(
+        self,
+        account: SimulatedAccount,
+        order: Dict[str, Any],
+        event: str,
+        fill: Optional[int] = None,
+        steps: int = 0,
+    ):
+        market = self.markets[order["symbol"]]
+        timestamp = now_us(self.clock_offset_ms)
+        data = {
+            "e": event,
+            "E": timestamp,
+            "s": order["symbol"],
+            "c": order["clientId"],
+            "S": order["side"],
+            "o": order["orderType"].upper(),
+            "f": order["timeInForce"],
+            "q": order["quantity"],
+            "p": order["price"],
+            "X": order["status"],
+            "i": order["id"],
+            "z": order["executedQuantity"],
+            "Z": order["executedQuoteQuantity"],
+            "T": timestamp,
+        }
+        if fill is not None:
+            data.update(
+                {
+                    "l": market.quantity(steps),
+                    "L": market.price(fill),
+                    "m": False,
+                    "t": market.trade_id,
+                }
+            )
+        for stream in ("account.orderUpdate", f"account.orderUpdate.{order['symbol']}"):
+            await self.push_account(account.api_key, stream, data)
+
+    async def _balance_update(self, account: SimulatedAccount, market: SyntheticMarket):
+        timestamp = now_us(self.clock_offset_ms)
+        symbols = [market.quote_symbol]
+        if market.market_type == "SPOT":
+            symbols.insert(0, market.base_symbol)
+        for symbol in symbols:
+            data = {
+                "e": "balanceUpdate",
+                "E": timestamp,
+                "a": symbol,
+                "f": str(account.balances.get(symbol, Decimal(0))),
+                "l": "0",
+                "s": "0",
+                "T": timestamp,
+            }
+            await self.push_account(account.api_key, "account.balanceUpdate", data)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Simulated Backpack exchange")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ws-port", type=int, default=8081)
+    parser.add_argument("--markets", nargs="*", default=None)
+    parser.add_argument("--depth-rate", type=float, default=10.0)
+    parser.add_argument("--trade-rate", type=float, default=5.0)
+    parser.add_argument("--clock-offset-ms", type=int, default=0)
+    parser.add_argument("--rest-latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    exchange = SimulatedExchange(
+        markets=args.markets,
+        depth_rate=args.depth_rate,
+        trade_rate=args.trade_rate,
+        host=args.host,
+        port=args.port,
+        ws_port=args.ws_port,
+        clock_offset_ms=args.clock_offset_ms,
+        rest_latency=args.rest_latency,
+        seed=args.seed,
+    )
+
+    async def serve():
+        async with exchange:
+            print(f"REST {exchange.rest_url}  WebSocket {exchange.ws_url}")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import random
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+Level = List[str]
+
+
+def format_units(units: int, decimals: int) -> str:
+    """
+    Returns the decimal string of an integer amount of 10 ** -decimals units
+    """
+    return str(Decimal(units).scaleb(-decimals))
+
+
+def _decimals(increment: str) -> int:
+    return max(0, -Decimal(increment).normalize().as_tuple().exponent)
+
+
+class SyntheticMarket:
+    """
+    Random walk market producing Backpack shaped depth, trade and ticker payloads
+
+    Prices and quantities are kept as integer ticks and steps, the book always
+    holds up to `levels` levels on each side of a mid price moving by at most
+    one tick per depth update. Every depth update gets the next update id, so
+    a diff stream applied on top of snapshot() rebuilds the same book.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        price: str = "100",
+        tick_size: str = "0.01",
+        step_size: str = "0.01",
+        levels: int = 20,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            symbol: Market symbol, markets ending with _PERP are futures markets
+            price: Initial mid price
+            tick_size: Price increment
+            step_size: Quantity increment
+            levels: Number of price levels kept on each side
+            seed: Seed of the random generator, for reproducible streams
+        """
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.levels = levels
+        self.price_decimals = _decimals(tick_size)
+        self.quantity_decimals = _decimals(step_size)
+        self.random = random.Random(seed)
+        self.mid = int(Decimal(price) / Decimal(tick_size))
+        self.bids: Dict[int, int] = {}
+        self.asks: Dict[int, int] = {}
+        self.update_id = 0
+        self.trade_id = 0
+        self.last_price = self.mid
+        self.volume = 0
+        self.open_price = self.mid
+        self.high = self.mid
+        self.low = self.mid
+        self.trades = 0
+        for offset in range(1, levels + 1):
+            self.bids[self.mid - offset] = self._random_steps()
+            self.asks[self.mid + offset] = self._random_steps()
+
+    @property
+    def base_symbol(self) -> str:
+        return self.symbol.split("_")[0]
+
+    @property
+    def quote_symbol(self) -> str:
+        quote = self.symbol.split("_")[1]
+        return "USDC" if quote == "PERP" else quote
+
+    @property
+    def market_type(self) -> str:
+        return "PERP" if self.symbol.endswith("_PERP") else "SPOT"
+
+    def price(self, ticks: int) -> str:
+        return format_units(ticks, self.price_decimals)
+
+    def quantity(self, steps: int) -> str:
+        return format_units(steps, self.quantity_decimals)
+
+    def to_ticks(self, price: str) -> int:
+        return int(Decimal(price) / Decimal(self.tick_size))
+
+    def to_steps(self, quantity: str) -> int:
+        return int(Decimal(quantity) / Decimal(self.step_size))
+
+    def best_bid(self) -> Optional[int]:
+        return max(self.bids) if self.bids else None
+
+    def best_ask(self) -> Optional[int]:
+        return min(self.asks) if self.asks else None
+
+    def _margin_function(self, base: str, factor: str) -> Optional[Dict[str, Any]]:
+        if self.market_type != "PERP":
+            return None
+        return {"type": "sqrt", "base": base, "factor": factor}
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Returns the market as listed by the markets endpoint
+        """
+        return {
+            "symbol": self.symbol,
+            "baseSymbol": self.base_symbol,
+            "quoteSymbol": self.quote_symbol,
+            "marketType": self.market_type,
+            "filters": {
+                "price": {
+                    "minPrice": self.tick_size,
+                    "maxPrice": None,
+                    "tickSize": self.tick_size,
+                },
+                "quantity": {
+                    "minQuantity": self.step_size,
+                    "maxQuantity": None,
+                    "stepSize": self.step_size,
+                },
+            },
+            "imfFunction": self._margin_function("0.02", "0.0001"),
+            "mmfFunction": self._margin_function("0.01", "0.00005"),
+            "fundingInterval": 28800000 if self.market_type == "PERP" else None,
+            "orderBookState": "Open",
+            "createdAt": "2024-01-01T00:00:00",
+        }
+
+    def snapshot(self, timestamp_ms: int) -> Dict[str, Any]:
+        """
+        Returns the order book as returned by the depth endpoint
+        """
+        return {
+            "asks": [
+                [self.price(ticks), self.quantity(self.asks[ticks])]
+                for ticks in sorted(self.asks)
+            ],
+            "bids": [
+                [self.price(ticks), self.quantity(self.bids[ticks])]
+                for ticks in sorted(self.bids)
+            ],
+            "lastUpdateId": str(self.update_id),
+            "timestamp": timestamp_ms,
+        }
+
+    def next_depth(self, timestamp_us: int) -> Dict[str, Any]:
+        """
+        Moves the book and returns the change as a depth stream event
+        """
+        asks: Dict[int, int] = {}
+        bids: Dict[int, int] = {}
+        self.mid += self.random.choice((-1, 0, 0, 1))
+        # levels crossing or too far from the new mid are removed
+        for ticks in [t for t in self.bids if not 0 < self.mid - t <= self.levels]:
+            del self.bids[ticks]
+            bids[ticks] = 0
+        for ticks in [t for t in self.asks if not 0 < t - self.mid <= self.levels]:
+            del self.asks[ticks]
+            asks[ticks] = 0
+        for _ in range(self.random.randint(1, 4)):
+            offset = self.random.randint(1, self.levels)
+            steps = self._random_steps(allow_zero=True)
+            if self.random.random() < 0.5:
+                self._set(self.bids, bids, self.mid - offset, steps)
+            else:
+                self._set(self.asks, asks, self.mid + offset, steps)
+        self.update_id += 1
+        return {
+            "e": "depth",
+            "E": timestamp_us,
+            "s": self.symbol,
+            "a": self._levels(asks),
+            "b": self._levels(bids),
+            "U": self.update_id,
+            "u": self.update_id,
+            "T": timestamp_us,
+        }
+
+    def next_trade(self, timestamp_us: int) -> Dict[str, Any]:
+        """
+        Returns a trade at the touch as a trade stream event
+        """
+        buyer_is_maker = self.random.random() < 0.5
+        ticks = self.best_bid() if buyer_is_maker else self.best_ask()
+        if ticks is None:
+            ticks = self.mid
+        steps = self._random_steps()
+        self._record_trade(ticks, steps)
+        return {
+            "e": "trade",
+            "E": timestamp_us,
+            "s": self.symbol,
+            "p": self.price(ticks),
+            "q": self.quantity(steps),
+            "b": str(self.random.getrandbits(48)),
+            "a": str(self.random.getrandbits(48)),
+            "t": self.trade_id,
+            "T": timestamp_us,
+            "m": buyer_is_maker,
+        }
+
+    def fill_price(self, side: str, limit: Optional[int] = None) -> Optional[int]:
+        """
+        Returns the price in ticks an order of the given side executes at
+        against the book, None if it does not cross
+
+        Args:
+            side: "Bid" or "Ask"
+            limit: Limit price in ticks, None for a market order
+        """
+        if side == "Bid":
+            ticks = self.best_ask()
+            if ticks is None or (limit is not None and limit < ticks):
+                return None
+        else:
+            ticks = self.best_bid()
+            if ticks is None or (limit is not None and limit > ticks):
+                return None
+        return ticks
+
+    def ticker(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "firstPrice": self.price(self.open_price),
+            "lastPrice": self.price(self.last_price),
+            "priceChange": self.price(self.last_price - self.open_price),
+            "priceChangePercent": str(
+                round((self.last_price - self.open_price) / self.open_price, 6)
+            ),
+            "high": self.price(self.high),
+            "low": self.price(self.low),
+            "volume": self.quantity(self.volume),
+            "quoteVolume": str(
+                Decimal(self.quantity(self.volume)) * Decimal(self.price(self.mid))
+            ),
+            "trades": str(self.trades),
+        }
+
+    def recent_trades(self, timestamp_ms: int, limit: int) -> List[Dict[str, Any]]:
+        trades = []
+        for i in range(min(limit, self.trade_id)):
+            trades.append(
+                {
+                    "id": self.trade_id - i,
+                    "price": self.price(self.last_price),
+                    "quantity": self.quantity(1),
+                    "quoteQuantity": self.price(self.last_price),
+                    "timestamp": timestamp_ms,
+                    "isBuyerMaker": bool(i % 2),
+                }
+            )
+        return trades
+
+    def _record_trade(self, ticks: int, steps: int):
+        self.trade_id += 1
+        self.trades += 1
+        self.last_price = ticks
+        self.volume += steps
+        self.high = max(self.high, ticks)
+        self.low = min(self.low, ticks)
+
+    def _random_steps(self, allow_zero: bool = False) -> int:
+        if allow_zero and self.random.random() < 0.2:
+            return 0
+        return self.random.randint(1, 1000)
+
+    @staticmethod
+    def _set(book: Dict[int, int], changes: Dict[int, int], ticks: int, steps: int):
+        if steps:
+            book[ticks] = steps
+        elif ticks in book:
+            del book[ticks]
+        else:
+            return
+        changes[ticks] = steps
+
+    def _levels(self, changes: Dict[int, int]) -> List[Level]:
+        return [
+            [self.price(ticks), self.quantity(steps)]
+            for ticks, steps in sorted(changes.items())
+        ]
+
+
+def now_us(offset_ms: int = 0) -> int:
+    return time.time_ns() // 1000 + offset_ms * 1000
+
+
+def now_ms(offset_ms: int = 0) -> int:
+    return time.time_ns() // 1_000_000 + offset_ms
@@ -1,7 +1,9 @@
 import json
 import asyncio
-import websockets
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, List, Union
+from bpx.metrics.instrumentation import CALLBACK, DECODE, Instrumentation, now_ns
+from bpx.metrics.stream_latency import StampedFrames, StreamLatencyMonitor
+from bpx.streams.router import StreamRouter, StreamSubscription
 from bpx.base.base_ws_account import BaseWsAccount
 
 
@@ -13,7 +15,9 @@ class WsAccount(BaseWsAccount):
     def __init__(self, public_key: str, secret_key: str, window: int = 5000, 
                  debug: bool = False, on_message: Optional[Callable] = None,
                  on_error: Optional[Callable] = None, on_close: Optional[Callable] = None,
-                 on_open: Optional[Callable] = None):
+                 on_open: Optional[Callable] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 latency_monitor: Optional[StreamLatencyMonitor] = None):
         """
         Initialize WebSocket account client
         
@@ -26,6 +30,9 @@ class WsAccount(BaseWsAccount):
             on_error: Callback function for errors
             on_close: Callback function for connection close
             on_open: Callback function for connection open
+            instrumentation: Records decode and callback latency of every frame
+            latency_monitor: Records exchange-to-receive and receive-to-handler
+                latency of every stream message
         """
         super().__init__(public_key, secret_key, window, debug)
         self.ws = None
@@ -33,6 +40,9 @@ class WsAccount(BaseWsAccount):
         self.on_error_callback = on_error
         self.on_close_callback = on_close
         self.on_open_callback = on_open
+        self.router = StreamRouter()
+        self.instrumentation = instrumentation
+        self.latency_monitor = latency_monitor
         self._running = False
         self._authenticated = False
 
@@ -41,6 +51,8 @@ class WsAccount(BaseWsAccount):
         Establish WebSocket connection and start listening
         """
         try:
+            import websockets
+
             self.ws = await websockets.connect(self.get_ws_url())
             self._running = True
             
@@ -60,20 +72,41 @@ class WsAccount(BaseWsAccount):
 
     async def _listen(self):
         """Listen for incoming messages"""
+        # websockets is imported on first use to keep `import bpx` fast
+        import websockets
+
+        latency_monitor = self.latency_monitor
+        # stamped as they arrive, ahead of the handlers, when latency is monitored
+        frames = StampedFrames(self.ws) if latency_monitor is not None else None
         try:
-            async for message in self.ws:
+            async for frame in self.ws if frames is None else frames:
+                if frames is None:
+                    message = frame
+                else:
+                    message, received_ns, received = frame
+                if not self.on_message_callback and not self.router:
+                    continue
+                instrumentation = self.instrumentation
+                if instrumentation is not None:
+                    started = now_ns()
+                try:
+                    data = json.loads(message)
+                except json.JSONDecodeError:
+                    data = message
+                if instrumentation is not None:
+                    decoded = now_ns()
+                self.router.publish(data)
                 if self.on_message_callback:
-                    try:
-                        data = json.loads(message)
-                        if asyncio.iscoroutinefunction(self.on_message_callback):
-                            await self.on_message_callback(data)
-                        else:
-                            self.on_message_callback(data)
-                    except json.JSONDecodeError:
-                        if asyncio.iscoroutinefunction(self.on_message_callback):
-                            await self.on_message_callback(message)
-                        else:
-                            self.on_message_callback(message)
+                    if asyncio.iscoroutinefunction(self.on_message_callback):
+                        await self.on_message_callback(data)
+                    else:
+                        self.on_message_callback(data)
+                if latency_monitor is not None:
+                    latency_monitor.record(data, received_ns, received)
+                if instrumentation is not None:
+                    stream = data.get("stream", "") if isinstance(data, dict) else ""
+                    instrumentation.record(DECODE, decoded - started, stream)
+                    instrumentation.record(CALLBACK, now_ns() - decoded, stream)
         except websockets.exceptions.ConnectionClosed as e:
             self._authenticated = False
             if self.on_close_callback:
@@ -88,7 +121,10 @@ class WsAccount(BaseWsAccount):
                 else:
                     self.on_error_callback(e)
         finally:
+            if frames is not None:
+                frames.close()
             self._running = False
+            self.router.close()
 
     async def send(self, message: Dict[str, Any]):
         """
@@ -100,20 +136,40 @@ class WsAccount(BaseWsAccount):
         if self.ws and self.ws.close_code is None:
             await self.ws.send(json.dumps(message))
 
-    async def subscribe(self, subscription_message: Dict[str, Any]):
+    async def subscribe(self, subscription_message: Union[Dict[str, Any], List[Dict[str, Any]]]):
         """
         Subscribe to a stream
         
         Args:
-            subscription_message: Subscription message from base class methods
+            subscription_message: Subscription message from base class methods,
+                or a list of them (e.g. from subscribe_streams)
+        """
+        if isinstance(subscription_message, list):
+            for message in subscription_message:
+                await self.send(message)
+        else:
+            await self.send(subscription_message)
+
+    def stream(self, *streams: str, maxsize: int = 1000) -> StreamSubscription:
+        """
+        Returns an async iterator over the messages of the given streams,
+        the streams still have to be subscribed with subscribe()
+        
+        Args:
+            streams: Stream names (e.g. "trades.SOL_USDC"), every message if none given
+            maxsize: Maximal number of queued messages, the oldest ones are dropped when full
+        
+        Returns:
+            Stream subscription, close it or use it as async context manager when done
         """
-        await self.send(subscription_message)
+        return self.router.subscribe(streams, maxsize)
 
     async def close(self):
         """
         Close WebSocket connection
         """
         self._running = False
+        self.router.close()
         self._authenticated = False
         if self.ws and self.ws.close_code is None:
             await self.ws.close()
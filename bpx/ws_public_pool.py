@@ -0,0 +1,313 @@
+import asyncio
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Literal, Optional, Union
+from bpx.base.base_ws_public import BaseWsPublic
+from bpx.base.ws_subscriptions import subscription_runs
+from bpx.metrics.instrumentation import Instrumentation
+from bpx.metrics.stream_latency import StreamLatencyMonitor
+from bpx.streams.router import StreamRouter, StreamSubscription, all_symbols_stream
+from bpx.ws_public import WsPublic
+
+ShardingStrategyType = Literal["hash", "rate"]
+
+
+class WsPublicPool(BaseWsPublic):
+    """
+    Connection manager spreading public streams over several WebSocket connections
+
+    Streams are assigned to shards by symbol hash or by the estimated message
+    rate of every shard, the output of all shards is delivered to a single set
+    of callbacks. Shards that get hot are rebalanced by moving streams to the
+    least loaded shard.
+    """
+
+    def __init__(
+        self,
+        shards: int = 2,
+        on_message: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        on_close: Optional[Callable] = None,
+        on_open: Optional[Callable] = None,
+        strategy: ShardingStrategyType = "hash",
+        rebalance_interval: Optional[float] = 30.0,
+        hot_ratio: float = 1.5,
+        smoothing: float = 0.5,
+        client_factory: Callable[..., WsPublic] = WsPublic,
+        instrumentation: Optional[Instrumentation] = None,
+        latency_monitor: Optional[StreamLatencyMonitor] = None,
+    ):
+        """
+        Initialize WebSocket connection pool for public streams
+
+        Args:
+            shards: Number of WebSocket connections
+            on_message: Callback function for messages of every shard
+            on_error: Callback function for errors of every shard
+            on_close: Callback function for close of every shard
+            on_open: Callback function for open of every shard
+            strategy: "hash" to assign streams by symbol hash,
+                "rate" to assign streams to the shard with the lowest message rate
+            rebalance_interval: Seconds between rebalance checks, None disables them
+            hot_ratio: Shard load relative to the average load above which
+                the shard gets rebalanced
+            smoothing: Weight of the latest interval in the message rate estimate
+            client_factory: Factory creating a single connection client
+            instrumentation: Records decode and callback latency of every frame of every shard
+            latency_monitor: Records exchange-to-receive and receive-to-handler
+                latency of the stream messages of every shard
+        """
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        if strategy not in ("hash", "rate"):
+            raise ValueError(f"Unknown sharding strategy {strategy}")
+        self.on_message_callback = on_message
+        self.on_error_callback = on_error
+        self.on_close_callback = on_close
+        self.on_open_callback = on_open
+        self.router = StreamRouter()
+        self.strategy = strategy
+        self.rebalance_interval = rebalance_interval
+        self.hot_ratio = hot_ratio
+        self.smoothing = smoothing
+        self.clients: List[WsPublic] = [
+            client_factory(**self._shard_callbacks(index)) for index in range(shards)
+        ]
+        for client in self.clients:
+            if instrumentation is not None:
+                client.instrumentation = instrumentation
+            if latency_monitor is not None:
+                client.latency_monitor = latency_monitor
+        self.assignments: Dict[str, int] = {}
+        self.rates: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._last_sample = time.monotonic()
+        self._rebalance_task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        """
+        Establish all WebSocket connections and listen until every one of them is closed
+        """
+        if self.rebalance_interval and self._rebalance_task is None:
+            self._rebalance_task = asyncio.ensure_future(self._rebalance_loop())
+        try:
+            await asyncio.gather(*(client.connect() for client in self.clients))
+        finally:
+            if self._rebalance_task is not None:
+                self._rebalance_task.cancel()
+                self._rebalance_task = None
+            self.router.close()
+
+    async def subscribe(
+        self, subscription_message: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ):
+        """
+        Subscribe or unsubscribe streams, routing every stream to its shard
+
+        Streams landing on the same shard are packed into as few messages as
+        possible. Consecutive messages with the same method are packed together,
+        the runs are sent in the order of the messages.
+
+        Args:
+            subscription_message: Subscription message from base class methods,
+                or a list of them (e.g. from subscribe_streams)
+        """
+        if isinstance(subscription_message, dict):
+            subscription_message = [subscription_message]
+        for method, streams in subscription_runs(subscription_message):
+            if method == "UNSUBSCRIBE":
+                await self._unsubscribe_run(streams)
+            else:
+                await self._subscribe_run(streams)
+
+    async def send(self, message: Dict[str, Any]):
+        """
+        Send message to every WebSocket connection
+
+        Args:
+            message: Message dict to send
+        """
+        await asyncio.gather(*(client.send(message) for client in self.clients))
+
+    def stream(self, *streams: str, maxsize: int = 1000) -> StreamSubscription:
+        """
+        Returns an async iterator over the messages of the given streams of every shard,
+        the streams still have to be subscribed with subscribe()
+
+        Args:
+            streams: Stream names (e.g. "trades.SOL_USDC" or "tickers"), every
+                message if none given
+            maxsize: Maximal number of queued messages, the oldest ones are dropped when full
+        """
+        return self.router.subscribe(streams, maxsize)
+
+    async def close(self):
+        """
+        Close all WebSocket connections
+        """
+        self.router.close()
+        if self._rebalance_task is not None:
+            self._rebalance_task.cancel()
+            self._rebalance_task = None
+        await asyncio.gather(*(client.close() for client in self.clients))
+
+    def shard_for(self, stream: str) -> int:
+        """
+        Returns the shard index a new stream is assigned to
+
+        Args:
+            stream: Stream name (e.g. "depth.SOL_USDC")
+        """
+        if self.strategy == "rate":
+            loads = self.shard_loads()
+            return loads.index(min(loads))
+        symbol = stream.split(".")[1] if "." in stream else stream
+        return zlib.crc32(symbol.encode()) % len(self.clients)
+
+    def shard_streams(self, shard: int) -> List[str]:
+        """
+        Returns the streams assigned to a shard
+        """
+        return [s for s, index in self.assignments.items() if index == shard]
+
+    def shard_loads(self) -> List[float]:
+        """
+        Returns the estimated messages per second of every shard
+        """
+        loads = [0.0] * len(self.clients)
+        for stream, shard in self.assignments.items():
+            loads[shard] += self.rates.get(stream, 0.0)
+        return loads
+
+    def sample_rates(self):
+        """
+        Updates the per stream message rate estimates with the messages
+        counted since the previous sample
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_sample
+        if elapsed <= 0:
+            return
+        self._last_sample = now
+        for stream in self.assignments:
+            rate = self._counts.get(stream, 0) / elapsed
+            previous = self.rates.get(stream)
+            if previous is None:
+                self.rates[stream] = rate
+            else:
+                self.rates[stream] = (
+                    self.smoothing * rate + (1 - self.smoothing) * previous
+                )
+        self._counts = {}
+
+    async def rebalance(self) -> List[str]:
+        """
+        Moves streams from hot shards to the least loaded shard
+
+        The stream is subscribed on the new shard before it is unsubscribed
+        from the old one, so a few messages can be delivered twice while moving.
+
+        Returns:
+            Moved streams
+        """
+        moved = []
+        if len(self.clients) < 2:
+            return moved
+        while True:
+            loads = self.shard_loads()
+            average = sum(loads) / len(loads)
+            hot = loads.index(max(loads))
+            cool = loads.index(min(loads))
+            if average <= 0 or loads[hot] <= self.hot_ratio * average:
+                break
+            gap = loads[hot] - loads[cool]
+            candidates = [
+                stream
+                for stream in self.shard_streams(hot)
+                if 0 < self.rates.get(stream, 0.0) < gap and stream not in moved
+            ]
+            if len(self.shard_streams(hot)) < 2 or not candidates:
+                break
+            # moving the stream closest to half of the gap evens the two shards the most
+            stream = min(candidates, key=lambda s: abs(self.rates[s] - gap / 2))
+            self.assignments[stream] = cool
+            await self.clients[cool].send({"method": "SUBSCRIBE", "params": [stream]})
+            await self.clients[hot].send({"method": "UNSUBSCRIBE", "params": [stream]})
+            moved.append(stream)
+        return moved
+
+    async def _rebalance_loop(self):
+        while True:
+            await asyncio.sleep(self.rebalance_interval)
+            self.sample_rates()
+            try:
+                await self.rebalance()
+            except Exception as e:
+                await self._call(self.on_error_callback, e)
+
+    async def _subscribe_run(self, streams: List[str]):
+        by_shard: Dict[int, List[str]] = {}
+        for stream in streams:
+            if stream not in self.assignments:
+                self.assignments[stream] = self.shard_for(stream)
+            by_shard.setdefault(self.assignments[stream], []).append(stream)
+        for shard, shard_streams in by_shard.items():
+            await self.clients[shard].subscribe(self.subscribe_streams(shard_streams))
+
+    async def _unsubscribe_run(self, streams: List[str]):
+        by_shard: Dict[int, List[str]] = {}
+        for stream in streams:
+            shard = self.assignments.pop(stream, None)
+            self.rates.pop(stream, None)
+            self._counts.pop(stream, None)
+            if shard is not None:
+                by_shard.setdefault(shard, []).append(stream)
+        for shard, shard_streams in by_shard.items():
+            await self.clients[shard].subscribe(self.unsubscribe_streams(shard_streams))
+
+    def _shard_callbacks(self, index: int) -> Dict[str, Callable]:
+        async def on_message(message):
+            if isinstance(message, dict):
+                stream = self._subscribed_stream(message.get("stream"))
+                if stream is not None:
+                    self._counts[stream] = self._counts.get(stream, 0) + 1
+            self.router.publish(message)
+            await self._call(self.on_message_callback, message)
+
+        async def on_open():
+            # (re)subscribe streams assigned before the connection was established
+            streams = self.shard_streams(index)
+            if streams:
+                await self.clients[index].subscribe(self.subscribe_streams(streams))
+            await self._call(self.on_open_callback)
+
+        async def on_error(error):
+            await self._call(self.on_error_callback, error)
+
+        async def on_close(code, reason):
+            await self._call(self.on_close_callback, code, reason)
+
+        return {
+            "on_message": on_message,
+            "on_error": on_error,
+            "on_close": on_close,
+            "on_open": on_open,
+        }
+
+    def _subscribed_stream(self, stream: Optional[str]) -> Optional[str]:
+        # name of the subscribed stream a message stream belongs to
+        if stream in self.assignments:
+            return stream
+        aggregate = all_symbols_stream(stream)
+        if aggregate in self.assignments:
+            return aggregate
+        return None
+
+    @staticmethod
+    async def _call(callback: Optional[Callable], *args):
+        if callback is None:
+            return
+        if asyncio.iscoroutinefunction(callback):
+            await callback(*args)
+        else:
+            callback(*args)
@@ -0,0 +1,329 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from bpx.base.base_ws_account import BaseWsAccount
+from bpx.base.base_ws_public import BaseWsPublic
+from bpx.exceptions import StreamClosedError
+from bpx.streams.ring_buffer import RingBuffer
+from bpx.ws_account import WsAccount
+from bpx.ws_public import WsPublic
+
+
+class ThreadedWsClient:
+    """
+    Synchronous facade running an asynchronous WebSocket client on a dedicated thread
+
+    The socket is read by an event loop owned by a background thread which only
+    appends decoded messages to a thread-safe ring buffer. Messages are consumed
+    either by pulling them (get, drain, iteration) or, when on_message is given,
+    by a dispatcher thread calling it in order, so a slow callback never delays
+    the socket reader. on_open, on_error and on_close run on a separate event thread.
+    """
+
+    def __init__(
+        self,
+        client: Union[WsPublic, WsAccount],
+        on_message: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        on_close: Optional[Callable] = None,
+        on_open: Optional[Callable] = None,
+        buffer_size: int = 10000,
+    ):
+        """
+        Args:
+            client: Asynchronous WebSocket client to run
+            on_message: Callback function for messages, pull messages with get() if None
+            on_error: Callback function for errors
+            on_close: Callback function for connection close
+            on_open: Callback function for connection open
+            buffer_size: Maximal number of buffered messages, the oldest ones are
+                overwritten when the consumer falls behind
+        """
+        self.client = client
+        self.buffer = RingBuffer(buffer_size)
+        self.on_message_callback = on_message
+        self.on_error_callback = on_error
+        self.on_close_callback = on_close
+        self.on_open_callback = on_open
+        client.on_message_callback = self.buffer.put
+        client.on_error_callback = self._on_error
+        client.on_close_callback = self._on_close
+        client.on_open_callback = self._on_open
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._events = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="bpx-ws-events"
+        )
+        self._opened = threading.Event()
+        self._ready = threading.Event()
+        self._stopped = False
+
+    def __enter__(self) -> "ThreadedWsClient":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yields messages until the connection is closed
+        """
+        while True:
+            try:
+                yield self.buffer.get()
+            except StreamClosedError:
+                return
+
+    @property
+    def connected(self) -> bool:
+        return (
+            self._opened.is_set()
+            and self._thread is not None
+            and self._thread.is_alive()
+        )
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of messages overwritten because the consumer fell behind
+        """
+        return self.buffer.dropped
+
+    def start(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Starts the event loop thread and waits for the connection
+
+        Args:
+            timeout: Seconds to wait for the connection to open
+
+        Returns:
+            True if the connection is open
+        """
+        if self._thread is not None:
+            raise RuntimeError("Client is already started")
+        self._thread = threading.Thread(
+            target=self._run, name="bpx-ws-loop", daemon=True
+        )
+        self._thread.start()
+        if self.on_message_callback is not None:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="bpx-ws-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+        self._ready.wait(timeout)
+        return self.connected
+
+    def subscribe(
+        self,
+        subscription_message: Union[Dict[str, Any], List[Dict[str, Any]]],
+        timeout: Optional[float] = 10.0,
+    ):
+        """
+        Subscribe to a stream
+
+        Args:
+            subscription_message: Subscription message from base class methods,
+                or a list of them (e.g. from subscribe_streams)
+            timeout: Seconds to wait for the message to be sent
+        """
+        self._submit(self.client.subscribe(subscription_message), timeout)
+
+    def send(self, message: Dict[str, Any], timeout: Optional[float] = 10.0):
+        """
+        Send message to WebSocket server
+
+        Args:
+            message: Message dict to send
+            timeout: Seconds to wait for the message to be sent
+        """
+        self._submit(self.client.send(message), timeout)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Returns the next message
+
+        Args:
+            timeout: Seconds to wait, raises queue.Empty when exceeded
+
+        Raises:
+            StreamClosedError: the connection is closed and every message was read
+        """
+        return self.buffer.get(timeout)
+
+    def drain(
+        self, max_items: Optional[int] = None, timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Returns up to max_items buffered messages at once, waiting for at least one
+
+        Raises:
+            StreamClosedError: the connection is closed and every message was read
+        """
+        return self.buffer.drain(max_items, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Closes the connection and stops the background threads
+
+        The event loop is stopped when the client does not close within timeout.
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                self._submit(self.client.close(), timeout)
+            except RuntimeError:
+                # the loop stopped in the meantime
+                pass
+            except FutureTimeoutError:
+                self._stopped = True
+                try:
+                    loop.call_soon_threadsafe(loop.stop)
+                except RuntimeError:
+                    # the loop closed in the meantime
+                    pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.buffer.close()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout)
+        self._events.shutdown(wait=False)
+
+    def _submit(self, coroutine, timeout: Optional[float]):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coroutine.close()
+            raise RuntimeError("Client is not running, call start() first")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self.client.connect())
+        except RuntimeError:
+            # close() stops the loop when the client does not close in time
+            if not self._stopped:
+                raise
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self._opened.clear()
+            self._ready.set()
+            self.buffer.close()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def _dispatch(self):
+        while True:
+            try:
+                messages = self.buffer.drain()
+            except StreamClosedError:
+                return
+            for message in messages:
+                try:
+                    self.on_message_callback(message)
+                except Exception as e:
+                    self._on_error(e)
+
+    def _on_open(self):
+        self._opened.set()
+        self._ready.set()
+        self._notify(self.on_open_callback)
+
+    def _on_error(self, error: Exception):
+        self._notify(self.on_error_callback, error)
+
+    def _on_close(self, code: int, reason: str):
+        self._opened.clear()
+        self._notify(self.on_close_callback, code, reason)
+
+    def _notify(self, callback: Optional[Callable], *args):
+        if callback is None:
+            return
+        try:
+            self._events.submit(callback, *args)
+        except RuntimeError:
+            # executor already shut down by close()
+            pass
+
+
+class ThreadedWsPublic(ThreadedWsClient, BaseWsPublic):
+    """
+    Synchronous WebSocket client for public streams running its event loop on a thread
+
+    Usage:
+        with ThreadedWsPublic() as ws:
+            ws.subscribe(ws.subscribe_trades("SOL_USDC"))
+            for message in ws:
+                ...
+    """
+
+    def __init__(
+        self,
+        on_message: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        on_close: Optional[Callable] = None,
+        on_open: Optional[Callable] = None,
+        buffer_size: int = 10000,
+    ):
+        """
+        Initialize threaded WebSocket public client
+
+        Args:
+            on_message: Callback function for messages, pull messages with get() if None
+            on_error: Callback function for errors
+            on_close: Callback function for connection close
+            on_open: Callback function for connection open
+            buffer_size: Maximal number of buffered messages
+        """
+        ThreadedWsClient.__init__(
+            self, WsPublic(), on_message, on_error, on_close, on_open, buffer_size
+        )
+
+
+class ThreadedWsAccount(ThreadedWsClient, BaseWsAccount):
+    """
+    Synchronous WebSocket client for authenticated streams running its event loop on a thread
+    """
+
+    def __init__(
+        self,
+        public_key: str,
+        secret_key: str,
+        window: int = 5000,
+        debug: bool = False,
+        on_message: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        on_close: Optional[Callable] = None,
+        on_open: Optional[Callable] = None,
+        buffer_size: int = 10000,
+    ):
+        """
+        Initialize threaded WebSocket account client
+
+        Args:
+            public_key: API public key
+            secret_key: API secret key (base64 encoded)
+            window: Time window for signature validity in milliseconds
+            debug: Enable debug mode
+            on_message: Callback function for messages, pull messages with get() if None
+            on_error: Callback function for errors
+            on_close: Callback function for connection close
+            on_open: Callback function for connection open
+            buffer_size: Maximal number of buffered messages
+        """
+        BaseWsAccount.__init__(self, public_key, secret_key, window, debug)
+        ThreadedWsClient.__init__(
+            self,
+            WsAccount(public_key, secret_key, window, debug),
+            on_message,
+            on_error,
+            on_close,
+            on_open,
+            buffer_size,
+        )
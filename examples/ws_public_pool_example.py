@@ -0,0 +1,50 @@
+from bpx.ws_public_pool import WsPublicPool
+import asyncio
+
+
+async def on_message(message):
+    print(f"收到消息: {message}")
+
+
+async def on_error(error):
+    print(f"错误: {error}")
+
+
+async def on_close(status_code, msg):
+    print(f"连接关闭: {status_code} - {msg}")
+
+
+async def main():
+    # 创建包含3个连接的连接池，按symbol哈希分配订阅
+    pool = WsPublicPool(
+        shards=3,
+        on_message=on_message,
+        on_error=on_error,
+        on_close=on_close,
+        strategy="hash",
+        rebalance_interval=10,
+    )
+
+    symbols = ["SOL_USDC", "BTC_USDC", "ETH_USDC", "SOL_USDC_PERP", "BTC_USDC_PERP"]
+
+    # 连接前订阅的流会在每个连接建立后自动发送
+    for symbol in symbols:
+        await pool.subscribe(pool.subscribe_depth(symbol))
+        await pool.subscribe(pool.subscribe_trades(symbol))
+
+    connect_task = asyncio.create_task(pool.connect())
+
+    # 保持运行30秒
+    try:
+        await asyncio.sleep(30)
+        for shard in range(len(pool.clients)):
+            print(f"连接 {shard}: {pool.shard_streams(shard)}")
+    except KeyboardInterrupt:
+        print("\n正在关闭连接...")
+    finally:
+        await pool.close()
+        await connect_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
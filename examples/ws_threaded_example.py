@@ -0,0 +1,19 @@
+from bpx.ws_threaded import ThreadedWsPublic
+import time
+
+
+def ws_threaded_example():
+    # no event loop needed, the connection runs on a background thread
+    with ThreadedWsPublic(buffer_size=50000) as ws:
+        ws.subscribe(ws.subscribe_streams(["trades.SOL_USDC", "depth.SOL_USDC"]))
+
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            for message in ws.drain(max_items=500, timeout=1):
+                print(message)
+
+        print("Dropped messages:", ws.dropped)
+
+
+if __name__ == "__main__":
+    ws_threaded_example()
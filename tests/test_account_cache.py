@@ -0,0 +1,104 @@
+import asyncio
+import time
+from decimal import Decimal
+import pytest
+from bpx.async_.account import Account as AsyncAccount
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.state.account import BALANCE, POSITION, AccountCache
+from bpx.testing.exchange import SimulatedExchange
+from bpx.ws_account import WsAccount
+from tests.test_simulated_exchange import generate_keys
+
+
+def test_stream_updates_versions_and_listeners():
+    cache = AccountCache()
+    changes = []
+    unsubscribe = cache.subscribe(lambda *change: changes.append(change))
+    cache.apply_balances({"USDC": {"available": "100", "locked": "0", "staked": "0"}})
+    cache.apply_balance_update(
+        {"e": "balanceUpdate", "a": "USDC", "f": "80", "l": "20"}
+    )
+    assert cache.available("USDC") == Decimal(80)
+    assert cache.balances["USDC"]["staked"] == "0"
+    assert cache.version == 2 and cache.versions[(BALANCE, "USDC")] == 2
+
+    cache.apply_position_update(
+        {"e": "positionOpened", "s": "SOL_USDC_PERP", "q": "-1.5", "B": "150"}
+    )
+    assert cache.position_quantity("SOL_USDC_PERP") == Decimal("-1.5")
+    cache.apply_position_update({"e": "positionClosed", "s": "SOL_USDC_PERP"})
+    assert cache.positions == {} and cache.position_quantity("SOL_USDC_PERP") == 0
+    assert [change[:2] for change in changes] == [
+        (BALANCE, "USDC"),
+        (BALANCE, "USDC"),
+        (POSITION, "SOL_USDC_PERP"),
+        (POSITION, "SOL_USDC_PERP"),
+    ]
+    assert changes[-1][2] is None
+    unsubscribe()
+    cache.apply_balance_update({"a": "SOL", "f": "1"})
+    assert len(changes) == 4
+
+
+def test_snapshots_record_mismatches():
+    cache = AccountCache()
+    cache.apply_balances({"USDC": {"available": "100", "locked": "0"}})
+    cache.apply_positions([{"symbol": "BTC_USDC_PERP", "netQuantity": "1"}])
+    assert cache.mismatches == []
+
+    requested = time.monotonic()
+    cache.apply_balance_update({"a": "SOL", "f": "2.50"})
+    cache.apply_balances(
+        {"USDC": {"available": "90", "locked": "0"}, "SOL": {"available": "0"}},
+        requested,
+    )
+    # SOL changed while the request was in flight and is kept
+    assert cache.balances["SOL"] == {"available": "2.50"}
+    assert cache.mismatches == [
+        (
+            BALANCE,
+            "USDC",
+            {"available": "100", "locked": "0"},
+            {"available": "90", "locked": "0"},
+        )
+    ]
+    version = cache.version
+    cache.apply_balances(
+        {"USDC": {"available": "90.0", "locked": "0"}, "SOL": {"available": "2.5"}}
+    )
+    assert cache.mismatches == [] and cache.version == version
+
+    cache.apply_positions([])
+    assert cache.positions == {}
+    assert cache.mismatches[0][:2] == (POSITION, "BTC_USDC_PERP")
+
+
+@pytest.mark.asyncio
+async def test_cache_follows_simulated_exchange_balances():
+    keys = generate_keys()
+    async with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(AsyncAccount(*keys, http_client=AsyncHttpClient()))
+        cache = AccountCache(
+            balances_fetcher=account.get_balances,
+            positions_fetcher=account.get_open_positions,
+            collateral_fetcher=account.get_collateral,
+        )
+        ws = exchange.attach(WsAccount(*keys, on_message=cache.on_message))
+        connect = asyncio.ensure_future(ws.connect())
+        while ws.ws is None:
+            await asyncio.sleep(0.01)
+        await ws.subscribe(ws.subscribe_balance_update())
+        await cache.refresh()
+        sol = cache.available("SOL")
+        assert cache.collateral["netEquity"] == cache.balances["USDC"]["available"]
+
+        await account.execute_order("SOL_USDC", "Bid", "Market", quantity="2")
+        for _ in range(100):
+            if cache.available("SOL") != sol:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.available("SOL") == sol + 2
+        await cache.refresh()
+        assert cache.mismatches == []
+        await ws.close()
+        await connect
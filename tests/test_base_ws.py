@@ -0,0 +1,74 @@
+from bpx.base.base_ws_public import BaseWsPublic
+from bpx.base.base_ws_account import BaseWsAccount
+import pytest
+import os
+
+secret_key = os.getenv("SECRET_KEY")
+
+
+@pytest.fixture
+def base_ws_public():
+    return BaseWsPublic()
+
+
+@pytest.fixture
+def base_ws_account():
+    return BaseWsAccount(public_key="key", secret_key=secret_key)
+
+
+def test_subscribe_streams_packs_and_splits(base_ws_public):
+    streams = [f"depth.SYMBOL_{i}" for i in range(5)]
+
+    messages = base_ws_public.subscribe_streams(streams + streams[:2], max_streams=2)
+
+    assert messages == [
+        {"method": "SUBSCRIBE", "params": streams[0:2]},
+        {"method": "SUBSCRIBE", "params": streams[2:4]},
+        {"method": "SUBSCRIBE", "params": streams[4:5]},
+    ]
+    assert base_ws_public.subscribe_streams([]) == []
+    with pytest.raises(ValueError):
+        base_ws_public.subscribe_streams(streams, max_streams=-1)
+
+
+def test_combine_subscriptions(base_ws_public):
+    messages = base_ws_public.combine_subscriptions(
+        [
+            base_ws_public.subscribe_depth("SOL_USDC"),
+            base_ws_public.subscribe_trades("SOL_USDC"),
+            base_ws_public.unsubscribe(["ticker.SOL_USDC"]),
+            base_ws_public.subscribe_klines("SOL_USDC", "1m"),
+        ]
+    )
+
+    assert messages == [
+        {"method": "SUBSCRIBE", "params": ["depth.SOL_USDC", "trades.SOL_USDC"]},
+        {"method": "UNSUBSCRIBE", "params": ["ticker.SOL_USDC"]},
+        {"method": "SUBSCRIBE", "params": ["kline.SOL_USDC.1m"]},
+    ]
+
+
+def test_combine_subscriptions_keeps_resubscribe_after_unsubscribe(base_ws_public):
+    messages = base_ws_public.combine_subscriptions(
+        [
+            base_ws_public.unsubscribe(["depth.SOL_USDC"]),
+            base_ws_public.subscribe_depth("SOL_USDC"),
+        ]
+    )
+
+    assert [m["method"] for m in messages] == ["UNSUBSCRIBE", "SUBSCRIBE"]
+
+
+def test_account_subscribe_streams_are_signed(base_ws_account):
+    streams = ["account.orderUpdate", "account.positionUpdate", "account.fillUpdate"]
+
+    messages = base_ws_account.subscribe_streams(streams, max_streams=2)
+    unsubscribe = base_ws_account.unsubscribe_streams(streams)
+
+    assert [m["params"] for m in messages] == [streams[:2], streams[2:]]
+    assert unsubscribe[0]["method"] == "UNSUBSCRIBE"
+    assert unsubscribe[0]["params"] == streams
+    for message in messages + unsubscribe:
+        assert message["apiKey"] == "key"
+        assert message["signature"]
+        assert message["window"] == 5000
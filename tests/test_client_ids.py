@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from bpx.async_.account import Account as AsyncAccount
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.state.client_ids import CLIENT_ID_MAX, ClientIdAllocator, PendingOrders
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+
+def test_allocator_is_unique_across_threads():
+    allocator = ClientIdAllocator(start=CLIENT_ID_MAX - 500)
+    ids = []
+
+    def allocate():
+        ids.extend(allocator.allocate() for _ in range(1000))
+
+    threads = [threading.Thread(target=allocate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 4000
+    # wraps around without ever returning 0
+    assert min(ids) == 1 and max(ids) == CLIENT_ID_MAX
+
+
+class FlakyAccount:
+    """
+    Account losing the first order request before it reaches the exchange
+    """
+
+    window = 50
+
+    def __init__(self):
+        self.sent = []
+
+    async def execute_order(self, symbol, **params):
+        self.sent.append(params["client_id"])
+        if len(self.sent) == 1:
+            raise asyncio.TimeoutError()
+        return {"id": "1", "clientId": params["client_id"], "status": "New"}
+
+    async def get_open_order(self, symbol, client_id):
+        return {"code": "RESOURCE_NOT_FOUND", "message": "Order not found"}
+
+    async def get_order_history(self, symbol, limit, offset):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_resends_lost_order_with_the_same_client_id():
+    account = FlakyAccount()
+    orders = PendingOrders(account, ClientIdAllocator(start=10), margin=0)
+    order = await orders.execute_order("SOL_USDC", "Bid", "Limit", quantity="1")
+    assert order["status"] == "New"
+    assert account.sent == [11, 11]
+    assert orders.pending == {}
+
+
+class LostResponse:
+    """
+    Account whose first order reaches the exchange but the response is lost
+    """
+
+    def __init__(self, account):
+        self.account = account
+        self.window = account.window
+        self.requests = []
+
+    async def execute_order(self, **params):
+        request = asyncio.ensure_future(self.account.execute_order(**params))
+        self.requests.append(request)
+        if len(self.requests) == 1:
+            raise asyncio.TimeoutError()
+        return await request
+
+    def __getattr__(self, name):
+        return getattr(self.account, name)
+
+
+@pytest.mark.asyncio
+async def test_timed_out_order_is_found_instead_of_duplicated():
+    public_key, secret_key = generate_keys()
+    async with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        account = exchange.attach(
+            AsyncAccount(
+                public_key, secret_key, window=200, http_client=AsyncHttpClient()
+            )
+        )
+        lossy = LostResponse(account)
+        orders = PendingOrders(lossy, margin=0.05)
+        order = await orders.execute_order(
+            "SOL_USDC", "Bid", "Limit", quantity="1", price="100", client_id=7
+        )
+        open_orders = await account.get_open_orders(symbol="SOL_USDC")
+    assert len(lossy.requests) == 1
+    assert order["clientId"] == 7
+    assert [o["id"] for o in open_orders] == [order["id"]]
+
+
+class QueuedSyncAccount:
+    """
+    Sync account whose order request fails after it was signed
+    """
+
+    window = 100
+
+    def __init__(self):
+        self.signed = []
+        self.looked_up = []
+
+    def execute_order(self, symbol, **params):
+        self.signed.append(time.time())
+        if len(self.signed) == 1:
+            raise ConnectionResetError()
+        return {"id": "2", "clientId": params["client_id"], "status": "New"}
+
+    def get_open_order(self, symbol, client_id):
+        self.looked_up.append(time.time())
+        return {"code": "RESOURCE_NOT_FOUND", "message": "Order not found"}
+
+    def get_order_history(self, symbol, limit, offset):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_window_starts_when_a_queued_sync_call_runs():
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop.set_default_executor(executor)
+    account = QueuedSyncAccount()
+    orders = PendingOrders(account, margin=0)
+    # the only executor thread is busy when the order is placed
+    loop.run_in_executor(None, time.sleep, 0.2)
+    order = await orders.execute_order("SOL_USDC", "Bid", "Market", quantity="1")
+    assert order["id"] == "2"
+    assert account.looked_up[0] >= account.signed[0] + account.window / 1000
@@ -0,0 +1,95 @@
+import pytest
+from bpx.account import Account
+from bpx.async_.account import Account as AsyncAccount
+from bpx.exceptions import UnexpectedResponseError
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.models.columnar import FILL_COLUMNS, TRADE_COLUMNS, to_arrow, to_numpy
+from bpx.pagination import iter_pages
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+numpy = pytest.importorskip("numpy")
+
+TRADES = [
+    {
+        "id": 1,
+        "price": "150.105",
+        "quantity": "2",
+        "quoteQuantity": "300.21",
+        "timestamp": 1714564800000,
+        "isBuyerMaker": True,
+    },
+    {"id": 2, "price": None, "quantity": "0.5", "timestamp": None},
+]
+
+
+def test_numpy_columns():
+    trades = to_numpy(TRADES, TRADE_COLUMNS)
+    assert trades.dtype["price"] == numpy.float64
+    assert trades["price"][0] == 150.105 and numpy.isnan(trades["price"][1])
+    assert trades["timestamp"][0] == numpy.datetime64("2024-05-01T12:00:00", "ms")
+    assert numpy.isnat(trades["timestamp"][1])
+    assert trades["is_buyer_maker"].tolist() == [True, False]
+
+    scaled = to_numpy(
+        b'[{"id": "7", "price": "150.105", "quantity": "2"}]', TRADE_COLUMNS, 3
+    )
+    assert scaled.dtype["price"] == numpy.int64
+    assert scaled["price"].tolist() == [150105] and scaled["id"].tolist() == [7]
+
+
+def test_arrow_columns():
+    pyarrow = pytest.importorskip("pyarrow")
+    batch = to_arrow(TRADES, TRADE_COLUMNS, decimals=2)
+    assert batch.schema.field("quantity").type == pyarrow.int64()
+    assert batch.column("quantity").to_pylist() == [200, 50]
+
+
+def test_iter_pages_stops_on_short_page_and_errors():
+    pages = list(
+        iter_pages(lambda limit, offset: list(range(offset, min(5, offset + limit))), 2)
+    )
+    assert pages == [[0, 1], [2, 3], [4]]
+    assert list(iter_pages(lambda limit, offset: [], 2)) == []
+    with pytest.raises(UnexpectedResponseError):
+        list(iter_pages(lambda limit, offset: {"code": "INVALID_CLIENT_REQUEST"}, 2))
+
+
+def test_fill_history_pages_as_arrays():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(
+            Account(public_key, secret_key, default_http_client=SyncHttpClient())
+        )
+        for _ in range(5):
+            account.execute_order("SOL_USDC", "Bid", "Market", quantity="1.5")
+        page = account.get_fill_history(symbol="SOL_USDC", columnar="numpy")
+        pages = list(
+            account.iter_fill_history(
+                symbol="SOL_USDC", page_size=2, columnar="numpy", decimals=2
+            )
+        )
+    assert page.dtype.names == tuple(column.name for column in FILL_COLUMNS)
+    assert page["quantity"].tolist() == [1.5] * 5
+    assert [len(p) for p in pages] == [2, 2, 1]
+    fills = numpy.concatenate(pages)
+    assert fills["quantity"].tolist() == [150] * 5
+    assert fills["trade_id"].tolist() == page["trade_id"].tolist()
+
+
+@pytest.mark.asyncio
+async def test_async_order_history_pages():
+    public_key, secret_key = generate_keys()
+    async with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(
+            AsyncAccount(public_key, secret_key, http_client=AsyncHttpClient())
+        )
+        for _ in range(3):
+            await account.execute_order("SOL_USDC", "Bid", "Market", quantity="1")
+        pages = [
+            page
+            async for page in account.iter_order_history(page_size=2, columnar="numpy")
+        ]
+    assert [len(page) for page in pages] == [2, 1]
+    assert set(numpy.concatenate(pages)["status"]) == {"Filled"}
@@ -0,0 +1,76 @@
+import pytest
+from decimal import Decimal
+from bpx.order_book.compact_order_book import CompactOrderBook
+
+MARKET = {
+    "symbol": "SOL_USDC",
+    "filters": {
+        "price": {"tickSize": "0.01"},
+        "quantity": {"stepSize": "0.001"},
+    },
+}
+
+SNAPSHOT = {
+    "bids": [["99.00", "1"], ["98.50", "2.5"], ["97.01", "3"]],
+    "asks": [["101.00", "1"], ["102.25", "2"], ["103.00", "3"]],
+    "lastUpdateId": "100",
+}
+
+
+@pytest.fixture
+def book():
+    book = CompactOrderBook.from_market(MARKET, capacity=2)
+    book.apply_snapshot(SNAPSHOT)
+    return book
+
+
+def test_levels_are_scaled_to_ticks(book):
+    assert book.bids.capacity >= 3
+    assert list(book.bids.ticks[: len(book.bids)]) == [9701, 9850, 9900]
+    assert list(book.bids.steps[: len(book.bids)]) == [3000, 2500, 1000]
+    assert book.best_bid() == (Decimal("99.00"), Decimal("1.000"))
+    assert book.best_ask() == (Decimal("101.00"), Decimal("1.000"))
+    assert book.top(2)["asks"] == [
+        (Decimal("101.00"), Decimal("1.000")),
+        (Decimal("102.25"), Decimal("2.000")),
+    ]
+    assert book.vwap("Ask", "2") == Decimal("98.75")
+
+
+def test_updates_in_place_with_live_views(book):
+    # best last on both sides, the ticks of asks are negated
+    ticks, steps = book.asks.top_view(2)
+    assert list(ticks) == [-10225, -10100]
+    assert list(steps) == [2000, 1000]
+
+    book.apply_update({"U": 101, "u": 101, "a": [["101.00", "5"]], "b": []})
+    assert list(steps) == [2000, 5000]
+
+    book.apply_update({"U": 102, "u": 102, "a": [["101.00", "0"]], "b": []})
+    book.apply_update({"U": 103, "u": 103, "a": [["100.50", "4"]], "b": []})
+    assert list(ticks) == [-10225, -10050]
+    assert book.best_ask() == (Decimal("100.50"), Decimal("4.000"))
+    assert [price for price, _ in book.asks.levels()] == [
+        Decimal("100.50"),
+        Decimal("102.25"),
+        Decimal("103.00"),
+    ]
+
+    bid_ticks, _ = book.bids.top_view(2)
+    assert list(bid_ticks) == [9850, 9900]
+
+
+def test_growing_keeps_views_readable(book):
+    book.bids.update("99.50", "1")
+    assert len(book.bids) == book.bids.capacity
+    ticks, _ = book.bids.top_view()
+    for i in range(10):
+        book.bids.update(f"{90 + i}.25", "1")
+    assert len(book.bids) == 14
+    assert list(ticks) == [9701, 9850, 9900, 9950]
+    assert book.best_bid() == (Decimal("99.50"), Decimal("1.000"))
+
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        CompactOrderBook("SOL_USDC", tick_size="0", step_size="1")
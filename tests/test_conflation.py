@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from bpx.streams.conflation import Conflator
+
+
+def ticker(symbol, close):
+    return {
+        "stream": f"ticker.{symbol}",
+        "data": {"e": "ticker", "s": symbol, "c": close},
+    }
+
+
+@pytest.mark.asyncio
+async def test_conflates_latest_value_per_symbol():
+    updates = []
+    conflator = Conflator(on_update=updates.append, interval=0.05)
+
+    await conflator.on_message(ticker("SOL_USDC", "1"))
+    await conflator.on_message(ticker("SOL_USDC", "2"))
+    await conflator.on_message(ticker("BTC_USDC", "3"))
+    await asyncio.sleep(0.01)
+
+    assert len(updates) == 1
+    assert updates[0]["SOL_USDC"]["c"] == "2"
+    assert updates[0]["BTC_USDC"]["c"] == "3"
+
+    await conflator.on_message(ticker("SOL_USDC", "4"))
+    await conflator.on_message(ticker("SOL_USDC", "5"))
+    await asyncio.sleep(0.01)
+    assert len(updates) == 1
+    assert conflator.pending() == {"SOL_USDC"}
+
+    await asyncio.sleep(0.06)
+    assert len(updates) == 2
+    assert updates[1] == {"SOL_USDC": {"e": "ticker", "s": "SOL_USDC", "c": "5"}}
+    conflator.close()
+
+
+@pytest.mark.asyncio
+async def test_other_streams_are_forwarded():
+    forwarded = []
+    conflator = Conflator(
+        on_update=lambda changes: None, interval=0.05, on_message=forwarded.append
+    )
+    trade = {"stream": "trades.SOL_USDC", "data": {"e": "trade", "s": "SOL_USDC"}}
+
+    await conflator.on_message(trade)
+    await conflator.on_message("pong")
+
+    assert forwarded == [trade, "pong"]
+    assert conflator.latest == {}
+
+
+@pytest.mark.asyncio
+async def test_flush_and_async_handler():
+    updates = []
+
+    async def on_update(changes):
+        updates.append(changes)
+
+    conflator = Conflator(on_update=on_update, interval=10)
+    await conflator.on_message(
+        {"stream": "markPrice.SOL_USDC", "data": {"e": "markPrice", "s": "SOL_USDC"}}
+    )
+    conflator.flush()
+    await asyncio.sleep(0)
+
+    assert updates == [{"SOL_USDC": {"e": "markPrice", "s": "SOL_USDC"}}]
+
+
+def test_negative_interval():
+    with pytest.raises(ValueError):
+        Conflator(on_update=print, interval=-1)
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_reported(caplog):
+    errors = []
+
+    def on_update(changes):
+        raise RuntimeError("sync handler")
+
+    conflator = Conflator(on_update=on_update, interval=10, on_error=errors.append)
+    await conflator.on_message(ticker("SOL_USDC", "1"))
+    conflator.flush()
+    assert [str(error) for error in errors] == ["sync handler"]
+
+    async def on_update_async(changes):
+        raise RuntimeError("async handler")
+
+    logged = Conflator(on_update=on_update_async, interval=10)
+    await logged.on_message(ticker("SOL_USDC", "1"))
+    logged.flush()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert "Conflated update handler failed" in caplog.text
+    assert "async handler" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_for_running_handler_and_close_cancels_it():
+    running = 0
+    calls = []
+    release = asyncio.Event()
+
+    async def on_update(changes):
+        nonlocal running
+        running += 1
+        calls.append((running, changes))
+        await release.wait()
+        running -= 1
+
+    conflator = Conflator(on_update=on_update, interval=10)
+    await conflator.on_message(ticker("SOL_USDC", "1"))
+    conflator.flush()
+    await asyncio.sleep(0)
+    await conflator.on_message(ticker("SOL_USDC", "2"))
+    conflator.flush()
+    await asyncio.sleep(0)
+    assert len(calls) == 1 and conflator.pending() == {"SOL_USDC"}
+
+    release.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert [count for count, _ in calls] == [1, 1]
+    assert calls[1][1]["SOL_USDC"]["c"] == "2"
+
+    release.clear()
+    await conflator.on_message(ticker("SOL_USDC", "3"))
+    conflator.flush()
+    task = conflator._task
+    await asyncio.sleep(0)
+    conflator.close()
+    await asyncio.sleep(0)
+    assert task.cancelled()
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from bpx.async_.public import Public as AsyncPublic
+from bpx.exceptions import UnexpectedResponseError
+from bpx.fan_out import RateLimiter, afan_out, fan_out
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.public import Public
+from bpx.testing.exchange import SimulatedExchange
+
+
+def test_rate_limiter_reservations():
+    limiter = RateLimiter(rate=100, burst=2)
+    delays = [limiter.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.01, abs=2e-3)
+    assert delays[3] == pytest.approx(0.02, abs=2e-3)
+
+
+@pytest.mark.asyncio
+async def test_afan_out_caps_concurrency():
+    running = peak = 0
+
+    async def request(symbol):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if symbol == "BAD":
+            raise ValueError(symbol)
+        return symbol.lower()
+
+    symbols = [f"S{i}" for i in range(20)] + ["BAD"]
+    result = await afan_out(request, symbols, concurrency=3)
+    assert peak == 3
+    assert result.results == {f"S{i}": f"s{i}" for i in range(20)}
+    assert list(result.errors) == ["BAD"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_must_be_positive():
+    async def request(symbol):
+        return symbol
+
+    with pytest.raises(ValueError):
+        fan_out(str.lower, ["SOL_USDC"], concurrency=0)
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(afan_out(request, ["SOL_USDC"], concurrency=0), 1)
+
+
+def test_sync_fan_out_against_exchange():
+    with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        public = exchange.attach(Public())
+        result = public.fan_out(
+            "get_depth",
+            ["SOL_USDC", "BTC_USDC", "NOPE_USDC"],
+            concurrency=2,
+            rate_limiter=RateLimiter(rate=1000, burst=10),
+        )
+    assert sorted(result.results) == ["BTC_USDC", "SOL_USDC"]
+    assert result.results["SOL_USDC"]["bids"]
+    error = result.errors["NOPE_USDC"]
+    assert isinstance(error, UnexpectedResponseError)
+
+
+@pytest.mark.asyncio
+async def test_async_fan_out_against_exchange():
+    async with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        public = exchange.attach(AsyncPublic(http_client=AsyncHttpClient()))
+        result = await public.fan_out(
+            public.get_ticker, ["SOL_USDC", "BTC_USDC", "NOPE_USDC"]
+        )
+    assert result.results["SOL_USDC"]["symbol"] == "SOL_USDC"
+    assert list(result.errors) == ["NOPE_USDC"]
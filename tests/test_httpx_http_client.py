@@ -0,0 +1,60 @@
+import asyncio
+import sys
+import pytest
+from bpx.async_.account import Account
+from bpx.async_.public import Public
+from bpx.metrics.instrumentation import TOTAL, Instrumentation
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+pytest.importorskip("httpx")
+
+from bpx.http_client.httpx_http_client import HttpxHttpClient  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_clients_over_httpx():
+    public_key, secret_key = generate_keys()
+    instrumentation = Instrumentation()
+    async with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        async with HttpxHttpClient(instrumentation=instrumentation) as http_client:
+            public = exchange.attach(Public(http_client=http_client))
+            account = exchange.attach(
+                Account(public_key, secret_key, http_client=http_client)
+            )
+            assert await public.get_ping() == "pong"
+            assert (await public.get_ticker("NOPE_USDC"))["code"] == "INVALID_MARKET"
+            orders = await asyncio.gather(
+                *(
+                    account.execute_order(
+                        "SOL_USDC",
+                        "Bid",
+                        "Limit",
+                        quantity="1",
+                        price=str(100 + i),
+                        post_only=True,
+                    )
+                    for i in range(10)
+                )
+            )
+            assert {order["status"] for order in orders} == {"New"}
+            cancelled = await account.cancel_all_orders("SOL_USDC")
+            assert len(cancelled) == 10
+            # one pool serves all requests
+            session = http_client._client
+            assert session is not None
+            await public.get_depth("SOL_USDC")
+            assert http_client._client is session
+        assert http_client._client is None
+    assert instrumentation.histogram(TOTAL, "/api/v1/order").count == 10
+
+
+def test_falls_back_to_http1_without_h2(monkeypatch):
+    # a None entry makes the import of h2 fail
+    monkeypatch.setitem(sys.modules, "h2", None)
+    with pytest.warns(RuntimeWarning, match="h2"):
+        http_client = HttpxHttpClient()
+    assert http_client.http2 is False
+    assert HttpxHttpClient(http2=False).http2 is False
@@ -0,0 +1,143 @@
+import json
+import pytest
+from bpx.async_.public import Public as AsyncPublic
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.metrics.histogram import Histogram
+from bpx.metrics.instrumentation import (
+    CALLBACK,
+    CONNECT,
+    DECODE,
+    FIRST_BYTE,
+    SIGN,
+    TOTAL,
+    Instrumentation,
+)
+from bpx.account import Account
+from bpx.async_.account import Account as AsyncAccount
+from bpx.public import Public
+from bpx.testing.exchange import SimulatedExchange
+from bpx.ws_public import WsPublic
+from tests.test_simulated_exchange import generate_keys
+
+
+class FrameConnection:
+    close_code = None
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    async def __aiter__(self):
+        for frame in self.frames:
+            yield frame
+
+
+def test_histogram_relative_error():
+    histogram = Histogram(significant_figures=2)
+    for value in range(1, 100001):
+        histogram.record(value)
+    assert histogram.count == 100000
+    assert histogram.min == 1 and histogram.max == 100000
+    for percentile in (50, 90, 99, 99.9):
+        expected = 100000 * percentile / 100
+        assert abs(histogram.percentile(percentile) - expected) <= expected / 100
+    assert histogram.percentile(100) == 100000
+    assert histogram.percentiles((50, 99)) == {
+        50: histogram.percentile(50),
+        99: histogram.percentile(99),
+    }
+
+    small = Histogram(significant_figures=2)
+    for value in (3, 3, 7):
+        small.record(value)
+    assert small.percentile(50) == 3
+    small.merge(histogram)
+    assert small.count == 100003 and small.min == 1
+    small.reset()
+    assert small.percentile(50) is None
+    with pytest.raises(ValueError):
+        small.record(-1)
+
+
+def test_instrumentation_exporters_and_summary():
+    exported = []
+    instrumentation = Instrumentation(
+        exporters=[lambda *args: exported.append(args)], by_operation=False
+    )
+    instrumentation.record(SIGN, 2000, "orderExecute")
+    instrumentation.record(SIGN, 4000, "orderQuery")
+    assert exported == [(SIGN, "", 2000), (SIGN, "", 4000)]
+    summary = instrumentation.summary(percentiles=(50,))
+    assert summary == {
+        "sign": {"count": 2, "mean": 3.0, "max": 4.0, "p50": pytest.approx(2.0, 0.01)}
+    }
+
+
+def test_sync_account_records_phases():
+    public_key, secret_key = generate_keys()
+    instrumentation = Instrumentation()
+    with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        account = exchange.attach(
+            Account(
+                public_key,
+                secret_key,
+                default_http_client=SyncHttpClient(),
+                instrumentation=instrumentation,
+            )
+        )
+        account.get_balances()
+        account.get_balances()
+    assert instrumentation.histogram(SIGN, "balanceQuery").count == 2
+    for phase in (FIRST_BYTE, DECODE, TOTAL):
+        assert instrumentation.histogram(phase, "/api/v1/capital").count == 2
+    total = instrumentation.histogram(TOTAL, "/api/v1/capital")
+    assert total.min >= instrumentation.histogram(DECODE).max
+
+
+@pytest.mark.asyncio
+async def test_async_public_records_connection_phases():
+    instrumentation = Instrumentation()
+    async with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        public = exchange.attach(
+            AsyncPublic(http_client=AsyncHttpClient(), instrumentation=instrumentation)
+        )
+        depth = await public.get_depth("SOL_USDC")
+    assert "bids" in depth
+    for phase in (CONNECT, FIRST_BYTE, DECODE, TOTAL):
+        assert instrumentation.histogram(phase, "/api/v1/depth").count == 1
+
+
+def test_instrumentation_is_not_shared_through_default_client():
+    public_key, secret_key = generate_keys()
+    instrumentation = Instrumentation()
+    with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        instrumented = exchange.attach(Public(instrumentation=instrumentation))
+        plain = exchange.attach(Public())
+        assert plain.http_client.instrumentation is None
+        plain.get_depth("SOL_USDC")
+        Account(public_key, secret_key, instrumentation=Instrumentation())
+        exchange.attach(Account(public_key, secret_key)).get_balances()
+        assert instrumentation.histogram(TOTAL).count == 0
+        instrumented.get_depth("SOL_USDC")
+    assert instrumentation.histogram(TOTAL, "/api/v1/depth").count == 1
+    assert AsyncPublic(instrumentation=instrumentation).http_client is not (
+        AsyncPublic().http_client
+    )
+    async_account = AsyncAccount(public_key, secret_key)
+    AsyncAccount(public_key, secret_key, instrumentation=instrumentation)
+    assert async_account.http_client.instrumentation is None
+
+
+@pytest.mark.asyncio
+async def test_ws_records_decode_and_callback_per_stream():
+    instrumentation = Instrumentation()
+    received = []
+    ws = WsPublic(on_message=received.append, instrumentation=instrumentation)
+    ws.ws = FrameConnection(
+        [json.dumps({"stream": "trades.SOL_USDC", "data": {}})] * 3 + ["not json"]
+    )
+    await ws._listen()
+    assert len(received) == 4
+    assert instrumentation.histogram(DECODE, "trades.SOL_USDC").count == 3
+    assert instrumentation.histogram(CALLBACK, "trades.SOL_USDC").count == 3
+    assert instrumentation.histogram(CALLBACK, "").count == 1
@@ -0,0 +1,52 @@
+import json
+import subprocess
+import sys
+import pytest
+import bpx
+
+HEAVY_MODULES = ["aiohttp", "cryptography", "requests", "websockets"]
+# only the WebSocket and async clients need the event loop
+EVENT_LOOP_MODULES = ["asyncio", "concurrent.futures"]
+
+
+def loaded_modules(code, modules=HEAVY_MODULES):
+    script = (
+        f"import sys\n{code}\n"
+        f"print(__import__('json').dumps([m for m in {modules!r} if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import bpx",
+        "from bpx import Public; Public()",
+        "from bpx import WsPublic, ThreadedWsPublic; WsPublic()",
+        "import bpx.account",
+    ],
+)
+def test_heavy_dependencies_are_imported_on_use(code):
+    assert loaded_modules(code) == []
+
+
+@pytest.mark.parametrize(
+    "code",
+    ["import bpx", "from bpx import Public; Public()", "import bpx.account"],
+)
+def test_sync_clients_do_not_import_the_event_loop(code):
+    assert loaded_modules(code, EVENT_LOOP_MODULES) == []
+
+
+def test_lazy_attributes():
+    from bpx.public import Public
+    from bpx.ws_threaded import ThreadedWsAccount
+
+    assert bpx.Public is Public
+    assert bpx.ThreadedWsAccount is ThreadedWsAccount
+    assert set(bpx.__all__) <= set(dir(bpx))
+    with pytest.raises(AttributeError):
+        bpx.Missing
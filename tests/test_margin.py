@@ -0,0 +1,125 @@
+from decimal import Decimal
+import pytest
+from bpx.account import Account
+from bpx.public import Public
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+pytest.importorskip("numpy")
+
+from bpx.state.margin import MarginEngine, compare_with_rest  # noqa: E402
+
+SQRT = {"type": "sqrt", "base": "0.02", "factor": "0.0001"}
+MARKETS = [
+    {
+        "symbol": "SOL_USDC",
+        "baseSymbol": "SOL",
+        "quoteSymbol": "USDC",
+        "marketType": "SPOT",
+        "filters": {"quantity": {"stepSize": "0.01"}},
+        "imfFunction": None,
+    },
+    {
+        "symbol": "SOL_USDC_PERP",
+        "baseSymbol": "SOL",
+        "quoteSymbol": "USDC",
+        "marketType": "PERP",
+        "filters": {"quantity": {"stepSize": "0.01"}},
+        "imfFunction": SQRT,
+        "mmfFunction": {"type": "sqrt", "base": "0.01", "factor": "0.00005"},
+    },
+]
+COLLATERAL = [
+    {
+        "symbol": "SOL",
+        "imfFunction": SQRT,
+        "mmfFunction": SQRT,
+        "haircutFunction": {"weight": "0.9", "kind": {"type": "identity"}},
+    }
+]
+
+
+def engine(balances, positions=(), mark="100"):
+    engine = MarginEngine(MARKETS, COLLATERAL)
+    engine.set_prices({"SOL": "100", "SOL_USDC_PERP": mark})
+    engine.set_balances(
+        {symbol: {"available": amount} for symbol, amount in balances.items()}
+    )
+    engine.set_positions(positions)
+    return engine
+
+
+def test_margin_aggregates():
+    margin = engine(
+        {"USDC": "1000", "SOL": "10"},
+        [{"symbol": "SOL_USDC_PERP", "netQuantity": "-5", "pnlUnrealized": "-10"}],
+    )
+    assert margin.net_equity() == pytest.approx(1000 + 900 - 10)
+    assert margin.initial_margin() == pytest.approx(5 * 100 * 0.02)
+    assert margin.maintenance_margin() == pytest.approx(5 * 100 * 0.01)
+    assert margin.net_equity_available() == pytest.approx(1890 - 10)
+
+
+@pytest.mark.parametrize("collateral", [1000, 1_000_000])
+def test_max_perp_order_matches_closed_form(collateral):
+    margin = engine({"USDC": str(collateral)}, mark="1")
+    # x * max(0.02, 0.0001 * sqrt(x)) = collateral
+    expected = collateral / 0.02
+    if expected > (0.02 / 0.0001) ** 2:
+        expected = (collateral / 0.0001) ** (2 / 3)
+    quantity = margin.max_order_quantity("SOL_USDC_PERP", "Bid")
+    assert float(quantity) == pytest.approx(expected, rel=1e-6)
+    assert quantity == quantity.quantize(Decimal("0.01"))
+
+
+def test_max_perp_order_releases_reduced_position():
+    margin = engine({"USDC": "100"}, [{"symbol": "SOL_USDC_PERP", "netQuantity": "50"}])
+    # 100 of collateral fully used by the long, selling it frees its margin
+    assert margin.max_order_quantity("SOL_USDC_PERP", "Bid") == 0
+    assert margin.max_order_quantity("SOL_USDC_PERP", "Ask") == Decimal("100")
+
+
+def test_max_spot_order():
+    margin = engine({"USDC": "1000", "SOL": "2"})
+    assert margin.max_order_quantity("SOL_USDC", "Bid") == Decimal("10")
+    assert margin.max_order_quantity("SOL_USDC", "Bid", price="300") == Decimal("3.33")
+    assert margin.max_order_quantity("SOL_USDC", "Ask") == Decimal("2")
+    # buying SOL worth 0.9 of its price on borrowed USDC costs 1.02
+    borrowed = margin.max_order_quantity("SOL_USDC", "Bid", auto_borrow=True)
+    assert borrowed > 10
+
+
+def test_max_withdrawal_and_borrow():
+    margin = engine({"USDC": "1020", "SOL": "10"})
+    assert margin.max_withdrawal_quantity("SOL") == Decimal("10")
+    # the 1020 USDC cover 10 more SOL borrowed at an initial margin of 2%
+    assert margin.max_withdrawal_quantity("SOL", auto_borrow=True) == Decimal("20")
+    assert margin.max_borrow_quantity("SOL") == Decimal("10")
+    # USDC has no collateral parameters, its borrows need a margin of 100%
+    assert margin.max_borrow_quantities()["USDC"] == pytest.approx(450)
+
+
+def test_compare_with_rest():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        public = exchange.attach(Public())
+        account = exchange.attach(Account(public_key, secret_key))
+        margin = MarginEngine(public.get_markets(), public.get_collateral())
+        margin.set_prices({"SOL": "150", "SOL_USDC_PERP": "150"})
+        margin.set_balances(account.get_balances())
+        results = compare_with_rest(
+            margin,
+            account,
+            orders=[("SOL_USDC_PERP", "Bid")],
+            borrows=["SOL"],
+            withdrawals=["USDC"],
+        )
+    assert [(r["kind"], r["symbol"]) for r in results] == [
+        ("order", "SOL_USDC_PERP"),
+        ("borrow", "SOL"),
+        ("withdrawal", "USDC"),
+    ]
+    assert all(r["rest"] == Decimal("1000") for r in results)
+    assert all(r["local"] > 0 and r["error"] is not None for r in results)
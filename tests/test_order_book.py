@@ -0,0 +1,183 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from bpx.order_book.order_book import OrderBook
+
+SNAPSHOT = {
+    "bids": [["99", "1"], ["98", "2"], ["97", "3"]],
+    "asks": [["101", "1"], ["102", "2"], ["103", "3"]],
+    "lastUpdateId": "100",
+}
+
+
+def diff(first, last, bids=(), asks=()):
+    return {"e": "depth", "s": "SOL_USDC", "U": first, "u": last, "b": bids, "a": asks}
+
+
+@pytest.fixture
+def book():
+    book = OrderBook("SOL_USDC")
+    book.apply_snapshot(SNAPSHOT)
+    return book
+
+
+def test_snapshot_queries(book):
+    assert book.best_bid() == (Decimal("99"), Decimal("1"))
+    assert book.best_ask() == (Decimal("101"), Decimal("1"))
+    assert book.mid_price() == Decimal("100")
+    assert book.spread() == Decimal("2")
+    assert book.top(2) == {
+        "bids": [(Decimal("99"), Decimal("1")), (Decimal("98"), Decimal("2"))],
+        "asks": [(Decimal("101"), Decimal("1")), (Decimal("102"), Decimal("2"))],
+    }
+
+
+def test_apply_update(book):
+    assert book.apply_update(diff(101, 102, bids=[["99", "0"], ["99.5", "4"]]))
+    assert book.best_bid() == (Decimal("99.5"), Decimal("4"))
+    assert len(book.bids) == 3
+    assert book.last_update_id == 102
+
+    # already covered by the book
+    assert book.apply_update(diff(90, 102, asks=[["101", "0"]]))
+    assert book.best_ask() == (Decimal("101"), Decimal("1"))
+
+
+def test_gap_marks_book_out_of_sync(book):
+    assert not book.apply_update(diff(105, 106, bids=[["100", "1"]]))
+    assert not book.synced
+    assert book.gaps == 1
+
+    book.apply_snapshot({"bids": [], "asks": [["101", "5"]], "lastUpdateId": 105})
+    assert book.synced
+    assert book.last_update_id == 106
+    assert book.best_bid() == (Decimal("100"), Decimal("1"))
+
+
+def test_buffered_updates_are_replayed():
+    book = OrderBook("SOL_USDC")
+    assert not book.apply_update(diff(95, 99, bids=[["50", "1"]]))
+    assert not book.apply_update(diff(100, 101, asks=[["101", "0"]]))
+    assert not book.apply_update(diff(102, 102, bids=[["99", "7"]]))
+
+    book.apply_snapshot(SNAPSHOT)
+
+    assert book.synced
+    assert book.last_update_id == 102
+    assert book.best_ask() == (Decimal("102"), Decimal("2"))
+    assert book.best_bid() == (Decimal("99"), Decimal("7"))
+    assert (Decimal("50"), Decimal("1")) not in book.bids.levels()
+
+
+def test_vwap(book):
+    assert book.vwap("Bid", "1") == Decimal("101")
+    assert book.vwap("Bid", "3") == (Decimal("101") + Decimal("204")) / 3
+    assert book.vwap("Ask", "2") == (Decimal("99") + Decimal("98")) / 2
+    assert book.vwap("Bid", "100") is None
+    with pytest.raises(ValueError):
+        book.vwap("Bid", "0")
+
+
+@pytest.mark.asyncio
+async def test_on_message_resyncs_on_gap():
+    calls = []
+
+    async def get_depth(symbol):
+        calls.append(symbol)
+        return SNAPSHOT
+
+    book = OrderBook("SOL_USDC", snapshot_fetcher=get_depth)
+    await book.on_message({"stream": "depth.BTC_USDC", "data": diff(1, 1)})
+    assert calls == []
+
+    await book.on_message({"stream": "depth.SOL_USDC", "data": diff(101, 101)})
+    await book._resync_task
+
+    assert calls == ["SOL_USDC"]
+    assert book.synced
+    assert book.last_update_id == 101
+
+
+@pytest.mark.asyncio
+async def test_failed_resync_is_reported_and_retried(caplog):
+    errors = []
+    attempts = []
+
+    def get_depth(symbol):
+        attempts.append(symbol)
+        if len(attempts) == 1:
+            raise ConnectionError("snapshot unavailable")
+        return SNAPSHOT
+
+    book = OrderBook(
+        "SOL_USDC",
+        snapshot_fetcher=get_depth,
+        on_error=errors.append,
+        resync_backoff=0.01,
+    )
+    await book.on_message({"stream": "depth.SOL_USDC", "data": diff(101, 101)})
+    await asyncio.wait([book._resync_task])
+    assert [type(error) for error in errors] == [ConnectionError]
+    assert book.resync_error is errors[0] and not book.synced
+
+    await asyncio.sleep(0.02)
+    await book.on_message({"stream": "depth.SOL_USDC", "data": diff(102, 102)})
+    await book._resync_task
+    assert book.synced and book.resync_error is None
+    assert book.last_update_id == 102
+
+    logged = OrderBook("SOL_USDC", snapshot_fetcher=get_depth)
+    attempts.clear()
+    await logged.on_message({"stream": "depth.SOL_USDC", "data": diff(101, 101)})
+    await asyncio.wait([logged._resync_task])
+    assert "Resync of the SOL_USDC order book failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_failed_resyncs_back_off():
+    attempts = []
+
+    def get_depth(symbol):
+        attempts.append(symbol)
+        return {"code": "TOO_MANY_REQUESTS", "message": "Rate limit exceeded"}
+
+    book = OrderBook(
+        "SOL_USDC",
+        snapshot_fetcher=get_depth,
+        on_error=lambda e: None,
+        resync_backoff=0.02,
+        max_resync_backoff=0.08,
+    )
+    for update_id in range(101, 131):
+        await book.on_message(
+            {"stream": "depth.SOL_USDC", "data": diff(update_id, update_id)}
+        )
+        await asyncio.sleep(0.01)
+    # one request per diff without a backoff, waits of 20, 40, 80, 80 ms here
+    assert 3 <= len(attempts) <= 6
+    assert isinstance(book.resync_error, KeyError)
+    assert book._resync_delay == 0.08
+
+    book.snapshot_fetcher = lambda symbol: SNAPSHOT
+    await asyncio.sleep(0.1)
+    await book.on_message({"stream": "depth.SOL_USDC", "data": diff(131, 131)})
+    await book._resync_task
+    assert book.synced and book._resync_delay == 0.0
+
+
+def test_book_side_order_after_updates():
+    book = OrderBook("SOL_USDC")
+    book.apply_snapshot(SNAPSHOT)
+    for price in ("100.5", "104", "96"):
+        book.bids.update(price, "1")
+        book.asks.update(price, "1")
+    book.bids.update("98", "0")
+    book.asks.update("102", "0")
+
+    assert [price for price, _ in book.bids.iter_levels()] == [
+        Decimal(p) for p in ("104", "100.5", "99", "97", "96")
+    ]
+    assert [price for price, _ in book.asks.levels()] == [
+        Decimal(p) for p in ("96", "100.5", "101", "103", "104")
+    ]
+    assert book.asks.levels(2) == [(Decimal("96"), 1), (Decimal("100.5"), 1)]
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+import pytest
+from bpx.account import Account
+from bpx.base.base_account import BaseAccount
+from bpx.base.order_template import OrderTemplate
+from bpx.exceptions import (
+    EmptyOrderQuantityError,
+    InvalidTimeInForceValue,
+    OrderQuantityNotSpecifiedError,
+)
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+
+@pytest.fixture
+def account():
+    return BaseAccount(*generate_keys(), window=5000, debug=False)
+
+
+@pytest.mark.parametrize(
+    "static, dynamic",
+    [
+        (
+            {
+                "time_in_force": "GTC",
+                "post_only": True,
+                "self_trade_prevention": "RejectTaker",
+            },
+            {"quantity": "1.25", "price": "150.10", "client_id": 7},
+        ),
+        ({"reduce_only": True}, {"quantity": "2", "price": "149"}),
+        ({"order_type": "Market", "auto_borrow": True}, {"quote_quantity": "100"}),
+    ],
+)
+def test_build_matches_execute_order(account, static, dynamic):
+    static = {"order_type": "Limit", **static}
+    template = OrderTemplate(account, "SOL_USDC", "Bid", **static)
+    with patch("bpx.base.base_account.time", return_value=1714560000.0), patch(
+        "bpx.base.order_template.time", return_value=1714560000.0
+    ):
+        built = template.build(**dynamic)
+        expected = account.execute_order("SOL_USDC", "Bid", **static, **dynamic)
+    assert built.url == expected.url
+    assert built.data == expected.data
+    assert built.headers == expected.headers
+
+
+def test_validation(account):
+    with pytest.raises(InvalidTimeInForceValue):
+        OrderTemplate(account, "SOL_USDC", "Bid", "Limit", time_in_force="GTD")
+    with pytest.raises(ValueError):
+        OrderTemplate(account, "SOL_USDC", "Buy", "Limit")
+    with pytest.raises(OrderQuantityNotSpecifiedError):
+        OrderTemplate(account, "SOL_USDC", "Bid", "Limit").build(price="1")
+    with pytest.raises(EmptyOrderQuantityError):
+        OrderTemplate(account, "SOL_USDC", "Bid", "Market").build()
+
+
+def test_execute_template_against_exchange():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        account = exchange.attach(Account(public_key, secret_key))
+        template = OrderTemplate(account, "SOL_USDC", "Bid", "Limit", post_only=True)
+        for client_id in (1, 2):
+            order = account.execute_template(
+                template, "1", price=str(100 + client_id), client_id=client_id
+            )
+            assert order["status"] == "New"
+        orders = account.get_open_orders(symbol="SOL_USDC")
+    assert sorted(order["price"] for order in orders) == ["101.00", "102.00"]
@@ -0,0 +1,108 @@
+import asyncio
+import time
+import pytest
+from bpx.async_.account import Account as AsyncAccount
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.state.orders import OrderTracker
+from bpx.testing.exchange import SimulatedExchange
+from bpx.ws_account import WsAccount
+from tests.test_simulated_exchange import generate_keys
+
+
+def order_update(event, status, order_id="1", **fields):
+    return {
+        "e": event,
+        "s": "SOL_USDC",
+        "c": 7,
+        "S": "Bid",
+        "o": "LIMIT",
+        "q": "2",
+        "p": "150.10",
+        "X": status,
+        "i": order_id,
+        "z": "0",
+        **fields,
+    }
+
+
+def test_updates_are_indexed_and_closed_orders_removed():
+    tracker = OrderTracker()
+    tracker.apply_update(order_update("orderAccepted", "New"))
+    order = tracker.get("1")
+    assert order["orderType"] == "Limit" and order["clientId"] == 7
+    assert tracker.get_by_client_id(7) is order
+    assert tracker.at_price("SOL_USDC", "Bid", "150.1") == [order]
+    assert tracker.open_orders("SOL_USDC", "Ask") == []
+
+    tracker.apply_update(order_update("orderFill", "PartiallyFilled", z="1", l="1"))
+    assert tracker.get("1")["executedQuantity"] == "1"
+    tracker.apply_update(order_update("orderFill", "Filled", z="2"))
+    assert len(tracker) == 0
+    assert tracker.by_client_id == {} and tracker.by_level == {}
+
+
+def test_reconcile_keeps_newer_stream_state():
+    tracker = OrderTracker()
+    tracker.apply_open_orders(
+        [
+            {
+                "id": "1",
+                "symbol": "SOL_USDC",
+                "side": "Bid",
+                "price": "150",
+                "status": "New",
+            }
+        ]
+    )
+    assert "1" in tracker and tracker.corrections == 0
+
+    requested = time.monotonic()
+    # accepted and cancelled while the REST request was in flight
+    tracker.apply_update(order_update("orderAccepted", "New", order_id="2"))
+    tracker.apply_update(order_update("orderCancelled", "Cancelled", order_id="1"))
+    tracker.apply_open_orders(
+        [
+            {"id": "1", "symbol": "SOL_USDC", "side": "Bid", "price": "150"},
+            {"id": "3", "symbol": "SOL_USDC", "side": "Ask", "price": "151"},
+        ],
+        requested,
+    )
+    assert sorted(tracker.orders) == ["2", "3"]
+    assert tracker.corrections == 1
+
+    tracker.apply_open_orders([])
+    assert len(tracker) == 0 and tracker.corrections == 2
+
+
+@pytest.mark.asyncio
+async def test_tracks_simulated_exchange_orders():
+    keys = generate_keys()
+    async with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(AsyncAccount(*keys, http_client=AsyncHttpClient()))
+        resting = await account.execute_order(
+            "SOL_USDC", "Bid", "Limit", quantity="1", price="1", client_id=1
+        )
+        tracker = OrderTracker(open_orders_fetcher=account.get_open_orders)
+        ws = exchange.attach(WsAccount(*keys, on_message=tracker.on_message))
+        connect = asyncio.ensure_future(ws.connect())
+        while ws.ws is None:
+            await asyncio.sleep(0.01)
+        await ws.subscribe(ws.subscribe_order_update())
+        await tracker.reconcile()
+        assert tracker.get(resting["id"])["clientId"] == 1
+
+        placed = await account.execute_order(
+            "SOL_USDC", "Ask", "Limit", quantity="1", price="100000", client_id=2
+        )
+        await account.cancel_order("SOL_USDC", order_id=resting["id"])
+        for _ in range(100):
+            if placed["id"] in tracker and resting["id"] not in tracker:
+                break
+            await asyncio.sleep(0.01)
+        assert tracker.get_by_client_id(2)["id"] == placed["id"]
+        assert resting["id"] not in tracker
+
+        await tracker.reconcile()
+        assert tracker.corrections == 0
+        await ws.close()
+        await connect
@@ -0,0 +1,93 @@
+import json
+import pytest
+from bpx.account import Account
+from bpx.async_.account import Account as AsyncAccount
+from bpx.async_.public import Public as AsyncPublic
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.http_client.raw import RawResponse, raw_responses
+from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.public import Public
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+
+def test_sync_raw_client_and_block():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        public = exchange.attach(Public(http_client=SyncHttpClient(raw=True)))
+        depth = public.get_depth("SOL_USDC")
+        assert isinstance(depth, RawResponse)
+        assert depth.status == 200
+        assert depth.headers["Content-Type"].startswith("application/json")
+        assert bytes(depth.view) == depth.body
+        assert json.loads(depth.body) == depth.decode()
+
+        account = exchange.attach(
+            Account(public_key, secret_key, default_http_client=SyncHttpClient())
+        )
+        assert isinstance(account.get_balances(), dict)
+        with raw_responses():
+            balances = account.get_balances()
+            error = account.get_open_order("NOPE_USDC", order_id="1")
+        assert isinstance(balances, RawResponse) and "USDC" in balances.decode()
+        assert error.status == 404
+        assert isinstance(account.get_balances(), dict)
+
+
+@pytest.mark.asyncio
+async def test_async_raw_block():
+    async with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        public = exchange.attach(AsyncPublic(http_client=AsyncHttpClient()))
+        with raw_responses():
+            ping = await public.get_ping()
+        assert (ping.status, ping.body) == (200, b"pong")
+        assert await public.get_ping() == "pong"
+
+
+def test_paginators_and_columnar_pages_in_raw_block():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(
+            Account(public_key, secret_key, default_http_client=SyncHttpClient())
+        )
+        for _ in range(3):
+            account.execute_order("SOL_USDC", "Bid", "Market", quantity="1")
+        with raw_responses():
+            pages = list(account.iter_fill_history(symbol="SOL_USDC", page_size=2))
+            page = account.get_fill_history(symbol="SOL_USDC")
+    assert [len(page) for page in pages] == [2, 1]
+    assert {fill["symbol"] for fill in pages[0] + pages[1]} == {"SOL_USDC"}
+    assert isinstance(page, RawResponse)
+
+
+def test_columnar_format_overrides_raw_client():
+    numpy = pytest.importorskip("numpy")
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(
+            Account(
+                public_key, secret_key, default_http_client=SyncHttpClient(raw=True)
+            )
+        )
+        account.execute_order("SOL_USDC", "Bid", "Market", quantity="2")
+        page = account.get_fill_history(symbol="SOL_USDC", columnar="numpy")
+        pages = list(account.iter_fill_history(page_size=10, columnar="numpy"))
+    assert isinstance(page, numpy.ndarray)
+    assert page["quantity"].tolist() == [2.0]
+    assert [len(page) for page in pages] == [1]
+
+
+@pytest.mark.asyncio
+async def test_async_paginator_in_raw_block():
+    public_key, secret_key = generate_keys()
+    async with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        account = exchange.attach(
+            AsyncAccount(public_key, secret_key, http_client=AsyncHttpClient())
+        )
+        for _ in range(3):
+            await account.execute_order("SOL_USDC", "Bid", "Market", quantity="1")
+        with raw_responses():
+            pages = [page async for page in account.iter_order_history(page_size=2)]
+    assert [len(page) for page in pages] == [2, 1]
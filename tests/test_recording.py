@@ -0,0 +1,169 @@
+import json
+import queue
+import threading
+import time
+import pytest
+from bpx.recording.format import (
+    CHUNK_HEADER,
+    get_codec_by_id,
+    iter_records,
+    read_index,
+    seek_index,
+)
+from bpx.recording.recorder import CaptureWriter, market_streams
+from bpx.recording.replay import (
+    CaptureReader,
+    ReplayConnection,
+    ReplayWsPublic,
+    capture_files,
+)
+
+
+def read_capture(path):
+    records = []
+    with open(path, "rb") as file:
+        data = file.read()
+    for entry in read_index(path):
+        _, codec_id, length, count, first_ns, last_ns = CHUNK_HEADER.unpack_from(
+            data, entry.offset
+        )
+        start = entry.offset + CHUNK_HEADER.size
+        payload = get_codec_by_id(codec_id).decompress(data[start : start + length])
+        chunk = [(ns, bytes(frame)) for ns, frame in iter_records(payload)]
+        assert len(chunk) == count == entry.count
+        assert (first_ns, last_ns) == (chunk[0][0], chunk[-1][0])
+        records.extend(chunk)
+    return records
+
+
+def test_market_streams():
+    assert market_streams(["SOL_USDC"], kinds=("depth", "trades")) == [
+        "depth.SOL_USDC",
+        "trades.SOL_USDC",
+    ]
+
+
+@pytest.mark.parametrize("codec", ["zlib", "none"])
+def test_writer_chunks_and_rotates(tmp_path, codec):
+    writer = CaptureWriter(
+        str(tmp_path), codec=codec, chunk_records=3, rotate_bytes=1, flush_interval=60
+    )
+    writer.start()
+    frames = [f'{{"stream":"trades.SOL_USDC","data":{{"t":{i}}}}}' for i in range(7)]
+    for i, frame in enumerate(frames):
+        writer.write(frame, received_ns=1000 + i)
+    writer.write(b"pong", received_ns=2000)
+    writer.close()
+
+    assert writer.error is None
+    assert writer.records_written == 8
+    # every chunk after the first one exceeds rotate_bytes
+    assert len(writer.files) == 3
+    records = [record for path in writer.files for record in read_capture(path)]
+    assert records == [(1000 + i, f.encode()) for i, f in enumerate(frames)] + [
+        (2000, b"pong")
+    ]
+
+
+def test_seek_index(tmp_path):
+    writer = CaptureWriter(str(tmp_path), codec="zlib", chunk_records=2)
+    writer.start()
+    for i in range(6):
+        writer.write("x", received_ns=i * 10)
+    writer.close()
+
+    entries = read_index(writer.files[0])
+    assert [(e.first_ns, e.last_ns) for e in entries] == [(0, 10), (20, 30), (40, 50)]
+    assert seek_index(entries, 0) == 0
+    assert seek_index(entries, 15) == 1
+    assert seek_index(entries, 30) == 1
+    assert seek_index(entries, 51) == 3
+
+
+def test_unknown_codec(tmp_path):
+    with pytest.raises(ValueError):
+        CaptureWriter(str(tmp_path), codec="brotli")
+
+
+def write_capture(directory, count=10, step_ns=1000000, **options):
+    writer = CaptureWriter(str(directory), codec="zlib", **options)
+    writer.start()
+    for i in range(count):
+        frame = json.dumps({"stream": "trades.SOL_USDC", "data": {"t": i}})
+        writer.write(frame, received_ns=1_700_000_000_000_000_000 + i * step_ns)
+    writer.write("pong", received_ns=1_700_000_000_000_000_000 + count * step_ns)
+    writer.close()
+    return writer.files
+
+
+def test_capture_reader_seeks_by_time(tmp_path):
+    files = write_capture(tmp_path, chunk_records=3)
+    assert capture_files(str(tmp_path)) == files
+    start = 1_700_000_000_000_000_000 + 4 * 1000000
+    end = start + 2 * 1000000
+
+    records = [(ns, bytes(frame)) for ns, frame in CaptureReader(files, start, end)]
+
+    assert [json.loads(frame)["data"]["t"] for _, frame in records] == [4, 5, 6]
+
+
+class RefillingQueue(queue.Queue):
+    """Queue refilled right after it was drained, like by a late decompress put"""
+
+    def get_nowait(self):
+        try:
+            return super().get_nowait()
+        except queue.Empty:
+            self.put_nowait(b"late chunk")
+            raise
+
+
+def test_capture_reader_close_never_blocks(tmp_path):
+    files = write_capture(tmp_path, count=50, chunk_records=1)
+    reader = CaptureReader(files, prefetch=1)
+    assert reader.next_payload() is not None
+    reader._payloads = RefillingQueue(1)
+    closing = threading.Thread(target=reader.close, daemon=True)
+    closing.start()
+    closing.join(5)
+    assert not closing.is_alive()
+    assert not reader._thread.is_alive()
+
+
+@pytest.mark.asyncio
+async def test_replay_uses_ws_public_dispatch(tmp_path):
+    files = write_capture(tmp_path, chunk_records=4)
+    received = []
+    times = []
+    closed = []
+    ws = ReplayWsPublic(
+        files,
+        on_message=lambda message: (
+            received.append(message),
+            times.append(ws.replay_time_ns),
+        ),
+        on_close=lambda code, reason: closed.append(code),
+    )
+    trades = ws.stream("trades.SOL_USDC")
+
+    await ws.connect()
+
+    assert [m["data"]["t"] for m in received[:-1]] == list(range(10))
+    assert received[-1] == "pong"
+    assert times == sorted(times) and len(set(times)) == 11
+    assert len([message async for message in trades]) == 10
+    assert closed == [1000]
+
+
+@pytest.mark.asyncio
+async def test_replay_speed(tmp_path):
+    files = write_capture(tmp_path, count=5, step_ns=20000000)
+    ws = ReplayWsPublic(files, speed=2.0)
+
+    started = time.monotonic()
+    await ws.connect()
+
+    # 100ms recorded at twice the speed
+    assert 0.04 <= time.monotonic() - started < 1
+    with pytest.raises(ValueError):
+        ReplayConnection(CaptureReader(files), speed=0)
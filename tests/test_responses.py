@@ -0,0 +1,82 @@
+import json
+from decimal import Decimal
+import pytest
+from bpx.account import Account
+from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.models.responses import Balance, Depth, Fill, Market, Order, Ticker
+from bpx.public import Public
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+FILL = {
+    "clientId": "7",
+    "fee": "0.0015",
+    "feeSymbol": "USDC",
+    "isMaker": True,
+    "orderId": "112233",
+    "price": "150.10",
+    "quantity": "1.25",
+    "side": "Bid",
+    "symbol": "SOL_USDC",
+    "systemOrderType": None,
+    "timestamp": "2024-05-01T12:00:00.000",
+    "tradeId": 9000000,
+    "unknown": "dropped",
+}
+
+
+def test_fields_are_converted_lazily_and_cached():
+    fill = Fill.from_dict(FILL)
+    assert not hasattr(fill, "__dict__")
+    assert fill._price == "150.10"
+    assert fill.price == Decimal("150.10")
+    assert fill._price is fill.price
+    assert fill.is_maker is True and fill.system_order_type is None
+    assert "unknown" not in fill.to_dict()
+    with pytest.raises(AttributeError):
+        fill.other = 1
+
+
+def test_decode_from_bytes():
+    body = json.dumps([FILL, {**FILL, "tradeId": 9000001}]).encode()
+    fills = Fill.decode(body)
+    assert [fill.trade_id for fill in fills] == [9000000, 9000001]
+    assert fills[0] == Fill.from_dict(FILL)
+    assert fills[0] != fills[1]
+    with pytest.raises(TypeError):
+        hash(fills[0])
+
+    depth = Depth.decode(
+        b'{"asks": [["150.2", "3"]], "bids": [], "lastUpdateId": "42", "timestamp": 1}'
+    )
+    assert depth.asks == [(Decimal("150.2"), Decimal(3))]
+    assert depth.bids == [] and depth.last_update_id == 42
+
+
+def test_models_of_simulated_exchange_responses():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        public = exchange.attach(Public(http_client=SyncHttpClient()))
+        account = exchange.attach(
+            Account(public_key, secret_key, default_http_client=SyncHttpClient())
+        )
+        market = Market.from_list(public.get_markets())[0]
+        ticker = Ticker.from_dict(public.get_ticker(market.symbol))
+        depth = Depth.from_dict(public.get_depth(market.symbol))
+        order = Order.from_dict(
+            account.execute_order(
+                symbol=market.symbol,
+                side="Bid",
+                order_type="Limit",
+                quantity="1",
+                price=str(depth.asks[0][0]),
+                time_in_force="GTC",
+            )
+        )
+        balances = Balance.from_balances(account.get_balances())
+    assert market.tick_size == Decimal("0.01") and market.step_size > 0
+    assert isinstance(ticker.trades, int) and ticker.last_price > 0
+    assert depth.bids[-1][0] < depth.asks[0][0]
+    assert order.status == "Filled" and order.executed_quantity == 1
+    assert balances[market.quote_symbol].symbol == market.quote_symbol
+    assert isinstance(balances[market.quote_symbol].available, Decimal)
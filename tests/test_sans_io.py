@@ -0,0 +1,136 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+from bpx.account import Account
+from bpx.async_.account import Account as AsyncAccount
+from bpx.async_.public import Public as AsyncPublic
+from bpx.base.base_account import BaseAccount
+from bpx.base.base_public import BasePublic
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.http_client.sync_http_client import SyncHttpClient
+from bpx.public import Public
+from bpx.sans_io import RequestCore, decode_body, query_params
+from bpx.testing.exchange import SimulatedExchange
+from tests.test_simulated_exchange import generate_keys
+
+
+def send(request):
+    # the standard library as a transport
+    http_request = urllib.request.Request(
+        request.url,
+        data=request.body or None,
+        headers=dict(request.headers),
+        method=request.method,
+    )
+    try:
+        with urllib.request.urlopen(http_request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def test_encoded_requests():
+    account = BaseAccount(*generate_keys(), window=5000, debug=False)
+    core = RequestCore(account)
+    order = core.request(
+        "execute_order", "SOL_USDC", "Bid", "Limit", quantity="1", price="150"
+    )
+    assert order.method == "POST"
+    assert order.url == "https://api.backpack.exchange/api/v1/order"
+    assert json.loads(order.body)["price"] == "150"
+    assert ("X-API-Key", account.public_key) in order.headers
+
+    history = core.request("get_order_history", 100, 0, symbol="SOL_USDC")
+    assert history.method == "GET" and history.body == b""
+    assert history.url.endswith(
+        "/wapi/v1/history/orders?limit=100&offset=0&symbol=SOL_USDC"
+    )
+    assert core.request("cancel_all_orders", "SOL_USDC").method == "DELETE"
+
+    depth = core.request("get_depth", "SOL_USDC")
+    assert (depth.method, depth.headers) == ("GET", [])
+    assert depth.url == BasePublic().get_depth_url("SOL_USDC")
+    assert core.request("get_history_trades", "SOL_USDC", 10, 0).url.startswith(
+        "https://api.backpack.exchange/api/v1/trades/history"
+    )
+
+
+def test_decode_body():
+    assert decode_body(b'{"a": 1}') == {"a": 1}
+    assert decode_body(memoryview(b"[1, 2]")) == [1, 2]
+    assert decode_body(b"pong") == "pong"
+
+
+def test_custom_transport_against_exchange():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        account = exchange.attach(
+            BaseAccount(public_key, secret_key, window=5000, debug=False)
+        )
+        core = RequestCore(account, exchange.attach(BasePublic()))
+        status, body = send(core.request("get_ping"))
+        assert (status, decode_body(body)) == (200, "pong")
+        status, body = send(
+            core.request(
+                "execute_order", "SOL_USDC", "Bid", "Limit", quantity="1", price="100"
+            )
+        )
+        assert status == 200 and decode_body(body)["status"] == "New"
+        status, body = send(core.request("get_open_orders", symbol="SOL_USDC"))
+        assert len(decode_body(body)) == 1
+        status, body = send(core.request("get_ticker", "NOPE_USDC"))
+        assert status == 400 and decode_body(body)["code"] == "INVALID_MARKET"
+
+
+def test_query_params_and_content_types():
+    assert query_params({"a": True, "b": False, "c": 1, "d": None}) == {
+        "a": "true",
+        "b": "false",
+        "c": "1",
+    }
+    assert decode_body(b"1700000000000") == 1700000000000
+    assert decode_body(b"1700000000000", "text/plain") == "1700000000000"
+    assert decode_body(b'{"a": 1}', "application/json") == {"a": 1}
+
+
+def test_clients_send_boolean_queries_as_signed():
+    public_key, secret_key = generate_keys()
+    with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        account = exchange.attach(
+            Account(public_key, secret_key, default_http_client=SyncHttpClient())
+        )
+        limit = account.get_max_order_quantity("SOL_USDC", "Bid", reduce_only=False)
+        assert "maxOrderQuantity" in limit
+        # requests would send the boolean as False, which breaks the signature
+        core = RequestCore(account, exchange.attach(BasePublic()))
+        request = core.request(
+            "get_max_order_quantity", "SOL_USDC", "Bid", reduce_only=False
+        )
+        assert request.url.endswith("?symbol=SOL_USDC&side=Bid&reduceOnly=false")
+        status, body = send(request)
+        assert decode_body(body).keys() == limit.keys()
+        # requests parses every body, the sync client returns the time as int
+        public = exchange.attach(Public(http_client=SyncHttpClient()))
+        assert isinstance(public.get_time(), int)
+
+
+@pytest.mark.asyncio
+async def test_async_clients_keep_text_bodies():
+    public_key, secret_key = generate_keys()
+    async with SimulatedExchange(
+        depth_rate=0, trade_rate=0, api_keys=[public_key]
+    ) as exchange:
+        public = exchange.attach(AsyncPublic(http_client=AsyncHttpClient()))
+        assert isinstance(await public.get_time(), str)
+        account = exchange.attach(
+            AsyncAccount(public_key, secret_key, http_client=AsyncHttpClient())
+        )
+        limit = await account.get_max_order_quantity(
+            "SOL_USDC", "Bid", reduce_only=True
+        )
+        assert "maxOrderQuantity" in limit
@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from bpx.account import Account
+from bpx.async_.account import Account as AsyncAccount
+from bpx.async_.public import Public as AsyncPublic
+from bpx.order_book.order_book import OrderBook
+from bpx.public import Public
+from bpx.testing.exchange import (
+    SimulatedExchange,
+    signing_string,
+    verify_signature,
+)
+from bpx.testing.market import SyntheticMarket
+from bpx.ws_account import WsAccount
+from bpx.ws_public import WsPublic
+
+
+def generate_keys():
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    public_key = private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    secret_key = private_key.private_bytes_raw()
+    return base64.b64encode(public_key).decode(), base64.b64encode(secret_key).decode()
+
+
+@pytest.fixture
+def keys():
+    return generate_keys()
+
+
+def test_signing_string_matches_client(keys):
+    account = Account(*keys)
+    params = {"symbol": "SOL_USDC", "postOnly": True, "clientId": 7}
+    message = signing_string("orderExecute", params, 1000, 5000)
+    assert message == (
+        "instruction=orderExecute&clientId=7&postOnly=true"
+        "&symbol=SOL_USDC&timestamp=1000&window=5000"
+    )
+    signature = account._sign(params, "orderExecute", 1000, 5000)
+    assert verify_signature(keys[0], signature, message)
+    assert not verify_signature(keys[0], signature, message + "0")
+
+
+def test_synthetic_depth_diffs_rebuild_snapshot():
+    market = SyntheticMarket("SOL_USDC", seed=1)
+    book = OrderBook("SOL_USDC")
+    book.apply_snapshot(market.snapshot(0))
+    for i in range(500):
+        assert book.apply_update(market.next_depth(i))
+    expected = market.snapshot(0)
+    assert [[str(p), str(q)] for p, q in book.bids.levels()] == expected["bids"][::-1]
+    assert [[str(p), str(q)] for p, q in book.asks.levels()] == expected["asks"]
+    assert book.best_bid()[0] < book.best_ask()[0]
+
+
+def test_sync_clients_against_exchange(keys):
+    with SimulatedExchange(depth_rate=0, trade_rate=0, seed=1) as exchange:
+        public = exchange.attach(Public())
+        assert public.get_ping() == "pong"
+        symbols = [market["symbol"] for market in public.get_markets()]
+        assert "SOL_USDC" in symbols
+        depth = public.get_depth("SOL_USDC")
+        best_bid = depth["bids"][-1][0]
+
+        account = exchange.attach(Account(*keys))
+        order = account.execute_order(
+            "SOL_USDC",
+            "Bid",
+            "Limit",
+            quantity="1",
+            price=str(float(best_bid) - 1),
+            client_id=42,
+            post_only=True,
+        )
+        assert order["status"] == "New"
+        assert account.get_open_order("SOL_USDC", client_id=42)["id"] == order["id"]
+        assert [o["id"] for o in account.get_open_orders(symbol="SOL_USDC")] == [
+            order["id"]
+        ]
+        cancelled = account.cancel_order("SOL_USDC", order_id=order["id"])
+        assert cancelled["status"] == "Cancelled"
+        assert account.get_open_orders() == []
+
+        filled = account.execute_order("SOL_USDC", "Bid", "Market", quantity="2")
+        assert filled["status"] == "Filled"
+        balances = account.get_balances()
+        assert balances["SOL"]["available"] == "10002.00"
+        assert len(account.get_fill_history(symbol="SOL_USDC")) == 1
+
+
+def test_rejects_invalid_requests(keys):
+    other_public_key, other_secret_key = generate_keys()
+    with SimulatedExchange(depth_rate=0, trade_rate=0) as exchange:
+        forged = exchange.attach(Account(keys[0], other_secret_key))
+        assert forged.get_balances()["code"] == "INVALID_SIGNATURE"
+
+        restricted = SimulatedExchange(api_keys=[other_public_key])
+        assert not restricted._key_allowed(keys[0])
+
+        exchange.clock_offset_ms = 120000
+        account = exchange.attach(Account(*keys))
+        response = account.get_balances()
+        assert response["code"] == "INVALID_CLIENT_REQUEST"
+        assert "expired" in response["message"]
+
+
+@pytest.mark.asyncio
+async def test_streams_and_order_updates(keys):
+    async with SimulatedExchange(
+        markets=["SOL_USDC"], depth_rate=200, trade_rate=50, seed=3
+    ) as exchange:
+        public = exchange.attach(AsyncPublic())
+        book = OrderBook("SOL_USDC", snapshot_fetcher=public.get_depth)
+        trades = []
+
+        async def on_message(message):
+            await book.on_message(message)
+            if message["stream"].startswith("trades."):
+                trades.append(message["data"])
+
+        ws = exchange.attach(WsPublic(on_message=on_message))
+        connect = asyncio.ensure_future(ws.connect())
+        while ws.ws is None:
+            await asyncio.sleep(0.01)
+        await ws.subscribe(ws.subscribe_streams(["depth.SOL_USDC", "trades.SOL_USDC"]))
+        for _ in range(200):
+            if book.synced and trades and book.last_update_id > 20:
+                break
+            await asyncio.sleep(0.01)
+        assert book.synced
+        assert trades
+        assert book.best_bid()[0] < book.best_ask()[0]
+
+        updates = []
+        ws_account = exchange.attach(
+            WsAccount(*keys, on_message=lambda message: updates.append(message))
+        )
+        account_connect = asyncio.ensure_future(ws_account.connect())
+        while ws_account.ws is None:
+            await asyncio.sleep(0.01)
+        await ws_account.subscribe(ws_account.subscribe_order_update())
+        await asyncio.sleep(0.05)
+
+        account = exchange.attach(AsyncAccount(*keys))
+        order = await account.execute_order("SOL_USDC", "Ask", "Market", quantity="1")
+        assert order["status"] == "Filled"
+        for _ in range(100):
+            if len(updates) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        assert [u["data"]["e"] for u in updates] == ["orderAccepted", "orderFill"]
+        assert updates[1]["data"]["i"] == order["id"]
+
+        await ws.close()
+        await ws_account.close()
+        await asyncio.gather(connect, account_connect)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from bpx.async_.public import Public as AsyncPublic
+from bpx.http_client.async_http_client import AsyncHttpClient
+from bpx.metrics.histogram import RollingHistogram
+from bpx.metrics.stream_latency import (
+    StreamLatencyMonitor,
+    async_measure_clock_offset,
+    measure_clock_offset,
+)
+from bpx.testing.exchange import SimulatedExchange
+from bpx.ws_public import WsPublic
+
+
+def test_rolling_histogram_drops_old_slices():
+    rolling = RollingHistogram(window=10.0, slices=5)
+    rolling.record(100, now=0.5)
+    rolling.record(200, now=4.5)
+    assert rolling.histogram(now=5.0).count == 2
+    assert rolling.histogram(now=10.5).count == 1
+    rolling.record(300, now=10.5)
+    assert rolling.percentiles((100,), now=11.0) == {100: 300}
+    assert rolling.histogram(now=30.0).count == 0
+
+
+def test_monitor_corrects_clock_offset():
+    monitor = StreamLatencyMonitor(clock_offset_ms=2.0)
+    received_ns = time.time_ns()
+    event_us = received_ns // 1000 - 5000
+    for field_value in (event_us, event_us // 1000):
+        monitor.record(
+            {"stream": "trades.SOL_USDC", "data": {"E": field_value}},
+            received_ns,
+            0,
+            250_000,
+        )
+    percentiles = monitor.percentiles("trades.SOL_USDC", (50, 100))
+    # 5 ms in flight plus 2 ms the exchange clock is ahead
+    assert percentiles["exchange_to_receive"][50] == pytest.approx(7000, rel=0.01)
+    assert percentiles["exchange_to_receive"][100] == pytest.approx(7000, rel=0.2)
+    assert percentiles["receive_to_handler"][50] == pytest.approx(250, rel=0.01)
+
+    monitor.record({"stream": "trades.SOL_USDC", "data": {"E": event_us * 2}}, 0, 0)
+    assert monitor.negative == 1
+    monitor.record("not a stream message", 0, 0)
+    summary = monitor.summary()
+    assert summary["trades.SOL_USDC"]["exchange_to_receive"]["count"] == 3
+    assert summary["trades.SOL_USDC"]["receive_to_handler"]["count"] == 3
+
+
+def test_measure_clock_offset():
+    offset = measure_clock_offset(lambda: time.time_ns() // 1_000_000 + 1500)
+    assert offset.offset_ms == pytest.approx(1500, abs=5)
+    assert offset.rtt_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_ws_latency_against_skewed_exchange():
+    async with SimulatedExchange(
+        markets=["SOL_USDC"], depth_rate=100, trade_rate=0, clock_offset_ms=400
+    ) as exchange:
+        public = exchange.attach(AsyncPublic(http_client=AsyncHttpClient()))
+        offset = await async_measure_clock_offset(public.get_time, samples=3)
+        assert offset.offset_ms == pytest.approx(400, abs=50)
+
+        monitor = StreamLatencyMonitor(clock_offset_ms=offset.offset_ms)
+        ws = exchange.attach(
+            WsPublic(on_message=lambda m: None, latency_monitor=monitor)
+        )
+        connect = asyncio.ensure_future(ws.connect())
+        while ws.ws is None:
+            await asyncio.sleep(0.01)
+        await ws.subscribe(ws.subscribe_depth("SOL_USDC"))
+        for _ in range(100):
+            if "depth.SOL_USDC" in monitor.exchange_to_receive:
+                break
+            await asyncio.sleep(0.01)
+        await ws.close()
+        await connect
+    latency = monitor.percentiles("depth.SOL_USDC")["exchange_to_receive"]
+    # without the offset correction the latency would be about 400 ms
+    assert latency[50] < 100_000
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_delay_is_not_network_latency():
+    async def handler(message):
+        await asyncio.sleep(0.03)
+
+    async with SimulatedExchange(
+        markets=["SOL_USDC"], depth_rate=100, trade_rate=0
+    ) as exchange:
+        monitor = StreamLatencyMonitor()
+        ws = exchange.attach(WsPublic(on_message=handler, latency_monitor=monitor))
+        connect = asyncio.ensure_future(ws.connect())
+        while ws.ws is None:
+            await asyncio.sleep(0.01)
+        await ws.subscribe(ws.subscribe_depth("SOL_USDC"))
+        await asyncio.sleep(0.3)
+        await ws.close()
+        await connect
+    latency = monitor.percentiles("depth.SOL_USDC", (50, 90))
+    # frames arrive every 10 ms but take 30 ms to handle, the backlog is
+    # handling delay, the network stays fast
+    assert latency["receive_to_handler"][90] > 100_000
+    assert latency["exchange_to_receive"][90] < 50_000
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import pytest
+from bpx.streams.router import StreamRouter
+from bpx.ws_public import WsPublic
+
+
+def trade(symbol):
+    return {"stream": f"trades.{symbol}", "data": {"e": "trade", "s": symbol}}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_without_copies():
+    router = StreamRouter()
+    first = router.subscribe(["trades.SOL_USDC"])
+    second = router.subscribe(["trades.SOL_USDC", "trades.BTC_USDC"])
+    everything = router.subscribe()
+    assert len(router) == 4
+
+    sol, btc = trade("SOL_USDC"), trade("BTC_USDC")
+    router.publish(sol)
+    router.publish(btc)
+    router.publish("pong")
+
+    assert await first.get(timeout=1) is sol
+    assert await second.get(timeout=1) is sol
+    assert await second.get(timeout=1) is btc
+    assert [await everything.get(timeout=1) for _ in range(3)] == [sol, btc, "pong"]
+    with pytest.raises(asyncio.TimeoutError):
+        await first.get(timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_close_ends_iteration_and_drops_oldest():
+    router = StreamRouter()
+    subscription = router.subscribe(["trades.SOL_USDC"], maxsize=2)
+    for _ in range(3):
+        router.publish(trade("SOL_USDC"))
+    assert subscription.dropped == 1
+
+    router.close()
+    router.publish(trade("SOL_USDC"))
+
+    received = [message async for message in subscription]
+    assert len(received) == 2
+    assert not router
+    with pytest.raises(StopAsyncIteration):
+        await subscription.get()
+
+
+class FakeConnection:
+    def __init__(self, messages):
+        self.messages = messages
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+
+
+@pytest.mark.asyncio
+async def test_ws_public_stream():
+    ws = WsPublic()
+    ws.ws = FakeConnection([json.dumps(trade("SOL_USDC")), json.dumps(trade("X"))])
+
+    async with ws.stream("trades.SOL_USDC") as trades:
+        await ws._listen()
+        received = [message async for message in trades]
+
+    assert received == [trade("SOL_USDC")]
+
+
+@pytest.mark.asyncio
+async def test_all_symbols_streams_receive_per_symbol_messages():
+    router = StreamRouter()
+    tickers = router.subscribe(["tickers"])
+    both = router.subscribe(["tickers", "ticker.SOL_USDC"])
+    mark_prices = router.subscribe(["markPrices"])
+
+    sol = {"stream": "ticker.SOL_USDC", "data": {"e": "ticker", "s": "SOL_USDC"}}
+    mark = {"stream": "markPrice.BTC_USDC", "data": {"e": "markPrice"}}
+    router.publish(sol)
+    router.publish(mark)
+    router.publish(trade("SOL_USDC"))
+
+    assert await tickers.get(timeout=1) is sol
+    assert await both.get(timeout=1) is sol
+    assert await mark_prices.get(timeout=1) is mark
+    for subscription in (tickers, both, mark_prices):
+        assert subscription.queue.empty()
@@ -0,0 +1,146 @@
+import pytest
+from bpx.ws_public_pool import WsPublicPool
+
+
+class FakeClient:
+    def __init__(self, on_message=None, on_error=None, on_close=None, on_open=None):
+        self.on_message_callback = on_message
+        self.on_open_callback = on_open
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def subscribe(self, subscription_message):
+        if isinstance(subscription_message, dict):
+            subscription_message = [subscription_message]
+        for message in subscription_message:
+            await self.send(message)
+
+
+@pytest.fixture
+def pool():
+    return WsPublicPool(shards=3, client_factory=FakeClient, rebalance_interval=None)
+
+
+def test_not_a_singleton(pool):
+    other = WsPublicPool(shards=3, client_factory=FakeClient)
+    assert pool is not other
+    assert len({id(client) for client in pool.clients}) == 3
+
+
+@pytest.mark.asyncio
+async def test_hash_sharding_groups_symbol_streams(pool):
+    await pool.subscribe(pool.subscribe_depth("SOL_USDC"))
+    await pool.subscribe(pool.subscribe_trades("SOL_USDC"))
+
+    shard = pool.assignments["depth.SOL_USDC"]
+    assert pool.assignments["trades.SOL_USDC"] == shard
+    assert pool.clients[shard].sent == [
+        {"method": "SUBSCRIBE", "params": ["depth.SOL_USDC"]},
+        {"method": "SUBSCRIBE", "params": ["trades.SOL_USDC"]},
+    ]
+
+    await pool.subscribe(pool.unsubscribe(["depth.SOL_USDC"]))
+    assert "depth.SOL_USDC" not in pool.assignments
+    assert pool.clients[shard].sent[-1] == {
+        "method": "UNSUBSCRIBE",
+        "params": ["depth.SOL_USDC"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_batched_subscription_is_packed_per_shard(pool):
+    pool.MAX_STREAMS_PER_MESSAGE = 2
+    streams = [f"depth.SYMBOL_{i}" for i in range(12)]
+
+    await pool.subscribe(pool.subscribe_streams(streams))
+
+    for shard, client in enumerate(pool.clients):
+        assigned = pool.shard_streams(shard)
+        assert [s for m in client.sent for s in m["params"]] == assigned
+        assert all(len(m["params"]) <= 2 for m in client.sent)
+    assert sorted(pool.assignments) == sorted(streams)
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_then_subscribe_keeps_stream(pool):
+    await pool.subscribe(pool.subscribe_depth("SOL_USDC"))
+    shard = pool.assignments["depth.SOL_USDC"]
+
+    await pool.subscribe(
+        [pool.unsubscribe(["depth.SOL_USDC"]), pool.subscribe_depth("SOL_USDC")]
+    )
+
+    assert "depth.SOL_USDC" in pool.assignments
+    assert [m["method"] for m in pool.clients[shard].sent[-2:]] == [
+        "UNSUBSCRIBE",
+        "SUBSCRIBE",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_messages_are_aggregated_and_counted():
+    received = []
+    pool = WsPublicPool(shards=2, client_factory=FakeClient, on_message=received.append)
+    await pool.subscribe(pool.subscribe_trades("SOL_USDC"))
+    message = {"stream": "trades.SOL_USDC", "data": {}}
+    for client in pool.clients:
+        await client.on_message_callback(message)
+
+    assert received == [message, message]
+    assert pool._counts["trades.SOL_USDC"] == 2
+
+
+@pytest.mark.asyncio
+async def test_all_symbols_stream_messages_are_counted():
+    pool = WsPublicPool(shards=2, client_factory=FakeClient)
+    await pool.subscribe([pool.subscribe_tickers(), pool.subscribe_mark_prices()])
+    client = pool.clients[pool.assignments["tickers"]]
+    for symbol in ("SOL_USDC", "BTC_USDC"):
+        await client.on_message_callback({"stream": f"ticker.{symbol}", "data": {}})
+    await client.on_message_callback({"stream": "markPrice.SOL_USDC", "data": {}})
+    await client.on_message_callback({"stream": "depth.SOL_USDC", "data": {}})
+
+    assert pool._counts == {"tickers": 2, "markPrices": 1}
+
+
+@pytest.mark.asyncio
+async def test_open_resubscribes_assigned_streams(pool):
+    await pool.subscribe(pool.subscribe_depth("SOL_USDC"))
+    shard = pool.assignments["depth.SOL_USDC"]
+    pool.clients[shard].sent = []
+
+    await pool.clients[shard].on_open_callback()
+
+    assert pool.clients[shard].sent == [
+        {"method": "SUBSCRIBE", "params": ["depth.SOL_USDC"]}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rate_strategy_and_rebalance():
+    pool = WsPublicPool(
+        shards=2, client_factory=FakeClient, strategy="rate", rebalance_interval=None
+    )
+    pool.assignments = {"depth.A": 0, "depth.B": 0, "depth.C": 0, "depth.D": 1}
+    pool.rates = {"depth.A": 100.0, "depth.B": 50.0, "depth.C": 40.0, "depth.D": 1.0}
+
+    assert pool.shard_for("depth.E") == 1
+
+    moved = await pool.rebalance()
+
+    assert moved
+    loads = pool.shard_loads()
+    assert max(loads) <= pool.hot_ratio * sum(loads) / len(loads)
+    for stream in moved:
+        assert pool.assignments[stream] == 1
+        assert {"method": "SUBSCRIBE", "params": [stream]} in pool.clients[1].sent
+        assert {"method": "UNSUBSCRIBE", "params": [stream]} in pool.clients[0].sent
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        WsPublicPool(shards=0, client_factory=FakeClient)
+    with pytest.raises(ValueError):
+        WsPublicPool(strategy="random", client_factory=FakeClient)
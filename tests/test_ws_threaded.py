@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import pytest
+from queue import Empty
+from bpx.exceptions import StreamClosedError
+from bpx.streams.ring_buffer import RingBuffer
+from bpx.ws_threaded import ThreadedWsClient
+
+
+class FakeClient:
+    """Async client opening immediately and echoing sent messages back"""
+
+    def __init__(self):
+        self.on_message_callback = None
+        self.on_error_callback = None
+        self.on_close_callback = None
+        self.on_open_callback = None
+        self.loop_thread = None
+        self._closed = None
+
+    async def connect(self):
+        self._closed = asyncio.Event()
+        self.loop_thread = threading.current_thread()
+        self.on_open_callback()
+        await self._closed.wait()
+        self.on_close_callback(1000, "closed")
+
+    async def subscribe(self, message):
+        await self.send(message)
+
+    async def send(self, message):
+        self.on_message_callback(message)
+
+    async def close(self):
+        self._closed.set()
+
+
+def test_ring_buffer_overwrites_oldest():
+    buffer = RingBuffer(capacity=2)
+    for i in range(3):
+        buffer.put(i)
+    assert buffer.dropped == 1
+    assert buffer.drain() == [1, 2]
+    with pytest.raises(Empty):
+        buffer.get(timeout=0.01)
+    buffer.put(3)
+    buffer.close()
+    buffer.put(4)
+    assert buffer.get() == 3
+    with pytest.raises(StreamClosedError):
+        buffer.get()
+
+
+def test_pull_messages_from_loop_thread():
+    client = FakeClient()
+    closed = threading.Event()
+    ws = ThreadedWsClient(client, on_close=lambda code, reason: closed.set())
+
+    assert ws.start(timeout=5)
+    assert client.loop_thread is not threading.current_thread()
+    ws.subscribe({"method": "SUBSCRIBE", "params": ["trades.SOL_USDC"]})
+    ws.send({"method": "PING"})
+    assert ws.get(timeout=5) == {"method": "SUBSCRIBE", "params": ["trades.SOL_USDC"]}
+
+    ws.close()
+    assert closed.wait(5)
+    assert list(ws) == [{"method": "PING"}]
+    assert not ws.connected
+    with pytest.raises(RuntimeError):
+        ws.send({"method": "PING"})
+
+
+def test_callback_dispatcher_thread():
+    received = []
+    errors = []
+    done = threading.Event()
+
+    def on_message(message):
+        if message == "boom":
+            raise ValueError(message)
+        received.append((message, threading.current_thread().name))
+        if message == "last":
+            done.set()
+
+    with ThreadedWsClient(
+        FakeClient(), on_message=on_message, on_error=errors.append
+    ) as ws:
+        for message in ("first", "boom", "last"):
+            ws.send(message)
+        assert done.wait(5)
+
+    assert [m for m, _ in received] == ["first", "last"]
+    assert {name for _, name in received} == {"bpx-ws-dispatcher"}
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+
+
+class HangingClient(FakeClient):
+    """Async client which never finishes closing"""
+
+    async def close(self):
+        await asyncio.sleep(3600)
+
+
+def test_close_stops_the_loop_when_the_client_hangs():
+    client = HangingClient()
+    ws = ThreadedWsClient(client, on_message=lambda message: None)
+    assert ws.start(timeout=5)
+
+    ws.close(timeout=0.1)
+    assert not ws._thread.is_alive()
+    assert not ws._dispatcher.is_alive()
+    assert ws._loop.is_closed()
+    with pytest.raises(StreamClosedError):
+        ws.buffer.get(timeout=0.01)